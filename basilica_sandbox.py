@@ -3,6 +3,7 @@ import json
 import time
 import os
 from rich.console import Console
+from budget_scheduler import get_budget
 
 console = Console()
 
@@ -134,6 +135,11 @@ class BasilicaSandbox:
 
     def execute_code(self, code):
         """Executes Python code in the remote sandbox."""
+        budget = get_budget()
+        if budget.exhausted("basilica"):
+            return "Error: Basilica budget exhausted (saldo <= 0 in status_frota.json)."
+        budget.acquire("basilica")
+
         uid = self.get_sandbox_uid()
         if not uid:
              # Try to deploy if missing
@@ -156,6 +162,8 @@ class BasilicaSandbox:
         res = self._run_cli(["exec", uid, "--", "python", "-c", code])
         
         if res and res.returncode == 0:
+            # The CLI reports no usage; charge a rough token estimate of code + output
+            budget.record_usage("basilica", (len(code) + len(res.stdout or "")) // 4)
             return res.stdout
         else:
             return f"Error: {res.stderr if res else 'CLI execution failed'}"
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections import defaultdict
+from typing import List, Optional
+from rich.console import Console
+from provider_health import CircuitOpenError
+from budget_scheduler import usage_tokens
+from llm_engine import COMPLEXITY_TIERS, FALLBACK_TIERS, TIER_SPECS, tier_model, build_messages
+
+console = Console()
+
+# Only cheap, short System 1 prompts are merged into a single multi-prompt request
+MERGEABLE_TIERS = {"fast"}
+MAX_MERGE_CHARS = 600
+
+MERGE_INSTRUCTION = (
+    "Answer each numbered prompt below independently. Respond ONLY with a JSON array "
+    "of {n} strings, one answer per prompt, in the same order."
+)
+
+
+def merge_prompts(prompts: List[str]) -> str:
+    """Packs several prompts into one request that asks for a JSON array of answers."""
+    body = "\n\n".join(f"### Prompt {i + 1}\n{p}" for i, p in enumerate(prompts))
+    return f"{MERGE_INSTRUCTION.format(n=len(prompts))}\n\n{body}"
+
+
+def split_answers(text: str, expected: int) -> Optional[List[str]]:
+    """Parses the JSON array produced for a merged request; None if it is unusable."""
+    match = re.search(r"\[.*\]", text or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        answers = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(answers, list) or len(answers) != expected:
+        return None
+    return [a if isinstance(a, str) else json.dumps(a) for a in answers]
+
+
+class BatchRouter:
+    """
+    Batch prompt API on top of AsyncLLMEngine.
+    Classifies every prompt in one pass, groups them by (tier, model), merges short
+    System 1 prompts into multi-prompt requests and dispatches everything else
+    with bounded concurrency. Results come back in input order, one dict per item:
+    {"index", "prompt", "tier", "output", "error"}.
+    """
+    def __init__(self, engine, max_concurrency: int = 8, merge_size: int = 8):
+        self.engine = engine
+        self.brain = engine.brain
+        self.max_concurrency = max_concurrency
+        self.merge_size = merge_size
+
+    async def run(self, prompts: List[str], is_sensitive: bool = False) -> List[dict]:
+        self.engine._bind_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = [{"index": i, "prompt": p, "tier": None, "output": None, "error": None}
+                   for i, p in enumerate(prompts)]
+
+        # 1. Classify in one pass and group by (tier, model)
+        groups = defaultdict(list)
+        for i, prompt in enumerate(prompts):
+            tier = "secure" if is_sensitive else self.brain._budget_tier(
+                COMPLEXITY_TIERS[self.brain._evaluate_complexity(prompt)])
+            model = tier_model(tier) if tier in TIER_SPECS else "affine"
+            groups[(tier, model)].append(i)
+            results[i]["tier"] = tier
+
+        # 2. Dispatch each group
+        jobs = []
+        for (tier, model), indexes in groups.items():
+            if tier in MERGEABLE_TIERS and self.merge_size > 1:
+                short = [i for i in indexes if len(prompts[i]) <= MAX_MERGE_CHARS]
+                for start in range(0, len(short), self.merge_size):
+                    chunk = short[start:start + self.merge_size]
+                    jobs.append(self._run_merged(tier, model, chunk, results, semaphore))
+                indexes = [i for i in indexes if len(prompts[i]) > MAX_MERGE_CHARS]
+            for i in indexes:
+                jobs.append(self._run_single(tier, results[i], semaphore))
+
+        await asyncio.gather(*jobs)
+        return results
+
+    async def _run_single(self, tier: str, item: dict, semaphore: asyncio.Semaphore):
+        """Runs one prompt through its tier and fallback chain, recording the error per item."""
+        async with semaphore:
+            prompt = item["prompt"]
+            if tier == "deep":
+                prompt = await self.engine._ground(prompt)
+            errors = []
+            while tier:
+                try:
+                    item["output"] = await self.engine.complete(tier, prompt)
+                    item["tier"] = tier
+                    item["error"] = None
+                    return
+                except Exception as e:
+                    errors.append(f"{tier}: {e}")
+                    item["error"] = "; ".join(errors)
+                    tier = FALLBACK_TIERS.get(tier)
+
+    async def _run_merged(self, tier: str, model: str, indexes: List[int], results: List[dict],
+                          semaphore: asyncio.Semaphore):
+        """Sends a chunk of short prompts as one request; falls back to single calls on bad output."""
+        pending = []
+        for i in indexes:
+            cached = self.brain.cache_lookup(tier, model, results[i]["prompt"])
+            if cached is not None:
+                results[i]["output"] = cached
+            else:
+                pending.append(i)
+        if not pending:
+            return
+        if len(pending) == 1:
+            return await self._run_single(tier, results[pending[0]], semaphore)
+
+        client = self.engine._client(TIER_SPECS[tier]["provider"])
+        answers = None
+        if client is not None:
+            prompts = [results[i]["prompt"] for i in pending]
+            health = self.brain.health.get(TIER_SPECS[tier]["provider"])
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    health.check()
+                    await self.brain.budget.acquire_async(TIER_SPECS[tier]["provider"])
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=build_messages(self.brain.system_prompt, merge_prompts(prompts)),
+                        max_tokens=TIER_SPECS[tier]["max_tokens"] * len(prompts),
+                        timeout=health.timeout() * 2
+                    )
+                    health.record_success(time.perf_counter() - start)
+                    self.brain.budget.record_usage(TIER_SPECS[tier]["provider"], usage_tokens(response))
+                    answers = split_answers(response.choices[0].message.content, len(prompts))
+                except Exception as e:
+                    if not isinstance(e, CircuitOpenError):
+                        health.record_failure(time.perf_counter() - start)
+                    console.print(f"[yellow]Merged {tier} request failed ({e}). Retrying individually...[/yellow]")
+                elapsed = time.perf_counter() - start
+
+        if answers is None:
+            await asyncio.gather(*(self._run_single(tier, results[i], semaphore) for i in pending))
+            return
+
+        for i, answer in zip(pending, answers):
+            results[i]["output"] = answer
+            self.brain.cache_store(tier, model, results[i]["prompt"], answer, elapsed / len(pending))
+
+
+def _simulated_provider(latency: float):
+    """Minimal OpenAI-compatible stand-in used by the benchmark's --simulate mode."""
+    from types import SimpleNamespace
+
+    async def create(**kwargs):
+        await asyncio.sleep(latency)
+        user = kwargs["messages"][-1]["content"]
+        count = user.count("### Prompt ")
+        text = json.dumps([f"answer {n}" for n in range(count)]) if count else "answer"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark: think_batch vs. a sequential think() loop")
+    parser.add_argument("-n", type=int, default=32, help="Number of prompts")
+    parser.add_argument("--simulate", type=float, default=None,
+                        help="Use an in-process provider with this latency (s) instead of real endpoints")
+    args = parser.parse_args()
+
+    from brain import BrainRouter
+    brain = BrainRouter()
+    brain.cache_enabled = False
+    prompts = [f"Summarize Vanta signal #{i}: miner opened a BTCUSD position." for i in range(args.n)]
+
+    async def sequential():
+        if args.simulate is not None:
+            brain.llm_engine._bind_loop()
+            brain.llm_engine._clients = {"chutes": _simulated_provider(args.simulate),
+                                         "targon": _simulated_provider(args.simulate * 5)}
+        return [await brain.llm_engine.complete(COMPLEXITY_TIERS[brain._evaluate_complexity(p)], p)
+                for p in prompts]
+
+    async def batched():
+        if args.simulate is not None:
+            brain.llm_engine._bind_loop()
+            brain.llm_engine._clients = {"chutes": _simulated_provider(args.simulate),
+                                         "targon": _simulated_provider(args.simulate * 5)}
+        return await BatchRouter(brain.llm_engine).run(prompts)
+
+    start = time.perf_counter()
+    brain.llm_engine.run(sequential())
+    seq_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = brain.llm_engine.run(batched())
+    batch_s = time.perf_counter() - start
+
+    errors = sum(1 for r in results if r["error"])
+    console.print(f"[cyan]Sequential loop: {seq_s:.2f}s ({args.n / seq_s:.1f} prompts/s)[/cyan]")
+    console.print(f"[green]think_batch:     {batch_s:.2f}s ({args.n / batch_s:.1f} prompts/s), "
+                  f"{errors} errors, speedup {seq_s / batch_s:.1f}x[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import os
-import requests
+import http_transport
 from typing import Dict, Any
 
 class BitsecAuditor:
@@ -28,7 +28,7 @@ class BitsecAuditor:
             payload = {"code": code, "language": "python"}
             
             print(f"[Bitsec] Auditing {len(code)} bytes of code...")
-            resp = requests.post(f"{self.base_url}/scan", json=payload, headers=headers, timeout=10)
+            resp = http_transport.post(f"{self.base_url}/scan", json=payload, headers=headers, timeout=10)
             
             if resp.status_code == 200:
                 report = resp.json()
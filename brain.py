@@ -1,85 +1,195 @@
 import os
 import json
 import time
+import asyncio
 from rich.console import Console
-from openai import Client
-from stealth_browser import StealthBrowser
-from bitsec_auditor import BitsecAuditor
-from gopher_client import GopherClient
+from component_registry import ComponentRegistry, LazyComponent
+from provider_health import CircuitOpenError
+from budget_scheduler import usage_tokens
+from context_window import stable_prefix
+from llm_engine import (PROVIDERS, TIER_SPECS, COMPLEXITY_TIERS, FALLBACK_TIERS, tier_model,
+                        needs_grounding, build_messages, chunk_text, mock_response)
 
 console = Console()
 
-from handshake_consultant import HandshakeConsultant
+class BrainRouter:
+    """
+    Decides between System 1 (Fast/Chutes) and System 2 (Deep/Targon) thinking
+    using real Bittensor subnets via OpenAI-compatible endpoints.
+    Also manages Body capabilities (RedTeam, Bitsec, Gopher, Handshake, Trajectory, Nexus).
 
-from soul_manager import SoulManager
+    Every subsystem is built lazily on first access (see `startup_report()`),
+    so a cold BrainRouter only pays for what a request actually touches.
+    """
+    # LLM Clients
+    chutes_client = LazyComponent()
+    targon_client = LazyComponent()
 
-from context_loader import ContextLoader
+    # Subnet Modules
+    stealth_browser = LazyComponent()
+    bitsec_auditor = LazyComponent()
+    gopher_client = LazyComponent()
+    handshake_consultant = LazyComponent()
 
-from gittensor_client import GittensorClient
+    # v2.4 Modules
+    soul_manager = LazyComponent()
+    system_prompt = LazyComponent()
 
-from macrocosm_client import MacrocosmClient
+    # v2.5 Modules (Data Layer)
+    context_loader = LazyComponent()
 
-from affine_client import AffineClient
+    # v2.6 Modules (Contributor Layer)
+    gittensor_client = LazyComponent()
 
-from taoshi_client import TaoshiClient
-from src.tools.manako_vision import ManakoVision
+    # v2.7 Modules (Compute Layer)
+    macrocosm_client = LazyComponent()
+
+    # v2.8 Modules (Verifier Layer)
+    affine_client = LazyComponent()
+
+    # v2.9 Modules (Finance Layer)
+    taoshi_client = LazyComponent()
+
+    # v2.10 Modules (Vision Layer)
+    manako_vision = LazyComponent()
+
+    # Async Routing Engine
+    llm_engine = LazyComponent()
+
+    # Response Cache
+    response_cache = LazyComponent()
+
+    # Complexity Classifier
+    classifier = LazyComponent()
+
+    # Provider Health (circuit breakers + adaptive timeouts)
+    health = LazyComponent()
+
+    # Budget Scheduler (status_frota.json)
+    budget = LazyComponent()
+
+    # Context Window Manager (System 2 grounding)
+    context_window = LazyComponent()
 
-class BrainRouter:
-    """
-    Decides between System 1 (Fast/Chutes) and System 2 (Deep/Targon) thinking
-    using real Bittensor subnets via OpenAI-compatible endpoints.
-    Also manages Body capabilities (RedTeam, Bitsec, Gopher, Handshake, Trajectory, Nexus).
-    """
     def __init__(self):
         # 1. API Keys
         self.chutes_key = os.getenv("CHUTES_API_KEY")
         self.targon_key = os.getenv("TARGON_API_KEY")
         self.vanta_key = os.getenv("VANTA_API_KEY")
-        
-        # 2. Clients
-        self.chutes_client = None
-        self.targon_client = None
         self.vanta_client = None
 
-        if self.chutes_key:
-            self.chutes_client = Client(api_key=self.chutes_key, base_url="https://llm.chutes.ai/v1")
-        
-        if self.targon_key:
-            self.targon_client = Client(api_key=self.targon_key, base_url="https://api.targon.com/v1")
-
-        # 3. Subnet Modules
-        self.stealth_browser = StealthBrowser()
-        self.bitsec_auditor = BitsecAuditor()
-        self.gopher_client = GopherClient()
-        self.handshake_consultant = HandshakeConsultant()
-
-        
-        # v2.4 Modules
-        self.soul_manager = SoulManager()
-        self.system_prompt = self.soul_manager.load_soul()
-        
-        # v2.5 Modules (Data Layer)
-        self.context_loader = ContextLoader()
-        
-        # v2.6 Modules (Contributor Layer)
-        self.gittensor_client = GittensorClient()
-        
-        # v2.7 Modules (Compute Layer)
-        self.macrocosm_client = MacrocosmClient()
-        
-        # v2.8 Modules (Verifier Layer)
-        self.affine_client = AffineClient()
-        
-        # v2.9 Modules (Finance Layer)
-        # v2.9 Modules (Finance Layer)
-        self.taoshi_client = TaoshiClient()
-
-        # v2.10 Modules (Vision Layer)
-        self.manako_vision = ManakoVision()
-
-    # ... existing methods ...
-
-    # ... existing methods ...
+        # 2. Component Registry (nothing is imported or built until first use)
+        self.components = ComponentRegistry()
+        self.components.register("chutes_client", "openai:Client", factory=lambda Client: Client(
+            api_key=self.chutes_key, base_url=PROVIDERS["chutes"]["base_url"]) if self.chutes_key else None)
+        self.components.register("targon_client", "openai:Client", factory=lambda Client: Client(
+            api_key=self.targon_key, base_url=PROVIDERS["targon"]["base_url"]) if self.targon_key else None)
+
+        self.components.register("stealth_browser", "stealth_browser:StealthBrowser")
+        self.components.register("bitsec_auditor", "bitsec_auditor:BitsecAuditor")
+        self.components.register("gopher_client", "gopher_client:GopherClient")
+        self.components.register("handshake_consultant", "handshake_consultant:HandshakeConsultant")
+        self.components.register("soul_manager", "soul_manager:SoulManager", factory=self._build_soul_manager)
+        self.components.register("system_prompt", factory=lambda: stable_prefix(self.soul_manager.load_soul()))
+        self.components.register("context_loader", "context_loader:ContextLoader")
+        self.components.register("gittensor_client", "gittensor_client:GittensorClient")
+        self.components.register("macrocosm_client", "macrocosm_client:MacrocosmClient")
+        self.components.register("affine_client", "affine_client:AffineClient")
+        self.components.register("taoshi_client", "taoshi_client:TaoshiClient")
+        self.components.register("manako_vision", "src.tools.manako_vision:ManakoVision")
+        self.components.register("llm_engine", "llm_engine:AsyncLLMEngine", factory=lambda Engine: Engine(self))
+        self.components.register("response_cache", "response_cache:ResponseCache", factory=lambda Cache: Cache.from_env())
+        self.cache_enabled = os.getenv("BRAIN_CACHE", "1") != "0"
+        self.components.register("classifier", "complexity_classifier:HybridClassifier",
+                                 factory=lambda Classifier: Classifier.load_default())
+
+        self.components.register("health", "provider_health:HealthRegistry")
+        self.components.register("budget", "budget_scheduler:get_budget", factory=lambda get_budget: get_budget())
+        self.components.register("context_window", "context_window:ContextWindow")
+
+        self.routing_log = None
+        if os.getenv("BRAIN_ROUTING_LOG"):
+            from complexity_classifier import RoutingLog
+            self.routing_log = RoutingLog(os.getenv("BRAIN_ROUTING_LOG"))
+
+    def _build_soul_manager(self, SoulManager):
+        manager = SoulManager()
+        manager.on_refresh(self._on_soul_refresh)
+        return manager
+
+    def _on_soul_refresh(self):
+        """SOUL.md changed: reload the system prompt and drop responses made under the old one."""
+        self.components.reset("system_prompt")
+        if self.components.is_loaded("response_cache"):
+            self.response_cache.invalidate()
+
+    def cache_lookup(self, tier: str, model: str, prompt: str):
+        """Returns a cached response for this tier/model/prompt, or None."""
+        if not self.cache_enabled:
+            return None
+        return self.response_cache.get(tier, model, self.system_prompt, prompt)
+
+    def cache_store(self, tier: str, model: str, prompt: str, response: str, latency: float):
+        if self.cache_enabled:
+            self.response_cache.put(tier, model, self.system_prompt, prompt, response, latency)
+
+    def _budget_tier(self, tier: str) -> str:
+        """Degrades to a cheaper tier while the chosen provider is near its `limite`."""
+        while tier in TIER_SPECS and FALLBACK_TIERS.get(tier) and self.budget.near_limit(TIER_SPECS[tier]["provider"]):
+            cheaper = FALLBACK_TIERS[tier]
+            console.print(f"[yellow]💸 {TIER_SPECS[tier]['provider']} is near its budget limit. "
+                          f"Degrading '{tier}' -> '{cheaper}'.[/yellow]")
+            tier = cheaper
+        return tier
+
+    def health_report(self) -> list:
+        """Rolling p50/p99 latency, error rate, breaker state and timeout per provider."""
+        self.health.print_table()
+        return self.health.snapshot()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/latency-saved metrics of the response cache."""
+        self.response_cache.print_stats()
+        return self.response_cache.stats()
+
+    def _complete(self, tier: str, client, prompt: str) -> str:
+        """Runs one chat completion on a tier, served from the response cache when possible."""
+        spec = TIER_SPECS[tier]
+        model_name = tier_model(tier)
+        cached = self.cache_lookup(tier, model_name, prompt)
+        if cached is not None:
+            console.print(f"[dim]🗃️ Cache hit ({tier}/{model_name}).[/dim]")
+            return cached
+
+        # Skip a provider whose breaker is open instead of waiting for its timeout
+        health = self.health.get(spec["provider"])
+        health.check()
+        self.budget.acquire(spec["provider"])
+        start = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=build_messages(self.system_prompt, prompt),
+                max_tokens=spec["max_tokens"],
+                timeout=health.timeout()
+            )
+        except Exception:
+            health.record_failure(time.perf_counter() - start)
+            raise
+        health.record_success(time.perf_counter() - start)
+        self.budget.record_usage(spec["provider"], usage_tokens(response))
+        content = response.choices[0].message.content
+        self.cache_store(tier, model_name, prompt, content, time.perf_counter() - start)
+        return content
+
+    def warm_up(self, *names: str):
+        """Eagerly builds the given components (or all of them) ahead of traffic."""
+        self.components.warm(list(names) or None)
+
+    def startup_report(self) -> list:
+        """Prints and returns the load state and import/init cost of every component."""
+        self.components.print_report()
+        return self.components.report()
 
     def _system_1_fast_response(self, prompt: str, is_sensitive: bool = False) -> str:
         """
@@ -93,19 +203,8 @@ class BrainRouter:
             return "[Mock] Chutes key missing. Response: " + prompt
 
         try:
-            # Use configurable model or fallback to a known potentially valid one
             # Conceptual: In a real SDK, we would pass 'tier="tee"' or similar
-            model_name = "chutes/kimi-k2.5-tee" if is_sensitive else os.getenv("CHUTES_MODEL", "chutes/nousresearch/hermes-3-llama-3.1-405b")
-            
-            response = self.chutes_client.chat.completions.create(
-                model=model_name, 
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200
-            )
-            return response.choices[0].message.content
+            return self._complete("secure" if is_sensitive else "fast", self.chutes_client, prompt)
         except Exception as e:
             console.print(f"[red]Error contacting Chutes: {e}[/red]")
             return f"[Fallback] Fast response to: {prompt}"
@@ -117,81 +216,68 @@ class BrainRouter:
         """
         console.print("[magenta]🧠 System 2 (Targon SN4) activated...[/magenta]")
         
-        # Sovereign v2.5: Grounding Phase
-        # Heuristic: Check if prompt needs deep context
-        if "history" in prompt.lower() or "context" in prompt.lower() or "deep" in prompt.lower() or "research" in prompt.lower():
-             # Basic topic extraction (first 50 chars or user cue)
-             topic = prompt[:50]
-             grounding_data = self.context_loader.get_deep_context(topic)
-             # Augment the prompt with grounded truth
-             prompt = f"Context from Data Universe (SN13/SN74):\n{grounding_data}\n\nUser Question:\n{prompt}"
-        
+        prompt = self._ground(prompt)
+
         if not self.targon_client:
             return "[Mock] Targon key missing. Deep analysis of: " + prompt
 
         try:
-            # Targon often requires specific parameters or models
-            model_name = os.getenv("TARGON_MODEL", "deepseek-ai/DeepSeek-R1")
-            
-            response = self.targon_client.chat.completions.create(
-                model=model_name, 
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=6000 # Deep thought needs tokens
-            )
-            return response.choices[0].message.content
+            # Targon often requires specific parameters or models (see TIER_SPECS["deep"])
+            return self._complete("deep", self.targon_client, prompt)
         except Exception as e:
             console.print(f"[red]Error contacting Targon ({e}). Falling back to System 1...[/red]")
             return self._system_1_fast_response(prompt)
 
 
-    # ... existing methods ...
+    def _ground(self, prompt: str) -> str:
+        """
+        Sovereign v2.5: Grounding Phase.
+        Augments prompts that need deep context with data from the Nexus.
+        """
+        if not needs_grounding(prompt):
+            return prompt
+        # Basic topic extraction (first 50 chars or user cue)
+        topic = prompt[:50]
+        grounding_data = self.context_loader.get_deep_context(topic)
+        # Augment the prompt with the most relevant grounded truth that fits the model's budget
+        return self.context_window.assemble(self.system_prompt, prompt, grounding_data,
+                                            tier_model("deep"), TIER_SPECS["deep"]["max_tokens"])
 
     def _system_3_cortex_thought(self, prompt: str) -> str:
         """
         System 3: Hyper-Logic, Critical Decision. Use Affine Cortex (SN120).
         The 'Supreme Judge' protocol.
         """
-        console.print("[bold red]🧠 NEXUS SIGNAL: Activating Affine Cortex (SN120) - Protocolo do Arquiteto...[/bold red]")
-        
         try:
-            return self.affine_client.compute(prompt)
+            return self._affine_verdict(prompt)
         except Exception as e:
             console.print(f"[red]Cortex Critical Failure: {e}. Fallback to System 2.[/red]")
             return self._system_2_deep_thought(prompt)
 
+    def _affine_verdict(self, prompt: str) -> str:
+        """One (cached, health-tracked) Affine Cortex call; raises on failure so callers pick the fallback."""
+        console.print("[bold red]🧠 NEXUS SIGNAL: Activating Affine Cortex (SN120) - Protocolo do Arquiteto...[/bold red]")
+        cached = self.cache_lookup("cortex", "affine", prompt)
+        if cached is not None:
+            return cached
+        health = self.health.get("affine")
+        health.check()
+        start = time.perf_counter()
+        try:
+            result = self.affine_client.compute(prompt)
+        except Exception:
+            health.record_failure(time.perf_counter() - start)
+            raise
+        health.record_success(time.perf_counter() - start)
+        self.cache_store("cortex", "affine", prompt, result, time.perf_counter() - start)
+        return result
+
     def consult_specialist(self, query: str) -> str:
         """
         Routes query to Handshake58 (SN58) for expert advice.
         """
         return self.handshake_consultant.consult(query)
 
-        self.chutes_key = os.getenv("CHUTES_API_KEY")
-        self.targon_key = os.getenv("TARGON_API_KEY")
-        
-        # Initialize clients lazily to allow for missing keys during dev
-        self.chutes_client = None
-        self.targon_client = None
-
-        # v2.2 Modules
-        self.stealth_browser = StealthBrowser()
-        self.bitsec_auditor = BitsecAuditor()
-        self.gopher_client = GopherClient()
-        
-        if self.chutes_key:
-            self.chutes_client = Client(
-                api_key=self.chutes_key,
-                base_url="https://llm.chutes.ai/v1" 
-            )
-        
-        if self.targon_key:
-            self.targon_client = Client(
-                api_key=self.targon_key,
-                base_url="https://api.targon.com/v1" 
-            )
-
     def think(self, prompt: str, is_sensitive: bool = False) -> str:
         """
         Analyzes the prompt complexity and routes to the appropriate subnet.
@@ -201,27 +287,136 @@ class BrainRouter:
              return self._system_1_fast_response(prompt, is_sensitive=True)
 
         complexity = self._evaluate_complexity(prompt)
-        
-        if complexity == "insane":
-            return self._system_3_cortex_thought(prompt)
-        elif complexity == "high":
-            return self._system_2_deep_thought(prompt)
+        tier = self._budget_tier(COMPLEXITY_TIERS[complexity])
+        start = time.perf_counter()
+
+        if tier == "cortex":
+            result = self._system_3_cortex_thought(prompt)
+        elif tier == "deep":
+            result = self._system_2_deep_thought(prompt)
         else:
-            return self._system_1_fast_response(prompt)
+            result = self._system_1_fast_response(prompt)
+
+        if self.routing_log:
+            # Outcome log used to retrain the classifier offline (see complexity_classifier.py)
+            ok = not str(result).startswith(("[Fallback]", "[Mock]"))
+            self.routing_log.record(prompt, complexity, time.perf_counter() - start, ok=ok)
+        return result
+
+    def think_stream(self, prompt: str, is_sensitive: bool = False):
+        """
+        Streaming variant of `think()`: yields tokens as the tier produces them.
+        Same routing as `think()`; if a stream dies mid-way, the fallback tier
+        continues the output from where it stopped.
+        """
+        if is_sensitive:
+            console.print("[bold yellow]🔒 SECURE PROTOCOL: Forcing Chutes (SN64) TEE Enclave...[/bold yellow]")
+            yield from self._stream_tier("secure", prompt)
+            return
+        yield from self._stream_tier(self._budget_tier(COMPLEXITY_TIERS[self._evaluate_complexity(prompt)]), prompt)
+
+    def _stream_tier(self, tier: str, prompt: str, partial: str = ""):
+        if tier == "cortex":
+            # Affine has no token stream; emit its verdict in one piece, but its fallback (System 2) streams
+            try:
+                verdict = self._affine_verdict(prompt)
+            except Exception as e:
+                console.print(f"[red]Cortex Critical Failure: {e}. Fallback to System 2.[/red]")
+                yield from self._stream_tier("deep", prompt)
+                return
+            yield verdict
+            return
+
+        if tier == "deep" and not partial:
+            console.print("[magenta]🧠 System 2 (Targon SN4) streaming...[/magenta]")
+            prompt = self._ground(prompt)
+
+        client = self.targon_client if TIER_SPECS[tier]["provider"] == "targon" else self.chutes_client
+        if not client:
+            if not partial:
+                yield mock_response(tier, prompt)
+            return
+
+        model_name = tier_model(tier)
+        if not partial:
+            cached = self.cache_lookup(tier, model_name, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        emitted = []
+        health = self.health.get(TIER_SPECS[tier]["provider"])
+        start = time.perf_counter()
+        try:
+            health.check()
+            self.budget.acquire(TIER_SPECS[tier]["provider"])
+            stream = client.chat.completions.create(
+                model=model_name,
+                messages=build_messages(self.system_prompt, prompt, partial),
+                max_tokens=TIER_SPECS[tier]["max_tokens"],
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=health.timeout()
+            )
+            for chunk in stream:
+                self.budget.record_usage(TIER_SPECS[tier]["provider"], usage_tokens(chunk))
+                token = chunk_text(chunk)
+                if token:
+                    emitted.append(token)
+                    yield token
+            health.record_success()
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                health.record_failure()
+            fallback = FALLBACK_TIERS.get(tier)
+            if fallback is None:
+                console.print(f"[red]Error contacting Chutes: {e}[/red]")
+                if not partial and not emitted:
+                    yield f"[Fallback] Fast response to: {prompt}"
+                return
+            console.print(f"[red]Stream from '{tier}' died ({e}). '{fallback}' continues...[/red]")
+            yield from self._stream_tier(fallback, prompt, partial + "".join(emitted))
+            return
+
+        if not partial:
+            self.cache_store(tier, model_name, prompt, "".join(emitted), time.perf_counter() - start)
+
+    def athink_stream(self, prompt: str, is_sensitive: bool = False):
+        """Async iterator variant of `think_stream()` on the pooled async clients."""
+        return self.llm_engine.think_stream(prompt, is_sensitive=is_sensitive)
+
+    async def athink(self, prompt: str, is_sensitive: bool = False, hedge_after: float = None) -> str:
+        """
+        Async variant of `think()`. Uses pooled async clients so many prompts can be
+        served concurrently from one process. If `hedge_after` (seconds) is set and the
+        chosen tier has not answered in time, its fallback tier is started in parallel.
+        """
+        return await self.llm_engine.think(prompt, is_sensitive=is_sensitive, hedge_after=hedge_after)
+
+    async def athink_many(self, prompts: list, is_sensitive: bool = False, hedge_after: float = None) -> list:
+        """Runs `athink()` over many prompts concurrently, preserving input order."""
+        return await self.llm_engine.think_many(prompts, is_sensitive=is_sensitive, hedge_after=hedge_after)
+
+    async def athink_batch(self, prompts: list, is_sensitive: bool = False, max_concurrency: int = 8,
+                           merge_size: int = 8) -> list:
+        """
+        Batch prompt API. Classifies all prompts in one pass, groups them by tier/model,
+        merges short System 1 prompts into multi-prompt requests and runs the rest with
+        bounded concurrency. Returns one dict per prompt, in input order:
+        {"index", "prompt", "tier", "output", "error"}.
+        """
+        from batch_router import BatchRouter
+        router = BatchRouter(self.llm_engine, max_concurrency=max_concurrency, merge_size=merge_size)
+        return await router.run(prompts, is_sensitive=is_sensitive)
+
+    def think_batch(self, prompts: list, is_sensitive: bool = False, max_concurrency: int = 8,
+                    merge_size: int = 8) -> list:
+        """Blocking wrapper around `athink_batch()` (not for use inside a running event loop)."""
+        return self.llm_engine.run(self.athink_batch(prompts, is_sensitive, max_concurrency, merge_size))
 
     def _evaluate_complexity(self, prompt: str) -> str:
-        # Heuristic v2.6 (Cortex Edition)
-        if "critical" in prompt.lower() or "architect" in prompt.lower() or "hyper" in prompt.lower() or "supreme" in prompt.lower():
-            return "insane"
-            
-        if len(prompt) > 100:
-            return "high"
-            
-        keywords = ["plan", "analyze", "analysis", "code", "context", "history", "research", "deep"]
-        if any(k in prompt.lower() for k in keywords):
-            return "high"
-            
-        return "low"
+        # Heuristic v2.11: pluggable classifier (keyword automaton + trained linear model)
+        return self.classifier.classify(prompt)
 
 
 
@@ -253,6 +448,28 @@ class BrainRouter:
             console.print(f"[red]Gopher Search failed: {e}[/red]")
             return []
 
+    def stream_web(self, url: str):
+        """Streams Gopher (SN42) pages for a URL as they arrive, so processing can start on the first one."""
+        console.print(f"[blue]Gopher: Streaming {url}...[/blue]")
+        try:
+            yield from self.gopher_client.iter_scrape(url)
+        except Exception as e:
+            console.print(f"[red]Gopher Search failed: {e}[/red]")
+
+    def search_web_many(self, urls: list, max_concurrency: int = 8) -> dict:
+        """Scrapes many URLs concurrently with Gopher (SN42). Returns {url: results} ([] on failure)."""
+        import http_transport
+        return http_transport.run(self.asearch_web_many(urls, max_concurrency))
+
+    async def asearch_web_many(self, urls: list, max_concurrency: int = 8) -> dict:
+        console.print(f"[blue]Gopher: Indexing {len(urls)} URLs concurrently...[/blue]")
+        try:
+            results = await self.gopher_client.ascrape_many(urls, max_concurrency=max_concurrency)
+        except Exception as e:
+            console.print(f"[red]Gopher Search failed: {e}[/red]")
+            return {url: [] for url in urls}
+        return {url: results.get(url) or [] for url in urls}
+
     def see(self, media_url: str, query: str = None) -> str:
         """
         Uses Manako (SN44) to analyze images or videos.
@@ -0,0 +1,174 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from rich.console import Console
+
+console = Console()
+
+# Requests per minute allowed per provider (token bucket refill rate)
+DEFAULT_RPM = {"chutes": 120, "targon": 30, "basilica": 30}
+
+
+class TokenBucket:
+    """
+    Classic token bucket. `reserve()` always takes a token (possibly going into debt)
+    and returns how long the caller must wait, so sync and async callers can both sleep.
+    """
+    def __init__(self, rate_per_s: float, capacity: float):
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class BudgetScheduler:
+    """
+    Token- and cost-aware budget scheduler driven by status_frota.json.
+    - per-provider token-bucket rate limits (requests/minute),
+    - deducts completion token usage from each provider's `saldo`,
+    - batches updates and writes them atomically (tmp file + os.replace),
+    - reports when a provider nears its `limite` so callers can degrade.
+    """
+    def __init__(self, status_path: str = "status_frota.json", flush_interval: float = 5.0,
+                 flush_every: int = 20, rpm: Optional[Dict[str, float]] = None, degrade_margin: float = 0.05):
+        self.status_path = status_path
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.degrade_margin = degrade_margin
+
+        self._status = self._read_status()
+        self._pending: Dict[str, int] = {}
+        self._pending_updates = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        rates = {**DEFAULT_RPM, **(rpm or {})}
+        self._buckets = {}
+        for provider, per_minute in rates.items():
+            per_minute = float(os.getenv(f"BUDGET_RPM_{provider.upper()}", per_minute))
+            self._buckets[provider] = TokenBucket(per_minute / 60.0, capacity=max(1.0, per_minute / 6.0))
+
+        atexit.register(self.flush)
+
+    def _read_status(self) -> dict:
+        if not os.path.exists(self.status_path):
+            return {}
+        try:
+            with open(self.status_path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            console.print(f"[red]Error reading {self.status_path}: {e}[/red]")
+            return {}
+
+    # --- Rate limiting ---
+
+    def reserve(self, provider: str) -> float:
+        """Takes one request slot for a provider; returns the delay (s) the caller must wait."""
+        bucket = self._buckets.get(provider)
+        return bucket.reserve() if bucket else 0.0
+
+    def acquire(self, provider: str):
+        """Blocking rate limit for sync callers."""
+        delay = self.reserve(provider)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, provider: str):
+        """Non-blocking rate limit for asyncio callers."""
+        import asyncio
+        delay = self.reserve(provider)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # --- Spend tracking ---
+
+    def balance(self, provider: str) -> Optional[float]:
+        """Current `saldo` including usage not yet flushed to disk (None if untracked)."""
+        entry = self._status.get(provider)
+        if entry is None:
+            return None
+        return entry.get("saldo", 0) - self._pending.get(provider, 0)
+
+    def near_limit(self, provider: str) -> bool:
+        """True once a provider's balance is within `degrade_margin` of its `limite`."""
+        entry = self._status.get(provider)
+        if entry is None or "limite" not in entry:
+            return False
+        return self.balance(provider) <= entry["limite"] * (1.0 + self.degrade_margin)
+
+    def exhausted(self, provider: str) -> bool:
+        balance = self.balance(provider)
+        return balance is not None and balance <= 0
+
+    def record_usage(self, provider: str, tokens: int):
+        """Deducts used tokens from a provider. Written to disk in batches."""
+        if not tokens or provider not in self._status:
+            return
+        with self._lock:
+            self._pending[provider] = self._pending.get(provider, 0) + int(tokens)
+            self._pending_updates += 1
+            due = (self._pending_updates >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Applies pending deductions to the status file atomically."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._pending_updates = 0
+            self._last_flush = time.monotonic()
+
+            # Re-read so edits made by other processes (e.g. a top-up) are not overwritten
+            status = self._read_status() or self._status
+            for provider, used in pending.items():
+                if provider in status:
+                    status[provider]["saldo"] = status[provider].get("saldo", 0) - used
+
+            tmp_path = f"{self.status_path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(status, f)
+                os.replace(tmp_path, self.status_path)
+                self._status = status
+            except Exception as e:
+                console.print(f"[red]Failed to persist {self.status_path}: {e}[/red]")
+                for provider, used in pending.items():
+                    self._pending[provider] = self._pending.get(provider, 0) + used
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_budget() -> BudgetScheduler:
+    """Process-wide scheduler shared by BrainRouter and BasilicaSandbox (one batched writer)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BudgetScheduler(os.getenv("BUDGET_STATUS_PATH", "status_frota.json"))
+        return _shared
+
+
+def usage_tokens(response) -> int:
+    """Total tokens reported by an OpenAI-compatible response or final stream chunk (0 if absent)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0
+    return getattr(usage, "total_tokens", 0) or 0
@@ -1,16 +1,22 @@
 #!/usr/bin/env python3
 import argparse
-import time
 import json
+import time
 import sys
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
+from rich.live import Live
 from rich import box
 from mcp_client import MCPClient
+from subnet_history import SubnetHistory
+
+# Used when "all" is requested and Taostats cannot list the pools in one call
+MAX_NETUID = 128
 
 def format_currency(value_str):
     if not value_str: return "N/A"
@@ -28,10 +34,168 @@ def format_number(value_str):
     except:
         return value_str
 
-def main():
+def render_subnet(console, result):
+    """Prints the Key Metrics / Network Details tables for one GetLatestSubnetPool result."""
+    if result and "content" in result and len(result["content"]) > 0:
+        content = result["content"][0]
+        if content.get("type") == "text":
+            data_obj = content["text"] # already parsed by client
+            if isinstance(data_obj, dict) and "data" in data_obj and len(data_obj["data"]) > 0:
+                data = data_obj["data"][0]
+                
+                # Create Layout
+                console.print("\n")
+                
+                # Header Panel
+                title = f"[bold gold1]{data.get('name', 'Unknown')}[/bold gold1] [white](Subnet {data.get('netuid')})[/white]"
+                symbol = data.get('symbol', '')
+                console.print(Panel(title, subtitle=f"Symbol: {symbol}", expand=False, border_style="blue"))
+                
+                # Key Metrics Table
+                table = Table(title="Key Metrics", box=box.ROUNDED, show_header=True, header_style="bold magenta")
+                table.add_column("Metric", style="cyan")
+                table.add_column("Value", style="bold white")
+                
+                # Highlighted metrics
+                price = format_currency(data.get('price', '0'))
+                price_change = data.get('price_change_1_day', '0%')
+                p_color = "green" if not price_change.startswith("-") else "red"
+                
+                table.add_row("Price", f"[gold1]{price}[/gold1] ([{p_color}]{price_change}[/{p_color}])")
+                table.add_row("Market Cap", format_currency(data.get('market_cap', '0')))
+                table.add_row("Liquidity", format_currency(data.get('liquidity', '0')))
+                table.add_row("24h Volume", format_currency(data.get('tao_volume_24_hr', '0')))
+                
+                # 24h Activity
+                table.add_row("24h Buys", str(data.get('buys_24_hr', '0')))
+                table.add_row("24h Sells", str(data.get('sells_24_hr', '0')))
+                table.add_row("24h Buyers", str(data.get('buyers_24_hr', '0')))
+                table.add_row("24h Sellers", str(data.get('sellers_24_hr', '0')))
+                
+                console.print(table)
+                
+                # Details Table
+                grid = Table.grid(expand=True)
+                grid.add_column()
+                grid.add_column(justify="right")
+                
+                d_table = Table(title="Network Details", box=box.SIMPLE)
+                d_table.add_column("Property", style="dim")
+                d_table.add_column("Value")
+                
+                d_table.add_row("Block Number", str(data.get('block_number')))
+                d_table.add_row("Total TAO", format_number(data.get('total_tao')))
+                d_table.add_row("Total Alpha", format_number(data.get('total_alpha')))
+                d_table.add_row("Recycle/Registered", f"{data.get('start_block')}/{data.get('registered')}" if 'registered' in data else "N/A")
+                
+                console.print(d_table)
+                print("\n")
+
+            else:
+                console.print("[red]No data found for this subnet.[/red]")
+                console.print(data_obj)
+    else:
+        console.print("[bold red]Failed to retrieve data.[/bold red]")
+        if result:
+            console.print(result)
+
+def pool_data(result):
+    """First GetLatestSubnetPool record from a tool result, or None."""
+    if result and result.get("content"):
+        data_obj = result["content"][0].get("text")
+        if isinstance(data_obj, dict) and data_obj.get("data"):
+            return data_obj["data"][0]
+    return None
+
+def netuid_arg(value):
+    """argparse type for the positional netuids: a non-negative integer or "all"."""
+    if value.lower() == "all":
+        return "all"
+    try:
+        netuid = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid netuid '{value}' (expected an integer or 'all')")
+    if netuid < 0:
+        raise argparse.ArgumentTypeError(f"invalid netuid '{value}' (must be >= 0)")
+    return netuid
+
+def resolve_netuids(client, values):
+    """Expands the CLI arguments into netuids; "all" lists every pool known to Taostats."""
+    if "all" not in values:
+        return sorted({int(v) for v in values})
+    result = client.call_tool("GetLatestSubnetPool", {"limit": MAX_NETUID + 1})
+    data_obj = result["content"][0].get("text") if result and result.get("content") else None
+    if isinstance(data_obj, dict) and len(data_obj.get("data", [])) > 1:
+        return sorted({int(d["netuid"]) for d in data_obj["data"] if "netuid" in d})
+    return list(range(1, MAX_NETUID + 1))
+
+def fetch_pools(client, netuids, use_cache=True):
+    """Fetches every netuid concurrently over the client's single MCP session."""
+    results = client.call_many([("GetLatestSubnetPool", {"netuid": n}) for n in netuids], use_cache=use_cache)
+    return {n: pool_data(r) for n, r in zip(netuids, results)}
+
+def pool_row(netuid, data):
+    if data is None:
+        return (str(netuid), "[red]unavailable[/red]", "", "", "", "", "", "", "")
+    price_change = str(data.get('price_change_1_day', '0%'))
+    p_color = "green" if not price_change.startswith("-") else "red"
+    return (
+        str(netuid),
+        str(data.get('name', 'Unknown')),
+        str(data.get('symbol', '')),
+        format_currency(data.get('price', '0')),
+        f"[{p_color}]{price_change}[/{p_color}]",
+        format_currency(data.get('market_cap', '0')),
+        format_currency(data.get('liquidity', '0')),
+        format_currency(data.get('tao_volume_24_hr', '0')),
+        f"{data.get('buys_24_hr', '0')}/{data.get('sells_24_hr', '0')}",
+    )
+
+@lru_cache(maxsize=4096)
+def row_cells(row):
+    """Parsed cells of a dashboard row. Cached by content, so --watch only re-parses rows that changed."""
+    return tuple(Text.from_markup(cell) for cell in row)
+
+def build_dashboard(rows, changed=(), elapsed=None):
+    """
+    One combined table for every subnet; rows that changed since the last sweep are highlighted.
+    Unchanged rows reuse their parsed cells (rich still lays out the whole table on each refresh).
+    """
+    caption = f"{len(rows)} subnets" + (f" · fetched in {elapsed:.1f}s" if elapsed is not None else "")
+    table = Table(title="Subnet Pools", caption=caption, box=box.ROUNDED, header_style="bold magenta")
+    for column in ["NetUID", "Name", "Symbol", "Price", "24h", "Market Cap", "Liquidity", "24h Volume", "Buys/Sells"]:
+        table.add_column(column, justify="right" if column not in ("Name", "Symbol") else "left")
+    for netuid in sorted(rows):
+        table.add_row(*row_cells(rows[netuid]), style="on grey23" if netuid in changed else None)
+    return table
+
+def sweep(client, netuids, rows, history=None, use_cache=True):
+    """Refreshes `rows` in place; returns the netuids whose row changed and the sweep duration."""
+    start = time.perf_counter()
+    pools = fetch_pools(client, netuids, use_cache)
+    if history is not None:
+        history.append(data for data in pools.values() if data)
+    changed = set()
+    for netuid, data in pools.items():
+        row = pool_row(netuid, data)
+        if rows.get(netuid) != row:
+            rows[netuid] = row
+            changed.add(netuid)
+    return changed, time.perf_counter() - start
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Check Bittensor Subnet Metrics via Taostats MCP")
-    parser.add_argument("netuid", type=int, help="The Subnet NetUID (e.g., 33 for ReadyAI)")
-    args = parser.parse_args()
+    parser.add_argument("netuid", nargs="+", type=netuid_arg,
+                        help="One or more Subnet NetUIDs (e.g., 33 for ReadyAI), or 'all'")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max Taostats calls in flight (default: 16)")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="Refresh the dashboard every N seconds (changed rows are highlighted)")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Do not append snapshots to the local subnet history store")
+    return parser
+
+def main():
+    args = build_parser().parse_args()
 
     load_dotenv()
     url = os.getenv("TAOSTATS_MCP_URL")
@@ -40,83 +204,48 @@ def main():
         sys.exit(1)
 
     console = Console()
-    console.print(f"[bold blue]Connecting to Taostats MCP...[/bold blue] (Target: Subnet {args.netuid})")
+    targets = ", ".join(map(str, args.netuid))
+    console.print(f"[bold blue]Connecting to Taostats MCP...[/bold blue] (Target: Subnet {targets})")
     
-    client = MCPClient(url)
+    client = MCPClient(url, max_in_flight=args.concurrency)
     
-    if client.connect():
-        # Give it a moment to stabilize the connection
-        time.sleep(1)
-        
-        with console.status(f"[bold green]Fetching data for Subnet {args.netuid}...[/bold green]"):
-            result = client.call_tool("GetLatestSubnetPool", {"netuid": args.netuid})
-            time.sleep(1) # simulate/wait for network slightly if needed, though call_tool is blocking now
-
-        if result and "content" in result and len(result["content"]) > 0:
-            content = result["content"][0]
-            if content.get("type") == "text":
-                data_obj = content["text"] # already parsed by client
-                if isinstance(data_obj, dict) and "data" in data_obj and len(data_obj["data"]) > 0:
-                    data = data_obj["data"][0]
-                    
-                    # Create Layout
-                    console.print("\n")
-                    
-                    # Header Panel
-                    title = f"[bold gold1]{data.get('name', 'Unknown')}[/bold gold1] [white](Subnet {data.get('netuid')})[/white]"
-                    symbol = data.get('symbol', '')
-                    console.print(Panel(title, subtitle=f"Symbol: {symbol}", expand=False, border_style="blue"))
-                    
-                    # Key Metrics Table
-                    table = Table(title="Key Metrics", box=box.ROUNDED, show_header=True, header_style="bold magenta")
-                    table.add_column("Metric", style="cyan")
-                    table.add_column("Value", style="bold white")
-                    
-                    # Highlighted metrics
-                    price = format_currency(data.get('price', '0'))
-                    price_change = data.get('price_change_1_day', '0%')
-                    p_color = "green" if not price_change.startswith("-") else "red"
-                    
-                    table.add_row("Price", f"[gold1]{price}[/gold1] ([{p_color}]{price_change}[/{p_color}])")
-                    table.add_row("Market Cap", format_currency(data.get('market_cap', '0')))
-                    table.add_row("Liquidity", format_currency(data.get('liquidity', '0')))
-                    table.add_row("24h Volume", format_currency(data.get('tao_volume_24_hr', '0')))
-                    
-                    # 24h Activity
-                    table.add_row("24h Buys", str(data.get('buys_24_hr', '0')))
-                    table.add_row("24h Sells", str(data.get('sells_24_hr', '0')))
-                    table.add_row("24h Buyers", str(data.get('buyers_24_hr', '0')))
-                    table.add_row("24h Sellers", str(data.get('sellers_24_hr', '0')))
-                    
-                    console.print(table)
-                    
-                    # Details Table
-                    grid = Table.grid(expand=True)
-                    grid.add_column()
-                    grid.add_column(justify="right")
-                    
-                    d_table = Table(title="Network Details", box=box.SIMPLE)
-                    d_table.add_column("Property", style="dim")
-                    d_table.add_column("Value")
-                    
-                    d_table.add_row("Block Number", str(data.get('block_number')))
-                    d_table.add_row("Total TAO", format_number(data.get('total_tao')))
-                    d_table.add_row("Total Alpha", format_number(data.get('total_alpha')))
-                    d_table.add_row("Recycle/Registered", f"{data.get('start_block')}/{data.get('registered')}" if 'registered' in data else "N/A")
-                    
-                    console.print(d_table)
-                    print("\n")
-
-                else:
-                    console.print("[red]No data found for this subnet.[/red]")
-                    console.print(data_obj)
-        else:
-            console.print("[bold red]Failed to retrieve data.[/bold red]")
-            if result:
-                console.print(result)
-
-    else:
+    if not client.connect():
         console.print("[bold red]Failed to connect to MCP server.[/bold red]")
+        return
+
+    history = None if args.no_history else SubnetHistory()
+    try:
+        netuids = resolve_netuids(client, args.netuid)
+
+        # Single subnet: detailed view
+        if len(netuids) == 1 and args.watch is None:
+            with console.status(f"[bold green]Fetching data for Subnet {netuids[0]}...[/bold green]"):
+                result = client.call_tool("GetLatestSubnetPool", {"netuid": netuids[0]})
+            if history is not None:
+                history.append_result(result)
+            render_subnet(console, result)
+            return
+
+        rows = {}
+        with console.status(f"[bold green]Fetching {len(netuids)} subnets ({args.concurrency} in flight)...[/bold green]"):
+            changed, elapsed = sweep(client, netuids, rows, history)
+
+        if args.watch is None:
+            console.print(build_dashboard(rows, elapsed=elapsed))
+            return
+
+        with Live(build_dashboard(rows, elapsed=elapsed), console=console, auto_refresh=False) as live:
+            try:
+                while True:
+                    time.sleep(args.watch)
+                    # Every tick asks Taostats directly: a cached pool would hide updates for up to its TTL
+                    changed, elapsed = sweep(client, netuids, rows, history, use_cache=False)
+                    if changed:
+                        live.update(build_dashboard(rows, changed, elapsed), refresh=True)
+            except KeyboardInterrupt:
+                pass
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     main()
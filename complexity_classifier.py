@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+LABELS = ["low", "high", "insane"]
+TIER_OF_LABEL = {"low": "fast", "high": "deep", "insane": "cortex"}
+
+# Relative cost and typical latency (s) per label, used by the benchmark harness
+DEFAULT_COSTS = {"low": 1.0, "high": 8.0, "insane": 20.0}
+DEFAULT_LATENCIES = {"low": 1.2, "high": 9.0, "insane": 4.0}
+
+# Small hand-labelled bootstrap set (used when no routing log exists yet)
+SEED_EXAMPLES = [
+    ("Hi there!", "low"),
+    ("Thanks, that worked.", "low"),
+    ("What time is it in Lisbon?", "low"),
+    ("Translate 'good morning' to Portuguese.", "low"),
+    ("Give me a one line summary of this tweet: TAO just hit a new high, bullish on subnets!", "low"),
+    ("Summarize this Vanta signal in one sentence: miner 5Hb opened a 20x BTCUSD short at 65000.", "low"),
+    ("Is this Gopher result relevant to the query 'bittensor validators'? Answer yes or no.", "low"),
+    ("Rewrite this sentence to sound friendlier: your payout request was denied because the high watermark was not beaten.", "low"),
+    ("Classify the sentiment of: 'Subnet 8 emissions look weak this week'.", "low"),
+    ("Reply politely that we will check the issue tomorrow and thank the user for the detailed report they sent us.", "low"),
+    ("Plan a marketing strategy for a new coffee brand.", "high"),
+    ("Analyze the liquidity risk of providing USDC to the ETH/USD pool.", "high"),
+    ("Write Python code that retries a websocket connection with exponential backoff.", "high"),
+    ("Give me a deep history of the Bittensor network in 2024.", "high"),
+    ("Research how dynamic TAO changes subnet emissions and explain the consequences.", "high"),
+    ("Compare three strategies for rebalancing a crypto portfolio under high volatility.", "high"),
+    ("Debug why this function returns None when the list is empty and propose a fix.", "high"),
+    ("Explain step by step how the Taoshi high watermark payout rule works with an example.", "high"),
+    ("Design a database schema for storing subnet pool snapshots and justify each index.", "high"),
+    ("Evaluate the trade-offs between running a validator and a miner on subnet 13.", "high"),
+    ("CRITICAL: Design a supreme architecture for a planetary governance AI using game theory.", "insane"),
+    ("Act as the architect: formally verify this smart contract upgrade before we move funds.", "insane"),
+    ("Critical decision: should we liquidate all positions now? Prove the optimal policy.", "insane"),
+    ("Hyper-logic mode: find the game-theoretic equilibrium for validator collusion on subnet 4.", "insane"),
+    ("Supreme judge: arbitrate between these two conflicting risk reports and produce a binding verdict.", "insane"),
+]
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class KeywordClassifier:
+    """
+    Keyword router compiled into a single regex automaton.
+    One pass over the prompt finds every cue; the most severe label wins.
+    """
+    INSANE_CUES = ["critical", "architect", "hyper", "supreme"]
+    HIGH_CUES = ["plan", "analy[sz]", "code", "context", "history", "research", "deep"]
+
+    def __init__(self, insane_cues: Optional[List[str]] = None, high_cues: Optional[List[str]] = None):
+        insane = "|".join(insane_cues or self.INSANE_CUES)
+        high = "|".join(high_cues or self.HIGH_CUES)
+        self._pattern = re.compile(rf"\b(?:(?P<insane>{insane})|(?P<high>{high}))", re.IGNORECASE)
+
+    def classify_with_confidence(self, prompt: str) -> Tuple[str, float]:
+        label = "low"
+        for match in self._pattern.finditer(prompt):
+            if match.lastgroup == "insane":
+                return "insane", 1.0
+            label = "high"
+        return label, 1.0 if label == "high" else 0.5
+
+    def classify(self, prompt: str) -> str:
+        return self.classify_with_confidence(prompt)[0]
+
+
+class HashedLinearClassifier:
+    """
+    Multinomial logistic regression over hashed word uni/bi-grams plus
+    prompt-length buckets. Sparse, dependency-free, and trainable offline.
+    """
+    def __init__(self, n_features: int = 2 ** 18, labels: Optional[List[str]] = None):
+        self.n_features = n_features
+        self.labels = labels or list(LABELS)
+        self.weights: Dict[str, Dict[int, float]] = {label: {} for label in self.labels}
+        self.bias: Dict[str, float] = {label: 0.0 for label in self.labels}
+
+    def _features(self, prompt: str) -> Dict[int, float]:
+        tokens = re.findall(r"[a-z0-9']+", prompt.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        grams.append(f"__len_{min(len(tokens) // 10, 20)}")
+        grams.append(f"__qmarks_{min(prompt.count('?'), 3)}")
+
+        features: Dict[int, float] = defaultdict(float)
+        for gram in grams:
+            digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest, "little") % self.n_features
+            features[index] += 1.0
+        norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+        return {i: v / norm for i, v in features.items()}
+
+    def _scores(self, features: Dict[int, float]) -> Dict[str, float]:
+        return {
+            label: self.bias[label] + sum(self.weights[label].get(i, 0.0) * v for i, v in features.items())
+            for label in self.labels
+        }
+
+    def predict_proba(self, prompt: str) -> Dict[str, float]:
+        scores = self._scores(self._features(prompt))
+        top = max(scores.values())
+        exps = {label: math.exp(s - top) for label, s in scores.items()}
+        total = sum(exps.values())
+        return {label: e / total for label, e in exps.items()}
+
+    def classify_with_confidence(self, prompt: str) -> Tuple[str, float]:
+        proba = self.predict_proba(prompt)
+        label = max(proba, key=proba.get)
+        return label, proba[label]
+
+    def classify(self, prompt: str) -> str:
+        return self.classify_with_confidence(prompt)[0]
+
+    def fit(self, examples: List[Tuple[str, str]], epochs: int = 30, lr: float = 0.5, l2: float = 1e-4):
+        """Trains with plain SGD on (prompt, label) pairs."""
+        data = [(self._features(p), label) for p, label in examples if label in self.labels]
+        for epoch in range(epochs):
+            step = lr / (1.0 + epoch * 0.1)
+            for features, target in data:
+                scores = self._scores(features)
+                top = max(scores.values())
+                exps = {label: math.exp(s - top) for label, s in scores.items()}
+                total = sum(exps.values())
+                for label in self.labels:
+                    grad = exps[label] / total - (1.0 if label == target else 0.0)
+                    weights = self.weights[label]
+                    for i, v in features.items():
+                        weights[i] = weights.get(i, 0.0) * (1.0 - step * l2) - step * grad * v
+                    self.bias[label] -= step * grad
+        return self
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({
+                "n_features": self.n_features,
+                "labels": self.labels,
+                "bias": self.bias,
+                "weights": {label: {str(i): w for i, w in ws.items() if abs(w) > 1e-6}
+                            for label, ws in self.weights.items()}
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HashedLinearClassifier":
+        with open(path, "r") as f:
+            data = json.load(f)
+        model = cls(n_features=data["n_features"], labels=data["labels"])
+        model.bias = data["bias"]
+        model.weights = {label: {int(i): w for i, w in ws.items()} for label, ws in data["weights"].items()}
+        return model
+
+
+class HybridClassifier:
+    """
+    Default router: explicit Cortex cues always escalate (keyword automaton);
+    otherwise a trained linear model decides when it is confident enough,
+    and the keyword result is used as the fallback.
+    """
+    def __init__(self, model: Optional[HashedLinearClassifier] = None, min_confidence: float = 0.6):
+        self.keywords = KeywordClassifier()
+        self.model = model
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def load_default(cls) -> "HybridClassifier":
+        """Loads the trained model from BRAIN_ROUTER_MODEL (default: routing_model.json) if present."""
+        path = os.getenv("BRAIN_ROUTER_MODEL", "routing_model.json")
+        model = None
+        if os.path.exists(path):
+            try:
+                model = HashedLinearClassifier.load(path)
+            except Exception as e:
+                console.print(f"[red]Failed to load routing model {path}: {e}. Using keywords only.[/red]")
+        return cls(model=model)
+
+    def classify_with_confidence(self, prompt: str) -> Tuple[str, float]:
+        label, confidence = self.keywords.classify_with_confidence(prompt)
+        if label == "insane" or self.model is None:
+            return label, confidence
+        model_label, model_confidence = self.model.classify_with_confidence(prompt)
+        if model_confidence >= self.min_confidence:
+            return model_label, model_confidence
+        return label, confidence
+
+    def classify(self, prompt: str) -> str:
+        return self.classify_with_confidence(prompt)[0]
+
+
+class RoutingLog:
+    """
+    Append-only JSONL log of routing decisions and their observed outcome,
+    used to retrain the classifier offline.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def record(self, prompt: str, label: str, latency: float, ok: bool = True, quality: Optional[float] = None):
+        entry = {"ts": time.time(), "prompt": prompt, "label": label,
+                 "latency": round(latency, 4), "ok": ok, "quality": quality}
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def read(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def labels_from_log(records: List[dict], min_quality: float = 0.7) -> List[Tuple[str, str]]:
+    """
+    Derives training labels: for each distinct prompt, the cheapest label whose
+    observed answers were acceptable. If none was, one level above the best tried.
+    """
+    outcomes: Dict[str, Dict[str, List[bool]]] = defaultdict(lambda: defaultdict(list))
+    originals: Dict[str, str] = {}
+    for rec in records:
+        key = normalize_text(rec["prompt"])
+        originals.setdefault(key, rec["prompt"])
+        quality = rec.get("quality")
+        acceptable = rec.get("ok", True) and (quality is None or quality >= min_quality)
+        outcomes[key][rec["label"]].append(acceptable)
+
+    examples = []
+    for key, by_label in outcomes.items():
+        good = [label for label in LABELS
+                if by_label.get(label) and sum(by_label[label]) / len(by_label[label]) >= 0.5]
+        if good:
+            target = good[0]
+        else:
+            best_tried = max(LABELS.index(label) for label in by_label)
+            target = LABELS[min(best_tried + 1, len(LABELS) - 1)]
+        examples.append((originals[key], target))
+    return examples
+
+
+def benchmark(classifier, examples: List[Tuple[str, str]], costs: Dict[str, float] = None,
+              latencies: Dict[str, float] = None) -> dict:
+    """
+    Measures routing accuracy against cost/latency on labelled prompts.
+    Under-routing (cheaper tier than needed) risks quality; over-routing wastes
+    cost and latency. Costs/latencies are relative to the oracle routing.
+    """
+    costs = costs or DEFAULT_COSTS
+    latencies = latencies or DEFAULT_LATENCIES
+    confusion = {t: {p: 0 for p in LABELS} for t in LABELS}
+    correct = under = over = 0
+    cost = oracle_cost = latency = oracle_latency = 0.0
+
+    start = time.perf_counter()
+    predictions = [classifier.classify(prompt) for prompt, _ in examples]
+    elapsed = time.perf_counter() - start
+
+    for (_, truth), predicted in zip(examples, predictions):
+        confusion[truth][predicted] += 1
+        if predicted == truth:
+            correct += 1
+        elif LABELS.index(predicted) < LABELS.index(truth):
+            under += 1
+        else:
+            over += 1
+        cost += costs[predicted]
+        oracle_cost += costs[truth]
+        latency += latencies[predicted]
+        oracle_latency += latencies[truth]
+
+    n = len(examples) or 1
+    return {
+        "n": len(examples),
+        "accuracy": correct / n,
+        "under_routed": under / n,
+        "over_routed": over / n,
+        "cost_vs_oracle": cost / oracle_cost if oracle_cost else 0.0,
+        "mean_latency_s": latency / n,
+        "oracle_latency_s": oracle_latency / n,
+        "classify_us": elapsed / n * 1e6,
+        "confusion": confusion
+    }
+
+
+def print_benchmark(name: str, result: dict):
+    table = Table(title=f"Routing Benchmark: {name} (n={result['n']})")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("Accuracy", f"{result['accuracy']:.1%}")
+    table.add_row("Under-routed", f"{result['under_routed']:.1%}")
+    table.add_row("Over-routed", f"{result['over_routed']:.1%}")
+    table.add_row("Cost vs oracle", f"{result['cost_vs_oracle']:.2f}x")
+    table.add_row("Mean tier latency", f"{result['mean_latency_s']:.2f}s (oracle {result['oracle_latency_s']:.2f}s)")
+    table.add_row("Classify time", f"{result['classify_us']:.1f} µs/prompt")
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and benchmark the BrainRouter complexity classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train = sub.add_parser("train", help="Train the linear router from a routing log (plus seed examples)")
+    train.add_argument("--log", default=os.getenv("BRAIN_ROUTING_LOG", "routing_log.jsonl"))
+    train.add_argument("--out", default=os.getenv("BRAIN_ROUTER_MODEL", "routing_model.json"))
+    train.add_argument("--epochs", type=int, default=30)
+    train.add_argument("--min-quality", type=float, default=0.7)
+
+    bench = sub.add_parser("bench", help="Compare keyword and hybrid routers on labelled prompts")
+    bench.add_argument("--log", default=os.getenv("BRAIN_ROUTING_LOG", "routing_log.jsonl"))
+    bench.add_argument("--model", default=os.getenv("BRAIN_ROUTER_MODEL", "routing_model.json"))
+
+    args = parser.parse_args()
+    logged = labels_from_log(RoutingLog(args.log).read(), getattr(args, "min_quality", 0.7))
+
+    if args.command == "train":
+        examples = SEED_EXAMPLES + logged
+        model = HashedLinearClassifier().fit(examples, epochs=args.epochs)
+        model.save(args.out)
+        console.print(f"[green]Trained on {len(examples)} prompts ({len(logged)} from log). Saved to {args.out}.[/green]")
+    else:
+        examples = logged or SEED_EXAMPLES
+        print_benchmark("keywords", benchmark(KeywordClassifier(), examples))
+        if os.path.exists(args.model):
+            hybrid = HybridClassifier(HashedLinearClassifier.load(args.model))
+            print_benchmark("hybrid", benchmark(hybrid, examples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+class ComponentRegistry:
+    """
+    Lazy registry for BrainRouter subsystems.
+    Each component is declared as "module:attribute" (plus an optional factory) and is
+    only imported and constructed the first time it is requested. Import and init
+    times are recorded so the startup cost of every adapter can be reported.
+    """
+    def __init__(self):
+        self._specs: Dict[str, dict] = {}
+        self._instances: Dict[str, Any] = {}
+        self._timings: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, target: Optional[str] = None, factory: Optional[Callable] = None):
+        """
+        Declares a component without building it.
+        Args:
+            name: Attribute name used to access the component.
+            target: "module:attribute" to import lazily (e.g. "gopher_client:GopherClient").
+            factory: Optional callable building the instance. Receives the imported
+                     attribute when a target is given, otherwise no arguments.
+        """
+        if not target and not factory:
+            raise ValueError(f"Component '{name}' needs a target or a factory.")
+        self._specs[name] = {"target": target, "factory": factory}
+
+    def get(self, name: str):
+        """Returns the component, building it on first use."""
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._lock:
+            # Another thread may have finished the build while we waited
+            if name in self._instances:
+                return self._instances[name]
+
+            spec = self._specs.get(name)
+            if spec is None:
+                raise KeyError(f"Unknown component: {name}")
+
+            import_start = time.perf_counter()
+            resolved = None
+            if spec["target"]:
+                module_name, attr = spec["target"].split(":")
+                resolved = getattr(importlib.import_module(module_name), attr)
+            init_start = time.perf_counter()
+
+            if spec["factory"]:
+                instance = spec["factory"](resolved) if spec["target"] else spec["factory"]()
+            else:
+                instance = resolved()
+            done = time.perf_counter()
+
+            self._timings[name] = {
+                "import_s": init_start - import_start,
+                "init_s": done - init_start,
+                "loaded_at": time.time()
+            }
+            self._instances[name] = instance
+            return instance
+
+    def set(self, name: str, value: Any):
+        """Overrides a component (e.g. a preconfigured client or a test double)."""
+        with self._lock:
+            self._instances[name] = value
+            self._timings.setdefault(name, {"import_s": 0.0, "init_s": 0.0, "loaded_at": time.time()})
+
+    def reset(self, name: str):
+        """Drops a built component so the next access rebuilds it."""
+        with self._lock:
+            self._instances.pop(name, None)
+            self._timings.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm(self, names: Optional[List[str]] = None):
+        """Eagerly builds the given components (or all of them)."""
+        for name in names or list(self._specs):
+            self.get(name)
+
+    def report(self) -> List[dict]:
+        """Returns the load state and cost of every registered component."""
+        rows = []
+        for name, spec in self._specs.items():
+            timing = self._timings.get(name)
+            rows.append({
+                "name": name,
+                "target": spec["target"] or "factory",
+                "loaded": name in self._instances,
+                "import_s": timing["import_s"] if timing else None,
+                "init_s": timing["init_s"] if timing else None
+            })
+        return rows
+
+    def print_report(self):
+        """Renders the startup report as a table."""
+        table = Table(title="BrainRouter Startup Report")
+        table.add_column("Component", style="cyan")
+        table.add_column("Target", style="dim")
+        table.add_column("Loaded")
+        table.add_column("Import (ms)", justify="right")
+        table.add_column("Init (ms)", justify="right")
+
+        total = 0.0
+        for row in self.report():
+            if row["loaded"]:
+                total += row["import_s"] + row["init_s"]
+                table.add_row(row["name"], row["target"], "[green]yes[/green]",
+                              f"{row['import_s'] * 1000:.1f}", f"{row['init_s'] * 1000:.1f}")
+            else:
+                table.add_row(row["name"], row["target"], "[dim]lazy[/dim]", "-", "-")
+
+        console.print(table)
+        console.print(f"[dim]Total paid so far: {total * 1000:.1f} ms[/dim]")
+
+
+class LazyComponent:
+    """
+    Descriptor exposing a registry entry as a plain attribute
+    (e.g. `brain.gopher_client`). Assigning to it overrides the component.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.components.get(self.name)
+
+    def __set__(self, instance, value):
+        instance.components.set(self.name, value)
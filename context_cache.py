@@ -0,0 +1,173 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from rich.console import Console
+
+console = Console()
+
+# Seconds grounded context stays fresh, by where it came from
+DEFAULT_SOURCE_TTLS = {
+    "sn13": 1800.0,       # live Data Universe API
+    "corpus": 86400.0,    # local JSONL/Parquet corpus
+    "index": 600.0,       # answered from the local vector index
+    "simulated": 300.0,
+}
+DEFAULT_TTL = 600.0
+# Stale context is still served (while refreshing in the background) up to this long past its TTL
+DEFAULT_MAX_STALE = 86400.0
+
+TOPIC_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "about", "is", "are", "was",
+    "be", "how", "what", "why", "when", "which", "who", "does", "do", "can", "me", "my", "i", "you",
+    "it", "its", "this", "that", "explain", "tell", "please", "analyze", "analyse", "describe",
+}
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ied", "ers", "er", "es", "ed", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """Light suffix-stripping stemmer (keeps at least 3 characters of stem)."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + ("y" if suffix in ("ies", "ied") else "")
+    return word
+
+
+def topic_key(topic: str) -> str:
+    """Cache key for a topic: lowercased, stop words removed, stemmed, de-duplicated and sorted."""
+    terms = {stem(w) for w in _WORD.findall(topic.lower()) if w not in TOPIC_STOPWORDS}
+    return " ".join(sorted(terms)) or topic.strip().lower()
+
+
+class ContextCache:
+    """
+    Disk-backed cache of grounded context keyed by normalized topic.
+    - per-source TTLs (`ttls`, by the source that produced the context),
+    - stale-while-revalidate: entries past their TTL but within `max_stale` are returned
+      immediately while one background thread refreshes them,
+    - concurrent misses for the same topic share one build,
+    - SQLite persistence so warm topics survive restarts.
+    """
+    def __init__(self, path: Optional[str] = None, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL, max_stale: float = DEFAULT_MAX_STALE):
+        self.path = path or os.getenv("CONTEXT_CACHE_PATH", "context_cache.sqlite")
+        self.ttls = {**DEFAULT_SOURCE_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self.metrics = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "refreshes": 0}
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._refreshing = set()
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS contexts (
+                topic_key TEXT PRIMARY KEY, topic TEXT, context TEXT, source TEXT, stored_at REAL)
+        """)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Builds the cache from CONTEXT_CACHE_* / CONTEXT_TTL_<SOURCE> environment variables."""
+        ttls = {source: float(os.getenv(f"CONTEXT_TTL_{source.upper()}", ttl))
+                for source, ttl in DEFAULT_SOURCE_TTLS.items()}
+        return cls(ttls=ttls, max_stale=float(os.getenv("CONTEXT_CACHE_MAX_STALE", str(DEFAULT_MAX_STALE))))
+
+    def ttl(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, topic: str) -> Optional[Tuple[str, str, float]]:
+        """(context, source, age in seconds) for a topic, regardless of freshness."""
+        with self._lock:
+            row = self._db.execute("SELECT context, source, stored_at FROM contexts WHERE topic_key = ?",
+                                   (topic_key(topic),)).fetchone()
+        return (row[0], row[1], time.time() - row[2]) if row else None
+
+    def put(self, topic: str, context: str, source: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO contexts VALUES (?, ?, ?, ?, ?)",
+                             (topic_key(topic), topic, context, source, time.time()))
+            self._db.commit()
+
+    def fetch(self, topic: str, loader: Callable[[], Tuple[str, Optional[str]]]) -> str:
+        """
+        Context for a topic: fresh entries are returned as is, stale ones are returned while a
+        background refresh runs, misses call `loader()` -> (context, source). A None source
+        means "do not cache" (e.g. no data found).
+        """
+        key = topic_key(topic)
+        cached = self.get(topic)
+        if cached is not None:
+            context, source, age = cached
+            ttl = self.ttl(source)
+            if age <= ttl:
+                self.metrics["hits"] += 1
+                return context
+            if age <= ttl + self.max_stale:
+                self.metrics["stale"] += 1
+                self._refresh_in_background(key, topic, loader)
+                return context
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.metrics["misses"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            context = self._load(topic, loader)
+            future.set_result(context)
+            return context
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _load(self, topic: str, loader) -> str:
+        context, source = loader()
+        if source is not None:
+            self.put(topic, context, source)
+        return context
+
+    def _refresh_in_background(self, key: str, topic: str, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.metrics["refreshes"] += 1
+
+        def refresh():
+            try:
+                self._load(topic, loader)
+            except Exception as e:
+                console.print(f"[yellow]Context refresh for '{topic}' failed, keeping stale copy: {e}[/yellow]")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"context-refresh:{key}", daemon=True).start()
+
+    def invalidate(self, topic: Optional[str] = None):
+        """Drops one topic, or everything."""
+        with self._lock:
+            if topic is None:
+                self._db.execute("DELETE FROM contexts")
+            else:
+                self._db.execute("DELETE FROM contexts WHERE topic_key = ?", (topic_key(topic),))
+            self._db.commit()
+
+    def print_stats(self):
+        m = self.metrics
+        console.print(f"[cyan]🗃️ Context Cache: {m['hits']} fresh / {m['stale']} stale / {m['misses']} misses / "
+                      f"{m['coalesced']} coalesced | {m['refreshes']} background refreshes[/cyan]")
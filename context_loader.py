@@ -1,6 +1,12 @@
+import os
+import time
+from typing import Iterable, Iterator, Optional, Tuple
 from rich.console import Console
 from data_universe import Subnet13Client
 from clean_data import Subnet74Client
+from context_cache import ContextCache
+from grounding_pipeline import GroundingPipeline
+from vector_index import VectorIndex
 
 console = Console()
 
@@ -9,26 +15,128 @@ class ContextLoader:
     The Nexus: Orchestrates the Data & Context Layer (v2.5).
     Connects Memory (SN13) to Filter (SN74) to Grounding.
     """
-    def __init__(self):
+    def __init__(self, index: Optional[VectorIndex] = None, max_age: Optional[float] = None,
+                 cache: Optional[ContextCache] = None):
         self.sn13 = Subnet13Client() # Data Universe
         self.sn74 = Subnet74Client() # Clean Data
+        self._index = index
+        self._cache = cache
+        # Retrieval, cleaning and summarizing overlap; stops once GROUNDING_TARGET good records are in
+        self.pipeline = GroundingPipeline(self.sn13, self.sn74,
+                                          workers=int(os.getenv("GROUNDING_WORKERS", "2")),
+                                          processes=os.getenv("GROUNDING_PROCESSES", "0") == "1",
+                                          target_records=int(os.getenv("GROUNDING_TARGET", "200")) or None)
+        # Seconds a topic's indexed context stays fresh before SN13/SN74 are asked again
+        self.max_age = max_age if max_age is not None else float(os.getenv("CONTEXT_INDEX_TTL", "21600"))
+        # Cosine similarity an indexed chunk needs to ground a topic (chunks of related topics included)
+        self.min_score = float(os.getenv("CONTEXT_MIN_SCORE", "0.15"))
+
+    @property
+    def index(self) -> Optional[VectorIndex]:
+        """Local retrieval index (created on first use); CONTEXT_INDEX=0 disables it."""
+        if self._index is None and os.getenv("CONTEXT_INDEX", "1") != "0":
+            self._index = VectorIndex()
+        return self._index
+
+    @property
+    def cache(self) -> Optional[ContextCache]:
+        """Topic-keyed context cache on disk (created on first use); CONTEXT_CACHE=0 disables it."""
+        if self._cache is None and os.getenv("CONTEXT_CACHE", "1") != "0":
+            self._cache = ContextCache.from_env()
+        return self._cache
 
     def get_deep_context(self, topic: str):
         """
         Retrieves, cleans, and structures deep context for a given topic.
         Target: Zero Hallucination.
+        Served from the topic cache when possible (stale entries refresh in the background).
+        """
+        if self.cache is None:
+            return self._build_context(topic)[0]
+        return self.cache.fetch(topic, lambda: self._build_context(topic))
+
+    def _build_context(self, topic: str) -> Tuple[str, Optional[str]]:
+        """
+        (context, source) for a topic. Warm topics are answered from the local vector index;
+        misses and stale topics go to SN13/SN74 and the cleaned records are (re)indexed.
         """
+        # Indexed chunks are no fresher than the source they were mined from, so a cache
+        # refresh past the source's TTL goes back to SN13 instead of re-serving the index
+        max_age = self.max_age
+        if self.cache is not None:
+            max_age = min(max_age, self.cache.ttl(self.sn13.source))
+        cached = self.indexed_context(topic, max_age=max_age)
+        if cached is not None:
+            return cached, "index"
+
         console.print(f"[bold magenta]🔮 Nexus Signal: Mining Data Universe (SN13) for '{topic}'...[/bold magenta]")
         
-        # 1. Coleta Massiva (Raw Data)
-        raw_data = self.sn13.fetch_bulk(topic, limit=1000)
-        
-        if not raw_data:
-            return "No historical data found."
-
+        # 1. Coleta Massiva + 2. Refinamento (pipelined: cleaning starts with the first page)
         console.print(f"[bold cyan]🔮 Nexus Signal: Refining data with Quality Filter (SN74)...[/bold cyan]")
+        kept = []
+        clean_context, _ = self.pipeline.run(topic, limit=1000, on_record=kept.append)
+        self.pipeline.print_metrics()
+
+        if clean_context is None:
+            return "No historical data found.", None
+
+        # 3. Indexação local para as próximas consultas
+        if self.index is not None and kept:
+            self.index.remove_topic(topic)
+            self.index.add_documents(topic, ((r["text"], r["source"]) for r in kept))
         
-        # 2. Refinamento (Cleaning)
-        clean_context = self.sn74.process(raw_data)
-        
-        return clean_context
+        return clean_context, self.sn13.source
+
+    def indexed_context(self, topic: str, k: int = 8, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Context built from the local index: the k chunks most similar to the topic, across every
+        topic indexed within `max_age` (default self.max_age), scoring at least self.min_score.
+        None when no indexed chunk is relevant enough.
+        """
+        index = self.index
+        if index is None:
+            return None
+        start = time.perf_counter()
+        hits = index.search(topic, k=k, max_age=self.max_age if max_age is None else max_age, min_score=self.min_score)
+        if not hits:
+            return None
+        refreshed = [index.refreshed_at(hit["topic"]) for hit in hits]
+        age = time.time() - min((ts for ts in refreshed if ts is not None), default=time.time())
+        topics = len({hit["topic"] for hit in hits})
+        console.print(f"[bold green]🔮 Nexus Signal: '{topic}' served from local index "
+                      f"({len(hits)} chunks from {topics} topic(s), "
+                      f"{(time.perf_counter() - start) * 1000:.1f}ms)[/bold green]")
+        facts = "\n".join(f"{i}. {hit['text']} (Source: {hit['source']})" for i, hit in enumerate(hits, 1))
+        return f"""
+## Context Summary (Local Index, refreshed {age / 60:.0f} min ago)
+
+**Key Facts regarding Topic:**
+{facts}
+"""
+
+    def stream_deep_context(self, topic: str, limit: int = 1000, batch_size: int = 250) -> Iterator[str]:
+        """
+        Streaming variant of get_deep_context(): SN13 records are refined batch by batch
+        while retrieval continues, so at most one batch is held before cleaning starts.
+        """
+        console.print(f"[bold magenta]🔮 Nexus Signal: Streaming Data Universe (SN13) for '{topic}'...[/bold magenta]")
+        yield from self.refine_stream(self.sn13.stream_bulk(topic, limit=limit), batch_size)
+
+    def stream_web_context(self, pages: Iterable[dict], batch_size: int = 1) -> Iterator[str]:
+        """
+        Refines scraped pages (e.g. BrainRouter.stream_web) batch by batch as they arrive,
+        instead of waiting for the whole scrape to finish.
+        """
+        yield from self.refine_stream(pages, batch_size)
+
+    def refine_stream(self, records: Iterable, batch_size: int) -> Iterator[str]:
+        """Runs SN74 over consecutive batches of `records`, deduplicating across batches."""
+        engine = self.sn74.new_engine()
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield self.sn74.process(batch, engine=engine)
+                batch = []
+        if batch:
+            yield self.sn74.process(batch, engine=engine)
@@ -0,0 +1,147 @@
+import os
+import re
+from typing import List, Optional
+from rich.console import Console
+
+console = Console()
+
+# Context window (tokens) per model. Unknown models fall back to DEFAULT_CONTEXT_TOKENS.
+MODEL_CONTEXT_TOKENS = {
+    "deepseek-ai/DeepSeek-R1": 64000,
+    "chutes/nousresearch/hermes-3-llama-3.1-405b": 32000,
+    "chutes/kimi-k2.5-tee": 128000,
+}
+DEFAULT_CONTEXT_TOKENS = 32000
+
+# Hard cap on grounding tokens, whatever the model allows: long prompts dominate Targon latency and cost
+DEFAULT_GROUNDING_TOKENS = 3000
+
+# Rough BPE behaviour: common words are one token, long words split every ~7 chars,
+# every punctuation mark is its own token
+_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]|\s+")
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = {"the", "and", "for", "with", "that", "this", "from", "what", "how", "are", "was", "about", "into", "its"}
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of `text`. Uses tiktoken (cl100k_base) when installed, otherwise a
+    BPE-like approximation that stays within ~10% on English prose and markdown.
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        if piece.isspace():
+            tokens += piece.count("\n")
+        elif piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 7
+        elif piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def stable_prefix(system_prompt: str) -> str:
+    """
+    Canonical form of the system prompt. Byte-identical across calls so
+    provider-side prompt caching can reuse the prefix.
+    """
+    return "\n".join(line.rstrip() for line in (system_prompt or "").replace("\r\n", "\n").split("\n")).strip()
+
+
+def split_chunks(context: str) -> List[str]:
+    """Splits grounding data into paragraphs / markdown sections / list items."""
+    blocks = re.split(r"\n\s*\n|\n(?=#)", context or "")
+    chunks = []
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.split("\n")
+        # Numbered or bulleted lists rank item by item
+        if len(lines) > 1 and all(re.match(r"\s*(\d+\.|[-*])\s", l) for l in lines[1:]):
+            chunks.append(lines[0])
+            chunks.extend(l.strip() for l in lines[1:])
+        else:
+            chunks.append(block)
+    return chunks
+
+
+def _terms(text: str) -> set:
+    return set(_WORD.findall(text.lower())) - _STOPWORDS
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cuts `text` at a line/word boundary so it fits in `budget` tokens."""
+    if estimate_tokens(text) <= budget:
+        return text
+    words = text.split(" ")
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(" ".join(words[:mid]) + " …") <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo]) + " …" if lo else ""
+
+
+class ContextWindow:
+    """
+    Context-assembly stage for grounded (System 2) prompts.
+    Ranks grounding chunks by relevance to the question and keeps as many as fit
+    the model's token budget: context window minus system prompt, question and
+    completion tokens, capped at `grounding_tokens`.
+    """
+    def __init__(self, grounding_tokens: Optional[int] = None, model_tokens: Optional[dict] = None):
+        self.grounding_tokens = grounding_tokens or int(os.getenv("BRAIN_GROUNDING_TOKENS", DEFAULT_GROUNDING_TOKENS))
+        self.model_tokens = {**MODEL_CONTEXT_TOKENS, **(model_tokens or {})}
+
+    def budget(self, model: str, system_prompt: str, question: str, max_tokens: int) -> int:
+        window = self.model_tokens.get(model, DEFAULT_CONTEXT_TOKENS)
+        free = window - estimate_tokens(system_prompt) - estimate_tokens(question) - max_tokens - 64
+        return max(0, min(self.grounding_tokens, free))
+
+    def select(self, context: str, question: str, budget: int) -> str:
+        """Keeps the most relevant chunks within `budget` tokens, in their original order."""
+        chunks = split_chunks(context)
+        query = _terms(question)
+
+        def score(indexed):
+            i, chunk = indexed
+            overlap = len(query & _terms(chunk))
+            # Overlap first; among ties, earlier chunks (summaries/headers) win
+            return (-overlap, i)
+
+        kept, used = {}, 0
+        for i, chunk in sorted(enumerate(chunks), key=score):
+            cost = estimate_tokens(chunk) + 1
+            if used + cost <= budget:
+                kept[i] = chunk
+                used += cost
+            elif budget - used > 32:
+                kept[i] = truncate_to_tokens(chunk, budget - used - 1)
+                used = budget
+        return "\n".join(kept[i] for i in sorted(kept) if kept[i])
+
+    def assemble(self, system_prompt: str, question: str, context: str, model: str, max_tokens: int) -> str:
+        """User message for a grounded call: trimmed context first, then the question."""
+        budget = self.budget(model, system_prompt, question, max_tokens)
+        selected = self.select(context, question, budget)
+        dropped = estimate_tokens(context) - estimate_tokens(selected)
+        if dropped > 0:
+            console.print(f"[dim]📐 Context window: kept {estimate_tokens(selected)} of "
+                          f"{estimate_tokens(context)} grounding tokens (budget {budget}).[/dim]")
+        if not selected:
+            return question
+        return f"Context from Data Universe (SN13/SN74):\n{selected}\n\nUser Question:\n{question}"
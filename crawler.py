@@ -0,0 +1,259 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from rich.console import Console
+import http_transport
+from scrape_cache import normalize_url
+from stealth_browser import StealthBrowser
+
+console = Console()
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+
+def extract_links(base_url: str, html: str) -> List[str]:
+    """Absolute http(s) links of a page, fragments dropped."""
+    parser = _LinkParser()
+    try:
+        parser.feed(html)
+    except Exception:
+        pass
+    links = []
+    for href in parser.links:
+        url = urljoin(base_url, href.strip()).split("#", 1)[0]
+        if url.startswith(("http://", "https://")):
+            links.append(url)
+    return links
+
+
+class _Domain:
+    """
+    Per-domain politeness state: queued URLs (priority heap), in-flight count, next allowed fetch time
+    and robots.txt (loaded once under the domain's own lock, so domains never wait on each other).
+    """
+    __slots__ = ("queue", "active", "next_at", "interval", "robots", "robots_pending", "lock")
+
+    def __init__(self, interval: float):
+        self.queue: list = []
+        self.active = 0
+        self.next_at = 0.0
+        self.interval = interval
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_pending = False
+        self.lock = threading.Lock()
+
+
+class Crawler:
+    """
+    Crawl frontier scheduler on top of StealthBrowser.
+    - URL frontier with priorities (lower first) and de-duplication on normalized URLs,
+    - per-domain concurrency and request spacing (raised to robots.txt Crawl-delay),
+    - robots.txt fetched once per domain and honoured for `user_agent`,
+    - worker pool fetching pages; the browser reuses one fingerprint session per domain.
+    """
+    def __init__(self, browser: Optional[StealthBrowser] = None, max_workers: int = 16,
+                 per_domain_concurrency: int = 2, per_domain_rate: float = 2.0, max_depth: int = 1,
+                 same_domain: bool = True, respect_robots: bool = True, user_agent: str = "*"):
+        self.browser = browser or StealthBrowser()
+        self.max_workers = max_workers
+        self.per_domain_concurrency = per_domain_concurrency
+        self.interval = 1.0 / per_domain_rate if per_domain_rate > 0 else 0.0
+        self.max_depth = max_depth
+        self.same_domain = same_domain
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+
+        self._domains: Dict[str, _Domain] = {}
+        self._seen = set()
+        self._seq = itertools.count()
+        self._queued = 0
+
+    # --- Frontier ---
+
+    def add(self, url: str, priority: int = 0, depth: int = 0) -> bool:
+        """Queues a URL unless it was already seen. Returns True if it was added."""
+        key = normalize_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        domain = self._domain(url)
+        heapq.heappush(domain.queue, (priority, next(self._seq), url, depth))
+        self._queued += 1
+        return True
+
+    def _domain(self, url: str) -> _Domain:
+        host = (urlsplit(url).hostname or "").lower()
+        if host not in self._domains:
+            self._domains[host] = _Domain(self.interval)
+        return self._domains[host]
+
+    def _next_ready(self, now: float):
+        """
+        Best-priority URL among domains with a free slot whose spacing has elapsed.
+        Returns (item, domain, wait): wait is the time until the next domain becomes ready if none is.
+        """
+        best, best_domain, wait_for = None, None, None
+        for domain in self._domains.values():
+            # Nothing is dispatched before robots.txt (and its Crawl-delay) is known
+            if self.respect_robots and domain.robots is None:
+                continue
+            if not domain.queue or domain.active >= self.per_domain_concurrency:
+                continue
+            if domain.next_at > now:
+                delay = domain.next_at - now
+                wait_for = delay if wait_for is None else min(wait_for, delay)
+                continue
+            if best is None or domain.queue[0] < best:
+                best, best_domain = domain.queue[0], domain
+        if best is None:
+            return None, None, wait_for
+        heapq.heappop(best_domain.queue)
+        self._queued -= 1
+        return best, best_domain, 0.0
+
+    # --- Robots ---
+
+    def allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        domain = self._domain(url)
+        self._ensure_robots(domain, url)
+        return domain.robots.can_fetch(self.user_agent, url)
+
+    def _ensure_robots(self, domain: _Domain, url: str):
+        with domain.lock:
+            if domain.robots is None:
+                robots = self._load_robots(url)
+                delay = robots.crawl_delay(self.user_agent)
+                if delay:
+                    domain.interval = max(domain.interval, float(delay))
+                domain.robots = robots
+
+    def _load_robots(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        robots = RobotFileParser(f"{parts.scheme}://{parts.netloc}/robots.txt")
+        try:
+            resp = http_transport.get(robots.url, timeout=10)
+            if resp.status_code in (401, 403):
+                robots.disallow_all = True
+            elif resp.status_code == 200:
+                robots.parse(resp.text.splitlines())
+            else:
+                robots.allow_all = True
+        except Exception as e:
+            console.print(f"[yellow]robots.txt unavailable for {parts.netloc}: {e}[/yellow]")
+            robots.allow_all = True
+        return robots
+
+    # --- Workers ---
+
+    def _fetch(self, url: str, depth: int) -> dict:
+        result = {"url": url, "depth": depth, "status": None, "content": None, "links": [], "error": None}
+        try:
+            resp = self.browser.browse(url)
+            result["status"] = resp.status_code
+            result["content"] = resp.text
+            if depth < self.max_depth and "html" in resp.headers.get("Content-Type", "html"):
+                result["links"] = extract_links(url, resp.text)
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def crawl(self, seeds: Iterable[str] = (), max_pages: int = 100) -> Iterator[dict]:
+        """
+        Crawls from `seeds` (plus anything already queued) and yields page results as they finish:
+        {"url", "depth", "status", "content", "links", "error"}.
+        """
+        for url in seeds:
+            self.add(url)
+        seed_hosts = set(self._domains)
+        dispatched = 0
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while in_flight or (self._queued and dispatched < max_pages):
+                wait_for = None
+                if self.respect_robots:
+                    # robots.txt loads run on the pool too, one per domain, and do not count as pages
+                    for domain in self._domains.values():
+                        if domain.queue and domain.robots is None and not domain.robots_pending:
+                            domain.robots_pending = True
+                            in_flight[pool.submit(self._ensure_robots, domain, domain.queue[0][2])] = (None, domain)
+                while len(in_flight) < self.max_workers and dispatched < max_pages:
+                    now = time.monotonic()
+                    item, domain, ready_in = self._next_ready(now)
+                    if item is None:
+                        wait_for = ready_in
+                        break
+                    priority, _, url, depth = item
+                    if self.respect_robots and not domain.robots.can_fetch(self.user_agent, url):
+                        yield {"url": url, "depth": depth, "status": None, "content": None, "links": [],
+                               "error": "disallowed by robots.txt"}
+                        continue
+                    domain.active += 1
+                    domain.next_at = now + domain.interval
+                    in_flight[pool.submit(self._fetch, url, depth)] = (priority, domain)
+                    dispatched += 1
+
+                if not in_flight:
+                    if wait_for is None:
+                        break
+                    time.sleep(wait_for)
+                    continue
+
+                done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in done:
+                    priority, domain = in_flight.pop(future)
+                    if priority is None:
+                        future.result()  # robots.txt is in; the domain's URLs can be dispatched
+                        continue
+                    domain.active -= 1
+                    result = future.result()
+                    for link in result["links"]:
+                        host = (urlsplit(link).hostname or "").lower()
+                        if self.same_domain and host not in seed_hosts:
+                            continue
+                        self.add(link, priority + 1, result["depth"] + 1)
+                    yield result
+
+    def run(self, seeds: Iterable[str], max_pages: int = 100) -> List[dict]:
+        return list(self.crawl(seeds, max_pages))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python crawler.py <url> [max_pages] [max_depth]")
+        return
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    max_depth = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    crawler = Crawler(max_depth=max_depth)
+    start = time.perf_counter()
+    fetched = 0
+    for result in crawler.crawl([sys.argv[1]], max_pages=max_pages):
+        fetched += 1
+        status = result["status"] or result["error"]
+        console.print(f"[cyan]{result['depth']}[/cyan] {status} {result['url']}")
+    elapsed = time.perf_counter() - start
+    console.print(f"[bold green]🕸️ Crawled {fetched} pages in {elapsed:.1f}s "
+                  f"({fetched / max(elapsed, 1e-9) * 3600:.0f} pages/hour)[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
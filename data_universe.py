@@ -1,36 +1,196 @@
+import glob
+import json
 import os
-import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Iterator, List, Tuple
 from rich.console import Console
+import http_transport
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
 
 console = Console()
 
+# Page = (records, next cursor or None when the partition is exhausted)
+Page = Tuple[List[Any], Any]
+
+
+def matches(record, topic: str) -> bool:
+    text = record if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+    return topic.lower() in text.lower()
+
+
+class SimulatedBackend:
+    """Canned records used when neither an API key nor a local corpus is configured."""
+    source = "simulated"
+
+    def partitions(self, topic: str) -> list:
+        return [0]
+
+    def fetch_page(self, topic: str, cursor, page_size: int) -> Page:
+        raw_data = [
+            f"RAW_LOG_001: {topic} is a decentralized protocol...",
+            f"TWEET_DUMP_99: @user123 thinks {topic} is bullish #crypto...",
+            f"FORUM_POST: Does anyone know how {topic} consensus works?...",
+            f"SPAM_BOT_55: BUY {topic} NOW!!! CLICK HERE...",
+            f"WIKI_MIRROR: {topic} (Technology) - Wikipedia..."
+        ]
+        return raw_data[cursor:cursor + page_size], None
+
+
+class HTTPBackend:
+    """
+    SN13 validator API. Each data source is an independent partition paged with an opaque cursor:
+    GET {base_url}/data?query=&source=&cursor=&limit= -> {"data": [...], "next_cursor": ...}.
+    """
+    source = "sn13"
+
+    def __init__(self, base_url: str, api_key: str, sources=("x", "reddit")):
+        self.base_url = base_url
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.sources = sources
+
+    def partitions(self, topic: str) -> list:
+        return [(source, None) for source in self.sources]
+
+    def fetch_page(self, topic: str, cursor, page_size: int) -> Page:
+        source, token = cursor
+        params = {"query": topic, "source": source, "limit": page_size}
+        if token:
+            params["cursor"] = token
+        resp = http_transport.get(f"{self.base_url}/data", params=params, headers=self.headers, timeout=30)
+        resp.raise_for_status()
+        body = resp.json()
+        next_token = body.get("next_cursor")
+        return body.get("data", []), ((source, next_token) if next_token else None)
+
+
+class CorpusBackend:
+    """
+    Local stand-in for SN13: a directory of *.jsonl (and *.parquet when pyarrow is installed) files.
+    Every file is a partition; JSONL pages resume at a byte offset, Parquet pages at
+    (row group, record batch within it), so only the current row group is ever read.
+    Records match a topic when it appears (case-insensitive) anywhere in the record.
+    """
+    source = "corpus"
+
+    def __init__(self, root: str, batch_rows: int = 1024):
+        self.root = root
+        self.batch_rows = batch_rows
+
+    def partitions(self, topic: str) -> list:
+        files = [(path, 0) for path in sorted(glob.glob(os.path.join(self.root, "**", "*.jsonl"), recursive=True))]
+        if pq is not None:
+            files += [(path, (0, 0)) for path in
+                      sorted(glob.glob(os.path.join(self.root, "**", "*.parquet"), recursive=True))]
+        return files
+
+    def fetch_page(self, topic: str, cursor, page_size: int) -> Page:
+        path, position = cursor
+        if path.endswith(".parquet"):
+            return self._parquet_page(topic, path, position, page_size)
+        records = []
+        with open(path, "rb") as f:
+            f.seek(position)
+            while len(records) < page_size:
+                line = f.readline()
+                if not line:
+                    return records, None
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    if matches(record, topic):
+                        records.append(record)
+            return records, (path, f.tell())
+
+    def _parquet_page(self, topic: str, path: str, position: Tuple[int, int], page_size: int) -> Page:
+        # A page may exceed page_size by at most one batch; skipped batches never leave the current row group
+        row_group, batch_index = position
+        parquet = pq.ParquetFile(path)
+        records = []
+        while row_group < parquet.num_row_groups:
+            batches = parquet.iter_batches(batch_size=self.batch_rows, row_groups=[row_group])
+            for index, batch in enumerate(batches):
+                if index < batch_index:
+                    continue
+                records += [row for row in batch.to_pylist() if matches(row, topic)]
+                if len(records) >= page_size:
+                    return records, (path, (row_group, index + 1))
+            row_group, batch_index = row_group + 1, 0
+        return records, None
+
+
 class Subnet13Client:
     """
     Adapter for Data Universe (SN13) - Raw Data Collection.
     Capable of scraping petabytes of historical data.
+    Backend: a local corpus (DATA_UNIVERSE_CORPUS), the SN13 API (DATA_UNIVERSE_API_KEY) or simulated data.
     """
-    def __init__(self):
+    def __init__(self, backend=None, page_size: int = 100, concurrency: int = 4):
         self.api_key = os.getenv("DATA_UNIVERSE_API_KEY")
         self.base_url = "https://api.sn13.tensor/v1"
+        self.page_size = page_size
+        self.concurrency = concurrency
+        corpus = os.getenv("DATA_UNIVERSE_CORPUS")
+        if backend is not None:
+            self.backend = backend
+        elif corpus:
+            self.backend = CorpusBackend(corpus)
+        elif self.api_key:
+            self.backend = HTTPBackend(self.base_url, self.api_key)
+        else:
+            self.backend = SimulatedBackend()
+
+    @property
+    def source(self) -> str:
+        """Where records come from: "sn13", "corpus" or "simulated" (drives context freshness)."""
+        return getattr(self.backend, "source", "sn13")
+
+    def stream_bulk(self, topic: str, limit: int = 1000) -> Iterator[Any]:
+        """
+        Yields raw records as pages arrive. Partitions are paged concurrently (at most
+        `concurrency` pages in flight, each no bigger than what is left of `limit`), and
+        the stream stops as soon as `limit` records have been yielded.
+        """
+        remaining = limit
+        queued = list(self.backend.partitions(topic))
+        in_flight = {}
+        failures = 0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            try:
+                while remaining > 0 and (queued or in_flight):
+                    while queued and len(in_flight) < self.concurrency:
+                        cursor = queued.pop(0)
+                        size = min(self.page_size, remaining)
+                        in_flight[pool.submit(self.backend.fetch_page, topic, cursor, size)] = cursor
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        cursor = in_flight.pop(future)
+                        try:
+                            records, next_cursor = future.result()
+                        except Exception as e:
+                            failures += 1
+                            console.print(f"[red]🌌 SN13: Page {cursor} failed: {e}[/red]")
+                            continue
+                        for record in records[:remaining]:
+                            yield record
+                        remaining -= min(len(records), remaining)
+                        if next_cursor is not None and remaining > 0:
+                            queued.append(next_cursor)
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        if failures:
+            console.print(f"[yellow]🌌 SN13: {failures} page(s) failed during retrieval.[/yellow]")
 
     def fetch_bulk(self, topic: str, limit: int = 1000) -> list:
         """
         Fetches raw, uncleaned data about a topic from the Data Universe.
         """
         console.print(f"[blue]🌌 Data Universe (SN13): Mining raw data for '{topic}' (Limit: {limit})...[/blue]")
-        
-        # Simulation of bulk retrieval
-        # In production, this would query SN13 validators for cached datasets
-        time.sleep(1.5) 
-        
-        # Mock Raw Data (simulating web scrapes, tweets, logs)
-        raw_data = [
-            f"RAW_LOG_001: {topic} is a decentralized protocol...",
-            f"TWEET_DUMP_99: @user123 thinks {topic} is bullish #crypto...",
-            f"FORUM_POST: Does anyone know how {topic} consensus works?...",
-            f"SPAM_BOT_55: BUY {topic} NOW!!! CLICK HERE...",
-            f"WIKI_MIRROR: {topic} (Technology) - Wikipedia..."
-        ]
-        
-        console.print(f"[green]🌌 SN13: Retrieved {len(raw_data)} raw records (simulated).[/green]")
+        raw_data = list(self.stream_bulk(topic, limit))
+        console.print(f"[green]🌌 SN13: Retrieved {len(raw_data)} raw records.[/green]")
         return raw_data
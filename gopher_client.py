@@ -1,45 +1,179 @@
-import requests
+import asyncio
 import json
+import random
 import time
 import os
 from dotenv import load_dotenv
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+import http_transport
+from scrape_cache import ScrapeCache, get_scrape_cache
+
+BASE_URL = "https://data.gopher-ai.com/api/v1"
+
+# Job states returned by interpret_result()
+PENDING, DONE, FAILED = "pending", "done", "failed"
+# Keys under which an in-progress job document may expose the pages scraped so far
+PARTIAL_KEYS = ("partial_results", "results", "pages")
+
+
+def interpret_result(data) -> Tuple[str, object]:
+    """
+    Maps a /search/live/result payload to (state, payload):
+    a list or a completed/result document is DONE, "failed" is FAILED (payload = error),
+    anything else is still PENDING.
+    """
+    # If data is a list, it means success (the results)
+    if isinstance(data, list):
+        return DONE, data
+    status = data.get("status")
+    if status == "completed" or "result" in data:
+        return DONE, data
+    if status == "failed":
+        return FAILED, data.get("error")
+    return PENDING, None
+
+
+def result_records(payload) -> List[dict]:
+    """Flattens a finished job payload into its records (pages)."""
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        result = payload.get("result")
+        if isinstance(result, list):
+            return result
+        return [result if isinstance(result, dict) else payload]
+    return []
+
+
+def partial_records(data) -> List[dict]:
+    """Pages an in-progress job already exposes (empty if the service only returns the final payload)."""
+    if isinstance(data, dict):
+        for key in PARTIAL_KEYS:
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def scrape_params(max_pages: int, max_depth: int) -> dict:
+    """Scrape parameters that are part of the cache key next to the URL."""
+    return {"max_pages": max_pages, "max_depth": max_depth}
+
+
+def backoff_delay(interval: float, max_interval: float) -> Tuple[float, float]:
+    """Next (interval, delay): exponential growth capped at `max_interval`, with full jitter on half of it."""
+    interval = min(max_interval, interval * 2)
+    return interval, interval * (0.5 + random.random() / 2)
+
+
+def scrape_payload(url: str, max_pages: int = 3, max_depth: int = 1) -> dict:
+    return {
+        "type": "web",
+        "arguments": {
+            "type": "scraper",
+            "url": url,
+            "max_pages": max_pages,
+            "max_depth": max_depth
+        }
+    }
+
+
+def record_key(record) -> str:
+    """Identity of a scraped page: its url (or id), falling back to the record's canonical JSON."""
+    if isinstance(record, dict):
+        for key in ("url", "id"):
+            if record.get(key) is not None:
+                return f"{key}:{record[key]}"
+    return json.dumps(record, sort_keys=True, default=str)
+
+
+class PageStream:
+    """
+    Poll handling of one streamed scrape job, shared by the sync and async streams.
+    feed() takes one raw poll document (None when the poll failed) and returns
+    (state, new pages, delay before the next poll). Pages are deduplicated by record_key(),
+    so a final result that reorders or omits pages already delivered neither skips nor repeats any.
+    Progress resets the backoff; the finished payload is written to the cache.
+    """
+    def __init__(self, url: str, params: dict, cache: Optional[ScrapeCache], interval: float, max_interval: float):
+        self.url = url
+        self.params = params
+        self.cache = cache
+        self.first_interval = self.interval = interval
+        self.max_interval = max_interval
+        self.delivered = set()
+
+    def cached(self) -> Optional[List[dict]]:
+        """Pages of a fresh cached result, or None on a miss."""
+        cached = self.cache.get_json("gopher", self.url, self.params) if self.cache else None
+        return None if cached is None else result_records(cached)
+
+    def feed(self, data) -> Tuple[str, List[dict], float]:
+        state, payload = (PENDING, None) if data is None else interpret_result(data)
+        if state == FAILED:
+            print(f"[Gopher] Job failed ({self.url}): {payload}")
+            return FAILED, [], 0.0
+        if state == DONE:
+            if self.cache:
+                self.cache.put_json("gopher", self.url, payload, self.params)
+            records = result_records(payload)
+        else:
+            records = partial_records(data)
+        fresh = []
+        for record in records:
+            key = record_key(record)
+            if key not in self.delivered:
+                self.delivered.add(key)
+                fresh.append(record)
+        if fresh:
+            self.interval = self.first_interval
+        self.interval, delay = backoff_delay(self.interval, self.max_interval)
+        return state, fresh, delay
 
 class GopherClient:
     """
     Client for Gopher (Subnet 42) - Data Scraping & Search.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[ScrapeCache] = None):
         load_dotenv()
         self.api_key = os.getenv("GOPHER_API_KEY")
-        self.base_url = "https://data.gopher-ai.com/api/v1"
+        self.base_url = BASE_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[ScrapeCache]:
+        """Scrape cache (shared one unless injected); SCRAPE_CACHE=0 disables it."""
+        if self._cache is None and os.getenv("SCRAPE_CACHE", "1") != "0":
+            self._cache = get_scrape_cache()
+        return self._cache
 
-    def scrape(self, url: str, max_pages: int = 3, max_depth: int = 1, wait: bool = True):
+    def scrape(self, url: str, max_pages: int = 3, max_depth: int = 1, wait: bool = True, use_cache: bool = True):
         """
         Starts a scraping job and optionally waits for the result.
+        Finished results are cached per (url, max_pages, max_depth); a fresh hit skips the job entirely.
         """
+        cache = self.cache if use_cache and wait else None
+        params = scrape_params(max_pages, max_depth)
+        if cache:
+            cached = cache.get_json("gopher", url, params)
+            if cached is not None:
+                print(f"[Gopher] Cache hit for {url}")
+                return cached
+
         if not self.api_key:
             print("[Gopher] API Key missing.")
             return None
 
         # 1. Submit Job
         submit_url = f"{self.base_url}/search/live"
-        payload = {
-            "type": "web",
-            "arguments": {
-                "type": "scraper",
-                "url": url,
-                "max_pages": max_pages,
-                "max_depth": max_depth
-            }
-        }
+        payload = scrape_payload(url, max_pages, max_depth)
         
         try:
             print(f"[Gopher] Submitting scrape job for {url}...")
-            resp = requests.post(submit_url, json=payload, headers=self.headers, timeout=10)
+            resp = http_transport.post(submit_url, json=payload, headers=self.headers, timeout=10)
             if resp.status_code != 200:
                 print(f"[Gopher] Submission failed: {resp.text}")
                 return None
@@ -53,37 +187,32 @@ class GopherClient:
             print(f"[Gopher] Job started: {job_id}")
             
             if wait:
-                return self._poll_result(job_id)
+                result = self._poll_result(job_id)
+                if cache and result is not None:
+                    cache.put_json("gopher", url, result, params)
+                return result
             return job_id
             
         except Exception as e:
             print(f"[Gopher] Error: {e}")
             return None
 
-    def _poll_result(self, job_id: str, timeout: int = 120):
+    def _poll_result(self, job_id: str, timeout: int = 120, interval: float = 1.0, max_interval: float = 10.0):
         """
-        Polls for the result of a specific job.
+        Polls for the result of a specific job with exponential backoff and jitter.
         """
         poll_url = f"{self.base_url}/search/live/result/{job_id}"
         start_time = time.time()
         
         while time.time() - start_time < timeout:
             try:
-                resp = requests.get(poll_url, headers=self.headers, timeout=10)
+                resp = http_transport.get(poll_url, headers=self.headers, timeout=10)
                 if resp.status_code == 200:
-                    data = resp.json()
-                    
-                    # If data is a list, it means success (the results)
-                    if isinstance(data, list):
-                        return data
-                        
-                    status = data.get("status")
-                    
-                    if status == "completed" or "result" in data:
-                        # Success!
-                        return data
-                    elif status == "failed":
-                        print(f"[Gopher] Job failed: {data.get('error')}")
+                    state, payload = interpret_result(resp.json())
+                    if state == DONE:
+                        return payload
+                    elif state == FAILED:
+                        print(f"[Gopher] Job failed: {payload}")
                         return None
                     # else in progress, continue
                 elif resp.status_code == 404:
@@ -95,11 +224,240 @@ class GopherClient:
             except Exception as e:
                 print(f"[Gopher] Poll exception: {e}")
                 
-            time.sleep(3) # Wait 3s between checks
+            interval, delay = backoff_delay(interval, max_interval)
+            time.sleep(delay)
             
         print("[Gopher] Operation timed out.")
         return None
 
+    def _fetch_result(self, job_id: str):
+        """One poll of a job: the raw result document, or None on network errors and 404s."""
+        try:
+            resp = http_transport.get(f"{self.base_url}/search/live/result/{job_id}", headers=self.headers, timeout=10)
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code != 404:
+                print(f"[Gopher] Poll error: {resp.status_code}")
+        except Exception as e:
+            print(f"[Gopher] Poll exception: {e}")
+        return None
+
+    def iter_scrape(self, url: str, max_pages: int = 3, max_depth: int = 1, timeout: int = 120,
+                    interval: float = 1.0, max_interval: float = 10.0, use_cache: bool = True) -> Iterator[dict]:
+        """
+        Streams the pages of a scrape job as soon as they are available.
+        Partial results exposed while the job runs are yielded immediately (backoff resets on progress);
+        otherwise the final payload is delivered page by page. Cached results are replayed the same way.
+        """
+        stream = PageStream(url, scrape_params(max_pages, max_depth), self.cache if use_cache else None,
+                            interval, max_interval)
+        cached = stream.cached()
+        if cached is not None:
+            print(f"[Gopher] Cache hit for {url}")
+            yield from cached
+            return
+
+        job_id = self.scrape(url, max_pages, max_depth, wait=False, use_cache=False)
+        if not job_id:
+            return
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            state, fresh, delay = stream.feed(self._fetch_result(job_id))
+            yield from fresh
+            if state != PENDING:
+                return
+            time.sleep(delay)
+
+        print("[Gopher] Operation timed out.")
+
+    async def aiter_scrape(self, url: str, **kwargs) -> AsyncIterator[dict]:
+        """Async counterpart of iter_scrape() (engine options such as poll_interval/timeout as kwargs)."""
+        async for record in GopherJobEngine(self, **kwargs).stream(url):
+            yield record
+
+    def scrape_many(self, urls: Iterable[str], **kwargs) -> Dict[str, Optional[list]]:
+        """Scrapes many URLs concurrently (blocking wrapper around GopherJobEngine)."""
+        return http_transport.run(GopherJobEngine(self, **kwargs).scrape_many(urls))
+
+    async def ascrape_many(self, urls: Iterable[str], **kwargs) -> Dict[str, Optional[list]]:
+        return await GopherJobEngine(self, **kwargs).scrape_many(urls)
+
+
+class GopherJobEngine:
+    """
+    Async Gopher (SN42) job engine.
+    Submits many scrape jobs at once (bounded by `max_concurrency`), then one shared
+    poller checks every due job per tick. Each job backs off exponentially with
+    jitter, and results are yielded as they finish (`as_completed`).
+    URLs with a fresh entry in the client's scrape cache are yielded first without a job.
+    """
+    def __init__(self, client: GopherClient, max_concurrency: int = 8, poll_interval: float = 1.0,
+                 max_interval: float = 10.0, timeout: float = 120.0, max_pages: int = 3, max_depth: int = 1):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+
+    async def submit(self, url: str) -> Optional[str]:
+        """Starts one scrape job and returns its uuid (None if submission failed)."""
+        try:
+            resp = await http_transport.apost(f"{self.client.base_url}/search/live",
+                                              json=scrape_payload(url, self.max_pages, self.max_depth),
+                                              headers=self.client.headers, timeout=10)
+            if resp.status_code != 200:
+                print(f"[Gopher] Submission failed for {url}: {resp.text}")
+                return None
+            return resp.json().get("uuid")
+        except Exception as e:
+            print(f"[Gopher] Submission error for {url}: {e}")
+            return None
+
+    async def fetch(self, job_id: str):
+        """One poll of a job: the raw result document, or None on network errors and 404s."""
+        try:
+            resp = await http_transport.aget(f"{self.client.base_url}/search/live/result/{job_id}",
+                                             headers=self.client.headers, timeout=10)
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code != 404:
+                print(f"[Gopher] Poll error for {job_id}: {resp.status_code}")
+        except Exception as e:
+            print(f"[Gopher] Poll exception for {job_id}: {e}")
+        return None
+
+    async def check(self, job_id: str) -> Tuple[str, object]:
+        """One poll of a job. Network errors and 404s count as still pending."""
+        data = await self.fetch(job_id)
+        return (PENDING, None) if data is None else interpret_result(data)
+
+    async def stream(self, url: str) -> AsyncIterator[dict]:
+        """
+        Yields the pages of one scrape job as they become available
+        (partial results while running, then the rest of the final payload page by page).
+        """
+        stream = PageStream(url, scrape_params(self.max_pages, self.max_depth), self.client.cache,
+                            self.poll_interval, self.max_interval)
+        cached = stream.cached()
+        if cached is not None:
+            for record in cached:
+                yield record
+            return
+        if not self.client.api_key:
+            print("[Gopher] API Key missing.")
+            return
+        job_id = await self.submit(url)
+        if job_id is None:
+            return
+
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            state, fresh, delay = stream.feed(await self.fetch(job_id))
+            for record in fresh:
+                yield record
+            if state != PENDING:
+                return
+            await asyncio.sleep(delay)
+        print(f"[Gopher] Job {job_id} ({url}) timed out.")
+
+    async def as_completed(self, urls: Iterable[str]) -> AsyncIterator[Tuple[str, Optional[list]]]:
+        """Yields (url, result) as each job finishes; result is None for failed or timed-out jobs."""
+        urls = list(urls)
+        cache = self.client.cache
+        params = scrape_params(self.max_pages, self.max_depth)
+        if cache:
+            remaining = []
+            for url in urls:
+                cached = cache.get_json("gopher", url, params)
+                if cached is None:
+                    remaining.append(url)
+                else:
+                    yield url, cached
+            urls = remaining
+        if not urls:
+            return
+        if not self.client.api_key:
+            print("[Gopher] API Key missing.")
+            for url in urls:
+                yield url, None
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        finished: asyncio.Queue = asyncio.Queue()
+        pending: Dict[str, dict] = {}
+        wake = asyncio.Event()
+
+        async def submit_one(url):
+            async with semaphore:
+                job_id = await self.submit(url)
+            if job_id is None:
+                await finished.put((url, None))
+                return
+            print(f"[Gopher] Job started: {job_id} ({url})")
+            now = time.monotonic()
+            pending[job_id] = {"url": url, "interval": self.poll_interval,
+                               "next_poll": now + self.poll_interval, "deadline": now + self.timeout}
+            wake.set()
+
+        async def poll_one(job_id, job):
+            async with semaphore:
+                state, payload = await self.check(job_id)
+            now = time.monotonic()
+            if state == DONE:
+                if cache and payload is not None:
+                    cache.put_json("gopher", job["url"], payload, params)
+                await finished.put((job["url"], payload))
+            elif state == FAILED:
+                print(f"[Gopher] Job failed ({job['url']}): {payload}")
+                await finished.put((job["url"], None))
+            elif now >= job["deadline"]:
+                print(f"[Gopher] Job {job_id} ({job['url']}) timed out.")
+                await finished.put((job["url"], None))
+            else:
+                job["interval"], delay = backoff_delay(job["interval"], self.max_interval)
+                job["next_poll"] = now + delay
+                pending[job_id] = job
+
+        async def poller(submissions):
+            while pending or not submissions.done():
+                now = time.monotonic()
+                due = [job_id for job_id, job in pending.items() if job["next_poll"] <= now]
+                if due:
+                    await asyncio.gather(*(poll_one(job_id, pending.pop(job_id)) for job_id in due))
+                    continue
+                wake.clear()
+                next_poll = min((job["next_poll"] for job in pending.values()), default=now + self.poll_interval)
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=max(0.0, next_poll - now))
+                except asyncio.TimeoutError:
+                    pass
+
+        submissions = asyncio.ensure_future(asyncio.gather(*(submit_one(url) for url in urls)))
+        poll_task = asyncio.ensure_future(poller(submissions))
+        try:
+            for _ in urls:
+                # Wait on the background tasks too: if one of them dies, nothing else would fill `finished`
+                getter = asyncio.ensure_future(finished.get())
+                while not getter.done():
+                    await asyncio.wait({getter, *(task for task in (poll_task, submissions) if not task.done())},
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    for task in (poll_task, submissions):
+                        if not getter.done() and task.done() and not task.cancelled() and task.exception():
+                            getter.cancel()
+                            raise task.exception()
+                yield getter.result()
+        finally:
+            poll_task.cancel()
+            submissions.cancel()
+
+    async def scrape_many(self, urls: Iterable[str]) -> Dict[str, Optional[list]]:
+        results = {}
+        async for url, result in self.as_completed(urls):
+            results[url] = result
+        return results
+
 if __name__ == "__main__":
     # Test
     client = GopherClient()
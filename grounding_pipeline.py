@@ -0,0 +1,191 @@
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from rich.console import Console
+from clean_data import Subnet74Client
+from data_universe import Subnet13Client
+
+console = Console()
+
+_DONE = object()
+
+
+class StageTimer:
+    """Busy time and item count of one pipeline stage (updated from its own threads)."""
+    def __init__(self):
+        self.busy = 0.0
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, items: int = 1):
+        with self._lock:
+            self.busy += seconds
+            self.items += items
+
+    def as_dict(self) -> dict:
+        return {"busy_s": round(self.busy, 4), "items": self.items}
+
+
+class GroundingPipeline:
+    """
+    SN13 -> SN74 -> summary as a bounded producer/consumer pipeline.
+    - retrieve: one thread pulls SN13 records and hands `batch_size` batches to a bounded queue,
+    - clean: `workers` threads run the stateless filter/MinHash half of cleaning
+      (in a process pool when `processes=True`, for CPU-bound cleaning),
+    - summarize: the caller's thread deduplicates prepared batches in order of arrival and
+      keeps the top records; it cancels the upstream stages once `target_records`
+      records scoring at least `min_score` have been gathered.
+    Queues hold at most `queue_size` batches, so a slow stage back-pressures the faster ones.
+    """
+    def __init__(self, sn13: Subnet13Client, sn74: Subnet74Client, batch_size: int = 100, workers: int = 2,
+                 queue_size: int = 4, processes: bool = False, target_records: Optional[int] = None,
+                 min_score: float = 0.6):
+        self.sn13 = sn13
+        self.sn74 = sn74
+        self.batch_size = batch_size
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processes = processes
+        self.target_records = target_records
+        self.min_score = min_score
+        self.metrics: Dict[str, Any] = {}
+
+    def _put(self, q: queue.Queue, item, cancel: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is cancelled (back-pressure without deadlock)."""
+        while not cancel.is_set():
+            try:
+                q.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self, topic: str, limit: int = 1000,
+            on_record: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Grounds a topic. Returns (context, metrics); context is None when SN13 had no records.
+        metrics: per-stage busy time/items, total wall time and whether the run stopped early.
+        """
+        start = time.perf_counter()
+        raw_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        clean_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        cancel = threading.Event()
+        timers = {"retrieve": StageTimer(), "clean": StageTimer(), "summarize": StageTimer()}
+        errors = []
+        engine = self.sn74.new_engine()
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.processes else None
+
+        def retrieve():
+            stream = iter(self.sn13.stream_bulk(topic, limit=limit))
+            try:
+                batch = []
+                waited = time.perf_counter()
+                for record in stream:
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        timers["retrieve"].add(time.perf_counter() - waited, len(batch))
+                        if not self._put(raw_q, batch, cancel):
+                            return
+                        batch = []
+                        waited = time.perf_counter()
+                if batch:
+                    timers["retrieve"].add(time.perf_counter() - waited, len(batch))
+                    self._put(raw_q, batch, cancel)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Closing the generator cancels SN13 pages still in flight
+                if hasattr(stream, "close"):
+                    stream.close()
+                for _ in range(self.workers):
+                    self._put(raw_q, _DONE, cancel)
+
+        finished_workers = []
+
+        def clean():
+            try:
+                while not cancel.is_set():
+                    try:
+                        batch = raw_q.get(timeout=0.05)
+                    except queue.Empty:
+                        continue
+                    if batch is _DONE:
+                        return
+                    began = time.perf_counter()
+                    if pool is not None:
+                        prepared = pool.submit(engine.filter.prepare, batch).result()
+                    else:
+                        prepared = engine.filter.prepare(batch)
+                    timers["clean"].add(time.perf_counter() - began, len(batch))
+                    if not self._put(clean_q, prepared, cancel):
+                        return
+            except Exception as e:
+                errors.append(e)
+            finally:
+                finished_workers.append(1)
+                if len(finished_workers) == self.workers:
+                    self._put(clean_q, _DONE, cancel)
+
+        threads = [threading.Thread(target=retrieve, name="ground-retrieve", daemon=True)]
+        threads += [threading.Thread(target=clean, name=f"ground-clean-{i}", daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        best = []
+        high_quality = order = 0
+        stopped_early = False
+        try:
+            while True:
+                prepared = clean_q.get()
+                if prepared is _DONE:
+                    break
+                began = time.perf_counter()
+                for record in engine.dedupe(*prepared):
+                    order += 1
+                    if on_record:
+                        on_record(record)
+                    if record["score"] >= self.min_score:
+                        high_quality += 1
+                    # Ties go to the earlier record, as with heapq.nlargest in Subnet74Client.process
+                    item = (record["score"], -order, record)
+                    if len(best) < self.sn74.max_facts:
+                        heapq.heappush(best, item)
+                    else:
+                        heapq.heappushpop(best, item)
+                timers["summarize"].add(time.perf_counter() - began, len(prepared[0]))
+                if self.target_records and high_quality >= self.target_records:
+                    stopped_early = True
+                    break
+        finally:
+            cancel.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        for error in errors:
+            console.print(f"[red]🔮 Grounding pipeline stage failed: {error}[/red]")
+        self.metrics = {stage: timer.as_dict() for stage, timer in timers.items()}
+        self.metrics.update(total_s=round(time.perf_counter() - start, 4), stopped_early=stopped_early,
+                            records=engine.stats["seen"], kept=engine.stats["kept"])
+        if engine.stats["seen"] == 0:
+            return None, self.metrics
+
+        began = time.perf_counter()
+        top = [record for _, _, record in sorted(best, key=lambda item: item[:2], reverse=True)]
+        context = self.sn74.summarize(top, engine.stats)
+        timers["summarize"].add(time.perf_counter() - began, 0)
+        self.metrics["summarize"] = timers["summarize"].as_dict()
+        return context, self.metrics
+
+    def print_metrics(self):
+        m = self.metrics
+        if not m:
+            return
+        stages = " | ".join(f"{stage} {m[stage]['busy_s'] * 1000:.0f}ms/{m[stage]['items']}"
+                            for stage in ("retrieve", "clean", "summarize"))
+        early = " (stopped early)" if m["stopped_early"] else ""
+        console.print(f"[dim]⏱️ Grounding: {m['total_s'] * 1000:.0f}ms total{early} | {stages}[/dim]")
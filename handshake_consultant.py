@@ -1,5 +1,5 @@
 import os
-import requests
+import http_transport
 from rich.console import Console
 
 console = Console()
@@ -50,7 +50,7 @@ class HandshakeConsultant:
             url = f"https://handshake58.com/api/mcp/providers?limit=1&tier=bittensor&format=compact"
             # Add User-Agent to avoid blocking
             headers = {"User-Agent": "OpenClaw/2.3 (compatible; agentao)"}
-            resp = requests.get(url, headers=headers, timeout=5)
+            resp = http_transport.get(url, headers=headers, timeout=5)
             
             if resp.status_code == 200:
                 data = resp.json()
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pool/retry settings shared by every subnet adapter (overridable via env)
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))   # hosts kept warm
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))           # sockets per host
+RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.3"))
+RETRY_STATUSES = (429, 502, 503, 504)
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2 = os.getenv("HTTP_HTTP2", "1") != "0"
+except ImportError:
+    HTTP2 = False
+
+
+def _retry() -> Retry:
+    # Only idempotent methods are retried (urllib3 default): a POST is never sent twice
+    return Retry(total=RETRIES, connect=RETRIES, read=RETRIES, backoff_factor=BACKOFF,
+                 status_forcelist=RETRY_STATUSES, respect_retry_after_header=True, raise_on_status=False)
+
+
+def new_session(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """A pooled, retrying session for clients that need their own headers/cookies (e.g. MCP)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=_retry())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HTTPTransport:
+    """
+    Shared transport layer for all subnet adapters.
+    - Sync facade: one requests.Session with keep-alive pools per host and retries.
+    - Async facade: one httpx.AsyncClient per event loop (HTTP/2 when `h2` is installed),
+      or the sync session in a worker thread when httpx is not available.
+    Responses expose `status_code`, `json()`, `text` and `headers` on both paths.
+    """
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                 timeout: float = DEFAULT_TIMEOUT, http2: bool = HTTP2):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.http2 = http2
+        self._session: Optional[requests.Session] = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = new_session(self.pool_connections, self.pool_maxsize)
+            return self._session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    # --- Async facade ---
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.pool_maxsize * self.pool_connections,
+                                  max_keepalive_connections=self.pool_maxsize)
+            transport = httpx.AsyncHTTPTransport(retries=RETRIES, http2=self.http2, limits=limits)
+            client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            self._async_clients[loop] = client
+        return client
+
+    async def arequest(self, method: str, url: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if httpx is None:
+            return await asyncio.to_thread(self.request, method, url, **kwargs)
+        return await self._async_client().request(method, url, **kwargs)
+
+    async def aget(self, url: str, **kwargs):
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs):
+        return await self.arequest("POST", url, **kwargs)
+
+    async def aclose(self):
+        """Closes the async client bound to the running loop."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def run(self, coro):
+        """asyncio.run() for blocking wrappers: the loop's async client is closed before the loop ends."""
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(main())
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Process-wide transport shared by every adapter (one pool per host)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HTTPTransport()
+        return _shared
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_transport().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_transport().post(url, **kwargs)
+
+
+async def aget(url: str, **kwargs):
+    return await get_transport().aget(url, **kwargs)
+
+
+async def apost(url: str, **kwargs):
+    return await get_transport().apost(url, **kwargs)
+
+
+def run(coro):
+    return get_transport().run(coro)
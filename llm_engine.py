@@ -0,0 +1,356 @@
+import asyncio
+import os
+import time
+from typing import List, Optional
+from rich.console import Console
+from provider_health import CircuitOpenError
+from budget_scheduler import usage_tokens
+
+console = Console()
+
+PROVIDERS = {
+    "chutes": {"base_url": "https://llm.chutes.ai/v1", "key_env": "CHUTES_API_KEY"},
+    "targon": {"base_url": "https://api.targon.com/v1", "key_env": "TARGON_API_KEY"},
+}
+
+# Tier -> provider/model/token settings shared by the sync and async routing paths
+TIER_SPECS = {
+    "fast": {"provider": "chutes", "model_env": "CHUTES_MODEL",
+             "default_model": "chutes/nousresearch/hermes-3-llama-3.1-405b", "max_tokens": 200},
+    "secure": {"provider": "chutes", "model_env": None,
+               "default_model": "chutes/kimi-k2.5-tee", "max_tokens": 200},
+    "deep": {"provider": "targon", "model_env": "TARGON_MODEL",
+             "default_model": "deepseek-ai/DeepSeek-R1", "max_tokens": 6000},
+}
+
+# Complexity label -> tier, and tier -> tier tried when it fails or is too slow
+COMPLEXITY_TIERS = {"low": "fast", "high": "deep", "insane": "cortex"}
+FALLBACK_TIERS = {"cortex": "deep", "deep": "fast"}
+
+GROUNDING_CUES = ("history", "context", "deep", "research")
+
+CONTINUE_INSTRUCTION = "Continue exactly where your previous answer stopped. Do not repeat any of it."
+
+
+def tier_model(tier: str) -> str:
+    """Resolves the model name configured for a tier."""
+    spec = TIER_SPECS[tier]
+    if spec["model_env"]:
+        return os.getenv(spec["model_env"], spec["default_model"])
+    return spec["default_model"]
+
+
+def needs_grounding(prompt: str) -> bool:
+    """Heuristic: does this prompt need deep context from the Data Layer?"""
+    lowered = prompt.lower()
+    return any(cue in lowered for cue in GROUNDING_CUES)
+
+
+def build_messages(system_prompt: str, prompt: str, partial: str = "") -> list:
+    """
+    Chat messages for a tier call. When `partial` output from a failed stream is
+    given, the fallback tier is asked to continue it instead of starting over.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    if partial:
+        messages.append({"role": "assistant", "content": partial})
+        messages.append({"role": "user", "content": CONTINUE_INSTRUCTION})
+    return messages
+
+
+def chunk_text(chunk) -> str:
+    """Extracts the token delta from a streamed chat completion chunk."""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def mock_response(tier: str, prompt: str) -> str:
+    """Placeholder answer used when a tier's provider key is missing."""
+    if tier == "deep":
+        return "[Mock] Targon key missing. Deep analysis of: " + prompt
+    return "[Mock] Chutes key missing. Response: " + prompt
+
+
+class AsyncLLMEngine:
+    """
+    Asyncio-native routing engine behind `BrainRouter.athink`.
+    Keeps one pooled AsyncClient per provider, bounds in-flight requests with a
+    semaphore and can hedge a slow tier by starting its fallback tier once a
+    latency budget (`hedge_after`, seconds) is exceeded.
+    """
+    def __init__(self, brain, max_concurrency: int = None, hedge_after: float = None):
+        self.brain = brain
+        self.max_concurrency = max_concurrency or int(os.getenv("BRAIN_MAX_CONCURRENCY", "32"))
+        if hedge_after is None and os.getenv("BRAIN_HEDGE_AFTER"):
+            hedge_after = float(os.getenv("BRAIN_HEDGE_AFTER"))
+        self.hedge_after = hedge_after
+
+        self._clients = {}
+        self._loop = None
+        self._semaphore = None
+
+    def _bind_loop(self):
+        """
+        Pools are tied to an event loop; rebuild them if the caller switched loops.
+        Clients of a loop that is still running elsewhere are closed on that loop; blocking
+        callers go through run(), which closes them before their loop shuts down.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            stale, previous = self._clients, self._loop
+            if stale and previous is not None and previous.is_running():
+                asyncio.run_coroutine_threadsafe(self._close_clients(stale), previous)
+            self._loop = loop
+            self._clients = {}
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _client(self, provider: str):
+        """Returns the pooled AsyncClient for a provider (None when its key is missing)."""
+        if provider not in self._clients:
+            conf = PROVIDERS[provider]
+            api_key = os.getenv(conf["key_env"])
+            if api_key:
+                from openai import AsyncClient
+                self._clients[provider] = AsyncClient(api_key=api_key, base_url=conf["base_url"])
+            else:
+                self._clients[provider] = None
+        return self._clients[provider]
+
+    async def complete(self, tier: str, prompt: str) -> str:
+        """
+        Runs a single tier without fallback. Raises on provider errors.
+        """
+        self._bind_loop()
+        if tier == "cortex":
+            cached = self.brain.cache_lookup("cortex", "affine", prompt)
+            if cached is not None:
+                return cached
+            health = self.brain.health.get("affine")
+            health.check()
+            start = time.perf_counter()
+            try:
+                # Affine SDK is synchronous; keep it off the event loop
+                result = await asyncio.wait_for(asyncio.to_thread(self.brain.affine_client.compute, prompt),
+                                                timeout=health.timeout())
+            except Exception:
+                health.record_failure(time.perf_counter() - start)
+                raise
+            health.record_success(time.perf_counter() - start)
+            self.brain.cache_store("cortex", "affine", prompt, result, time.perf_counter() - start)
+            return result
+
+        spec = TIER_SPECS[tier]
+        client = self._client(spec["provider"])
+        if client is None:
+            return mock_response(tier, prompt)
+
+        model_name = tier_model(tier)
+        cached = self.brain.cache_lookup(tier, model_name, prompt)
+        if cached is not None:
+            return cached
+
+        # Skip a provider whose breaker is open instead of waiting for its timeout
+        health = self.brain.health.get(spec["provider"])
+        health.check()
+        await self.brain.budget.acquire_async(spec["provider"])
+        start = time.perf_counter()
+        try:
+            async with self._semaphore:
+                response = await client.chat.completions.create(
+                    model=model_name,
+                    messages=build_messages(self.brain.system_prompt, prompt),
+                    max_tokens=spec["max_tokens"],
+                    timeout=health.timeout()
+                )
+        except Exception:
+            health.record_failure(time.perf_counter() - start)
+            raise
+        health.record_success(time.perf_counter() - start)
+        self.brain.budget.record_usage(spec["provider"], usage_tokens(response))
+        content = response.choices[0].message.content
+        self.brain.cache_store(tier, model_name, prompt, content, time.perf_counter() - start)
+        return content
+
+    async def _ground(self, prompt: str) -> str:
+        """Sovereign v2.5 grounding phase, run in a worker thread."""
+        if not needs_grounding(prompt):
+            return prompt
+        return await asyncio.to_thread(self.brain._ground, prompt)
+
+    async def run_tier(self, tier: str, prompt: str, hedge_after: Optional[float] = None) -> str:
+        """
+        Runs a tier with the same fallback chain as the sync router
+        (cortex -> deep -> fast), optionally hedging with the fallback tier.
+        """
+        self._bind_loop()
+        if tier == "deep":
+            prompt = await self._ground(prompt)
+
+        fallback = FALLBACK_TIERS.get(tier)
+        if fallback is None:
+            try:
+                return await self.complete(tier, prompt)
+            except Exception as e:
+                console.print(f"[red]Error contacting Chutes: {e}[/red]")
+                return f"[Fallback] Fast response to: {prompt}"
+
+        if hedge_after is None:
+            try:
+                return await self.complete(tier, prompt)
+            except Exception as e:
+                console.print(f"[red]Tier '{tier}' failed ({e}). Falling back to '{fallback}'...[/red]")
+                return await self.run_tier(fallback, prompt)
+
+        return await self._hedged(tier, fallback, prompt, hedge_after)
+
+    async def _hedged(self, tier: str, fallback: str, prompt: str, hedge_after: float) -> str:
+        """
+        Starts `tier`; if it has not answered within `hedge_after` seconds, also starts
+        `fallback` and returns whichever succeeds first, cancelling the other.
+        """
+        primary = asyncio.ensure_future(self.complete(tier, prompt))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+
+        if done:
+            try:
+                return primary.result()
+            except Exception as e:
+                console.print(f"[red]Tier '{tier}' failed ({e}). Falling back to '{fallback}'...[/red]")
+                return await self.run_tier(fallback, prompt)
+
+        console.print(f"[yellow]⏱️ Tier '{tier}' exceeded {hedge_after:.1f}s. Hedging with '{fallback}'...[/yellow]")
+        backup = asyncio.ensure_future(self.run_tier(fallback, prompt))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed; the backup chain already produced its own fallback text
+            return f"[Fallback] Fast response to: {prompt}"
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream_tier(self, tier: str, prompt: str, partial: str = ""):
+        """
+        Async iterator over the tokens of a tier. If the stream dies mid-way the
+        fallback tier continues from the text already emitted.
+        """
+        self._bind_loop()
+        if tier == "deep" and not partial:
+            prompt = await self._ground(prompt)
+
+        if tier == "cortex":
+            # Affine has no token stream; emit its verdict in one piece
+            try:
+                yield await self.complete("cortex", prompt)
+            except Exception as e:
+                console.print(f"[red]Cortex Critical Failure: {e}. Fallback to System 2.[/red]")
+                async for token in self.stream_tier("deep", prompt):
+                    yield token
+            return
+
+        spec = TIER_SPECS[tier]
+        client = self._client(spec["provider"])
+        if client is None:
+            if not partial:
+                yield mock_response(tier, prompt)
+            return
+
+        model_name = tier_model(tier)
+        if not partial:
+            cached = self.brain.cache_lookup(tier, model_name, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        emitted = []
+        health = self.brain.health.get(spec["provider"])
+        start = time.perf_counter()
+        try:
+            health.check()
+            await self.brain.budget.acquire_async(spec["provider"])
+            async with self._semaphore:
+                stream = await client.chat.completions.create(
+                    model=model_name,
+                    messages=build_messages(self.brain.system_prompt, prompt, partial),
+                    max_tokens=spec["max_tokens"],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=health.timeout()
+                )
+                async for chunk in stream:
+                    self.brain.budget.record_usage(spec["provider"], usage_tokens(chunk))
+                    token = chunk_text(chunk)
+                    if token:
+                        emitted.append(token)
+                        yield token
+            health.record_success()
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                health.record_failure()
+            fallback = FALLBACK_TIERS.get(tier)
+            if fallback is None:
+                console.print(f"[red]Error contacting Chutes: {e}[/red]")
+                if not partial and not emitted:
+                    yield f"[Fallback] Fast response to: {prompt}"
+                return
+            console.print(f"[red]Stream from '{tier}' died ({e}). '{fallback}' continues...[/red]")
+            async for token in self.stream_tier(fallback, prompt, partial + "".join(emitted)):
+                yield token
+            return
+
+        if not partial:
+            self.brain.cache_store(tier, model_name, prompt, "".join(emitted), time.perf_counter() - start)
+
+    async def think_stream(self, prompt: str, is_sensitive: bool = False):
+        """Async counterpart of `BrainRouter.think_stream`."""
+        if is_sensitive:
+            console.print("[bold yellow]🔒 SECURE PROTOCOL: Forcing Chutes (SN64) TEE Enclave...[/bold yellow]")
+            tier = "secure"
+        else:
+            tier = self.brain._budget_tier(COMPLEXITY_TIERS[self.brain._evaluate_complexity(prompt)])
+        async for token in self.stream_tier(tier, prompt):
+            yield token
+
+    async def think(self, prompt: str, is_sensitive: bool = False, hedge_after: Optional[float] = None) -> str:
+        """Async counterpart of `BrainRouter.think`."""
+        self._bind_loop()
+        if is_sensitive:
+            console.print("[bold yellow]🔒 SECURE PROTOCOL: Forcing Chutes (SN64) TEE Enclave...[/bold yellow]")
+            return await self.run_tier("secure", prompt)
+
+        tier = self.brain._budget_tier(COMPLEXITY_TIERS[self.brain._evaluate_complexity(prompt)])
+        return await self.run_tier(tier, prompt, hedge_after if hedge_after is not None else self.hedge_after)
+
+    async def think_many(self, prompts: List[str], is_sensitive: bool = False,
+                         hedge_after: Optional[float] = None) -> List[str]:
+        """Serves many prompts concurrently; results keep the input order."""
+        return await asyncio.gather(*(self.think(p, is_sensitive, hedge_after) for p in prompts))
+
+    @staticmethod
+    async def _close_clients(clients: dict):
+        for client in clients.values():
+            close = getattr(client, "close", None)
+            if close is not None:
+                await close()
+
+    async def aclose(self):
+        """Closes the pooled provider connections."""
+        clients, self._clients = self._clients, {}
+        await self._close_clients(clients)
+
+    def run(self, coro):
+        """asyncio.run() for blocking wrappers: the loop's provider clients are closed before it ends."""
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(main())
@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from rich.console import Console
+
+console = Console()
+
+# Seconds a tool result stays fresh. Pool data changes at most once per block (~12s).
+# Only idempotent tools listed here are cached; anything else goes to the server every time.
+DEFAULT_TOOL_TTLS = {
+    "GetLatestSubnetPool": 12.0,
+}
+DEFAULT_TTL = 0.0
+
+
+def canonical_arguments(arguments: Optional[dict]) -> str:
+    """Stable JSON for tool arguments: key order and whitespace never change the cache key."""
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class MCPResultCache:
+    """
+    TTL cache for MCP tool results keyed by (tool name, canonical arguments).
+    - per-tool TTLs (`ttls`, falling back to `default_ttl`, which is 0: unlisted tools are not cached),
+    - in-flight coalescing: identical concurrent calls share one network request,
+    - optional SQLite persistence across restarts (`disk_path`),
+    - hit/miss/coalesced counters.
+    Values are stored as JSON, so every caller gets its own copy.
+    """
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL,
+                 disk_path: Optional[str] = None, max_entries: int = 4096):
+        self.ttls = {**DEFAULT_TOOL_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.disk_path = disk_path
+        self.max_entries = max_entries
+
+        self._entries: Dict[tuple, tuple] = {}   # key -> (expires_at, json)
+        self._in_flight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self.metrics = {"hits": 0, "misses": 0, "coalesced": 0, "disk_hits": 0}
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS tool_results (
+                    tool TEXT, arguments TEXT, result TEXT, expires_at REAL,
+                    PRIMARY KEY (tool, arguments))
+            """)
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Builds the cache from MCP_CACHE_* environment variables."""
+        return cls(default_ttl=float(os.getenv("MCP_CACHE_TTL", str(DEFAULT_TTL))),
+                   disk_path=os.getenv("MCP_CACHE_PATH") or None)
+
+    def ttl(self, tool: str) -> float:
+        return self.ttls.get(tool, self.default_ttl)
+
+    def get(self, tool: str, arguments: Optional[dict]) -> Optional[Any]:
+        key = (tool, canonical_arguments(arguments))
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.metrics["hits"] += 1
+                return json.loads(value)
+        return None
+
+    def put(self, tool: str, arguments: Optional[dict], result: Any):
+        ttl = self.ttl(tool)
+        if result is None or ttl <= 0:
+            return
+        key = (tool, canonical_arguments(arguments))
+        with self._lock:
+            self._store(key, json.dumps(result), time.time() + ttl)
+
+    def fetch(self, tool: str, arguments: Optional[dict], loader: Callable[[], Any]) -> Any:
+        """
+        Returns a fresh cached result, joins an identical call already in flight,
+        or runs `loader()` and caches its result. Loader errors reach every waiter.
+        """
+        if self.ttl(tool) <= 0:
+            return loader()
+
+        key = (tool, canonical_arguments(arguments))
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.metrics["hits"] += 1
+                return json.loads(value)
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.metrics["coalesced"] += 1
+                leader = False
+            else:
+                self.metrics["misses"] += 1
+                future = self._in_flight[key] = Future()
+                leader = True
+
+        if not leader:
+            value = future.result()
+            return json.loads(value) if value is not None else None
+
+        try:
+            result = loader()
+            value = json.dumps(result) if result is not None else None
+            with self._lock:
+                if value is not None:
+                    self._store(key, value, time.time() + self.ttl(tool))
+                self._in_flight.pop(key, None)
+            future.set_result(value)
+            return json.loads(value) if value is not None else None
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+    def invalidate(self, tool: Optional[str] = None):
+        """Drops every entry, or only the entries of one tool."""
+        with self._lock:
+            for key in [k for k in self._entries if tool is None or k[0] == tool]:
+                del self._entries[key]
+            if self._db is not None:
+                if tool is None:
+                    self._db.execute("DELETE FROM tool_results")
+                else:
+                    self._db.execute("DELETE FROM tool_results WHERE tool = ?", (tool,))
+                self._db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"] + self.metrics["coalesced"]
+        saved = self.metrics["hits"] + self.metrics["coalesced"]
+        return {**self.metrics, "entries": len(self._entries),
+                "hit_rate": saved / lookups if lookups else 0.0}
+
+    def print_stats(self):
+        s = self.stats()
+        console.print(f"[cyan]🗃️ MCP Cache: {s['hits']} hits / {s['misses']} misses / "
+                      f"{s['coalesced']} coalesced ({s['hit_rate']:.0%} saved) | disk {s['disk_hits']}[/cyan]")
+
+    def _lookup(self, key: tuple) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        if entry:
+            del self._entries[key]
+        if self._db is not None:
+            row = self._db.execute("SELECT result, expires_at FROM tool_results WHERE tool = ? AND arguments = ?",
+                                   key).fetchone()
+            if row and row[1] > now:
+                self._entries[key] = (row[1], row[0])
+                self.metrics["disk_hits"] += 1
+                return row[0]
+        return None
+
+    def _store(self, key: tuple, value: str, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        if len(self._entries) > self.max_entries:
+            # Drop the entries closest to expiry
+            for stale in sorted(self._entries, key=lambda k: self._entries[k][0])[:len(self._entries) // 10]:
+                del self._entries[stale]
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?)", (*key, value, expires_at))
+            self._db.commit()
@@ -1,33 +1,98 @@
-import requests
-import json
+import asyncio
+import itertools
+import re
 import threading
 import time
 import os
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dotenv import load_dotenv
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import http_transport
+from sse_parser import iter_events, json_loads
+from mcp_cache import MCPResultCache
+
+PROTOCOL_VERSION = "2024-11-05"
+
+_JSON_START = re.compile(r"\s*[\[{]")
+
+
+class MCPError(Exception):
+    """JSON-RPC error returned by the MCP server (or a transport failure for one request)."""
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+def decode_content(result: dict) -> dict:
+    """Taostats returns JSON documents as text content; parse them in place."""
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        for item in result["content"]:
+            if not isinstance(item, dict) or item.get("type") != "text":
+                continue
+            text = item.get("text")
+            if isinstance(text, str) and _JSON_START.match(text):
+                try:
+                    item["text"] = json_loads(text)
+                except ValueError:
+                    pass
+    return result
+
+
+class _NoSessionId(MCPError):
+    """initialize succeeded but the server did not assign an Mcp-Session-Id."""
+
 
 class MCPClient:
     """
-    MCP Client for Taostats:
-    1. POST initialize (keep open as SSE stream).
-    2. Capture Session ID from headers.
-    3. Send other RPCs via separate POSTs to ?sessionId=...
+    Multiplexed MCP Client for Taostats (Streamable HTTP transport):
+    1. POST initialize; the response stays open as the session's SSE stream.
+    2. Capture the Session ID from the `Mcp-Session-Id` header.
+    3. Every RPC gets a unique id and a pending Future; responses are routed by id,
+       whether they arrive in the POST body or on the session stream.
+    4. A single reader thread owns the stream and reconnects (resuming with
+       Last-Event-ID) when it drops; an expired session is re-initialized.
+    Sync API: request / list_tools / call_tool / call_many.
+    Asyncio API: arequest / alist_tools / acall_tool / acall_many.
+    Tool results go through a TTL cache that also coalesces identical in-flight
+    calls (`cache=False` disables it).
     """
-    def __init__(self, full_url: str):
+    def __init__(self, full_url: str, max_in_flight: int = 32, request_timeout: float = 30.0,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0, cache=None):
         self.api_key = self._extract_key(full_url)
         # Base URL is the root
         self.base_url = "https://mcp.taostats.io/"
-        
+        self.request_timeout = request_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
         self.session_id: Optional[str] = None
-        self.session = requests.Session()
+        self.last_event_id: Optional[str] = None
+        self.session = http_transport.new_session(pool_connections=1, pool_maxsize=max_in_flight)
         self.session.headers.update({
             "Authorization": self.api_key,
             "Accept": "application/json, text/event-stream", # Vital for the stream
             "Content-Type": "application/json"
         })
-        
+
+        if cache is None and os.getenv("MCP_CACHE", "1") != "0":
+            cache = MCPResultCache.from_env()
+        self.cache = cache or None
+
         self.ready = False
+        self.reconnects = 0
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._session_ready = threading.Event()
+        self._init_id: Optional[int] = None
+        # Set when the session cannot be established at all; every request then fails fast with it
+        self._fatal: Optional[MCPError] = None
         self._stop_event = threading.Event()
+        self._stream = None
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="mcp-rpc")
 
     def _extract_key(self, url: str) -> str:
         if "api_key=" in url:
@@ -36,161 +101,305 @@ class MCPClient:
             return url.split("apikey=")[1].split("&")[0]
         return ""
 
-    def connect(self):
-        """Starts the SSE stream via 'initialize'."""
+    # --- Connection ---
+
+    def connect(self, timeout: float = 10.0) -> bool:
+        """Starts the session stream and waits (without polling) for the Session ID."""
         print(f"Connecting to {self.base_url} (Key: {self.api_key[:5]}...)")
-        
-        # We start the listener thread which will perform the blocking POST
-        self._thread = threading.Thread(target=self._connect_and_listen, daemon=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._reader_loop, daemon=True)
         self._thread.start()
-        
-        # Wait for Session ID
-        print("Waiting for Session ID...")
-        start_time = time.time()
-        while not self.session_id:
-            if time.time() - start_time > 10:
-                print("Timeout waiting for Session ID.")
-                return False
-            time.sleep(0.1)
-            
+
+        if not self._session_ready.wait(timeout):
+            print("Timeout waiting for Session ID.")
+            return False
+        if self._fatal is not None:
+            print(f"Connection failed: {self._fatal}")
+            return False
         print(f"Got Session ID: {self.session_id}")
-        
-        # Now we can send the next notification
-        self._send_rpc("notifications/initialized", None, id=None)
         self.ready = True
         return True
 
-    def _connect_and_listen(self):
-        """Performs the long-polling POST for initialize."""
+    def close(self):
+        self._stop_event.set()
+        self.ready = False
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        self._fail_pending(MCPError("Client closed"))
+        self._executor.shutdown(wait=False)
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _headers(self, extra: Optional[dict] = None) -> dict:
+        headers = {}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        headers.update(extra or {})
+        return headers
+
+    def _reader_loop(self):
+        """Owns the session stream: (re)initializes, resumes, and routes every event."""
+        delay = self.reconnect_delay
+        missing_session = 0
+        while not self._stop_event.is_set():
+            try:
+                if self.session_id is None:
+                    response = self._open_initialize_stream()
+                else:
+                    resume = {"Last-Event-ID": self.last_event_id} if self.last_event_id else {}
+                    response = self.session.get(self.base_url, headers=self._headers(resume),
+                                                stream=True, timeout=(10, None))
+                    if response.status_code == 404:
+                        # Session expired server-side: start a new one
+                        print("MCP session expired. Re-initializing...")
+                        response.close()
+                        self._reset_session()
+                        continue
+                    if response.status_code != 200:
+                        raise MCPError(f"Stream failed: {response.status_code}")
+
+                self._stream = response
+                delay = self.reconnect_delay
+                missing_session = 0
+                with response:
+                    for event in iter_events(response.iter_content(chunk_size=None)):
+                        if event.id:
+                            self.last_event_id = event.id
+                        self._dispatch_event(event)
+                        if self._stop_event.is_set():
+                            break
+            except _NoSessionId as e:
+                missing_session += 1
+                if missing_session > 1:
+                    # Retried once already: give up instead of re-initializing forever
+                    self._fatal = MCPError(f"{e} (after one retry)")
+                    self._fail_pending(self._fatal)
+                    self._session_ready.set()  # wake waiters; they see _fatal
+                    break
+                print(f"Stream Error: {e}. Retrying initialize once...")
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                print(f"Stream Error: {e}")
+            finally:
+                self._stream = None
+
+            if self.session_id and not self._session_ready.is_set():
+                # Stream dropped before initialize completed: start over with a fresh session
+                self._reset_session()
+            if self._stop_event.wait(delay):
+                break
+            self.reconnects += 1
+            delay = min(self.max_reconnect_delay, delay * 2)
+
+    def _open_initialize_stream(self):
+        """POST initialize; the response body is the session's SSE stream."""
+        msg_id = self._next_id()
+        future = self._register(msg_id)
+        self._init_id = msg_id
+        try:
+            return self._initialize(msg_id, future)
+        except BaseException:
+            self._forget(msg_id)
+            raise
+
+    def _initialize(self, msg_id: int, future: Future):
         payload = {
             "jsonrpc": "2.0",
             "method": "initialize",
             "params": {
-                "protocolVersion": "2024-11-05", # Updated spec
+                "protocolVersion": PROTOCOL_VERSION,
                 "capabilities": {},
                 "clientInfo": {"name": "openclaw", "version": "1.0"}
             },
-            "id": 1
+            "id": msg_id
         }
-        
+        response = self.session.post(self.base_url, json=payload, stream=True, timeout=(10, None))
+        if response.status_code != 200:
+            text = response.text
+            response.close()
+            raise MCPError(f"Initialize failed: {response.status_code} - {text}")
+
+        # Capture Session ID from headers
+        session_id = response.headers.get("mcp-session-id")
+        if not session_id:
+            response.close()
+            raise _NoSessionId("Initialize response has no Mcp-Session-Id header")
+        self.session_id = session_id
+        self.last_event_id = None
+
+        # Plain JSON answer (no stream): route it now, then listen on GET
+        if "text/event-stream" not in response.headers.get("Content-Type", "text/event-stream"):
+            self._dispatch_body(response.content)
+            response.close()
+            self._on_initialized(future)
+            return self.session.get(self.base_url, headers=self._headers(), stream=True, timeout=(10, None))
+
+        future.add_done_callback(self._on_initialized)
+        return response
+
+    def _on_initialized(self, future: Future):
+        if future.exception() is None:
+            self._executor.submit(self._notify, "notifications/initialized")
+            self._session_ready.set()
+
+    def _reset_session(self):
+        self._session_ready.clear()
+        self.session_id = None
+        self.last_event_id = None
+        if self._init_id is not None:
+            # An initialize that never got its answer will not get one on the next session
+            self._forget(self._init_id)
+            self._init_id = None
+
+    # --- Routing ---
+
+    def _register(self, msg_id: int) -> Future:
+        future = Future()
+        with self._pending_lock:
+            self._pending[msg_id] = future
+        return future
+
+    def _forget(self, msg_id: int):
+        with self._pending_lock:
+            self._pending.pop(msg_id, None)
+
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _dispatch_event(self, event):
         try:
-            # This POST opens the stream
-            with self.session.post(self.base_url, json=payload, stream=True, timeout=60) as r:
-                if r.status_code != 200:
-                    print(f"Stream Failed: {r.status_code} - {r.text}")
-                    return
-
-                # Capture Session ID from headers
-                for k, v in r.headers.items():
-                    if k.lower() == "mcp-session-id":
-                        self.session_id = v
-                        break
-                
-                # If not in headers, maybe in body?
-                # Listen to stream
-                for line in r.iter_lines():
-                    if self._stop_event.is_set(): break
-                    if line:
-                        decoded = line.decode('utf-8')
-                        print(f"STREAM: {decoded}")
-                        if decoded.startswith("data: "):
-                            self._handle_data(decoded[6:])
-                            
-        except Exception as e:
-            print(f"Stream Error: {e}")
+            self._dispatch(event.json())
+        except ValueError:
+            print(f"Ignoring malformed SSE event {event!r}")
 
-    def _handle_data(self, data_str, print_output=True):
+    def _dispatch_body(self, body: bytes):
+        if not body:
+            return
         try:
-            msg = json.loads(data_str)
-            if "result" in msg:
-                # print(f"RPC Result: {msg}")
-                if "tools" in msg["result"]:
-                    if print_output:
-                        print("\n=== AVAILABLE TOOLS ===")
-                        for tool in msg["result"]["tools"]:
-                            print(f"- {tool['name']}: {tool.get('description', '')[:80]}...")
-                        print("-----------------------")
-                    return msg["result"]
-                else:
-                    # Generic result (e.g. from tool call)
-                    # Check for nested JSON in content
-                    result = msg["result"]
-                    if "content" in result and isinstance(result["content"], list):
-                         for item in result["content"]:
-                             if item.get("type") == "text" and isinstance(item.get("text"), str):
-                                 try:
-                                     text = item["text"]
-                                     if text.lstrip().startswith(("{", "[")):
-                                         item["text"] = json.loads(text)
-                                 except:
-                                     pass
-                    
-                    if print_output:
-                        print(f"\n[RPC RESULT]: {json.dumps(result, indent=2)}\n")
-                    return result
-        except:
-            pass
-        return None
-
-    def _send_rpc(self, method, params=None, id=None):
-        """Sends a separate POST request and returns the parsed result."""
-        if not self.session_id:
-            print("Cannot send: No Session ID")
-            return None
+            self._dispatch(json_loads(body))
+        except ValueError:
+            print(f"Ignoring malformed JSON-RPC body ({len(body)} bytes)")
+
+    def _dispatch(self, message):
+        """Resolves the pending Future matching a decoded JSON-RPC response (or batch of them)."""
+        for msg in message if isinstance(message, list) else [message]:
+            if not isinstance(msg, dict) or msg.get("id") is None:
+                continue  # server notification
+            with self._pending_lock:
+                future = self._pending.pop(msg["id"], None)
+            if future is None or future.done():
+                continue
+            if "error" in msg:
+                error = msg["error"] or {}
+                future.set_exception(MCPError(error.get("message", "MCP error"), error.get("code"), error.get("data")))
+            else:
+                future.set_result(msg.get("result"))
 
+    # --- RPC ---
+
+    def _post(self, payload: dict) -> Optional[int]:
+        """Sends one JSON-RPC message; any response in the body is routed by id."""
         # Add sessionId query param redundantly
         url = f"{self.base_url}?sessionId={self.session_id}"
-        
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {}
-        }
-        if id is not None:
-            payload["id"] = id
-        
-        try:
-            # Add Mcp-Session-Id header
-            headers = self.session.headers.copy()
-            headers["Mcp-Session-Id"] = self.session_id
-            
-            # The server returns the result directly in the response body, formatted as SSE
-            r = self.session.post(url, json=payload, headers=headers, timeout=30)
-            
+        r = self.session.post(url, json=payload, headers=self._headers(), stream=True, timeout=(10, self.request_timeout))
+        with r:
+            if r.status_code == 404 and self.session_id:
+                return 404
             if r.status_code not in [200, 202]:
-                print(f"RPC Send Failed: {r.status_code} - {r.text}")
-                return None
-
-            # Parse SSE from response and accumulate result
-            accumulated_result = None
-            
-            for line in r.iter_lines():
-                if line:
-                    decoded = line.decode('utf-8')
-                    if decoded.startswith("data: "):
-                        # We use a modified handle_data that returns the result
-                        res = self._handle_data(decoded[6:], print_output=False)
-                        if res:
-                            accumulated_result = res
-            
-            return accumulated_result
-                        
+                raise MCPError(f"RPC Send Failed: {r.status_code} - {r.text}")
+            if r.status_code == 200:
+                if "text/event-stream" in r.headers.get("Content-Type", ""):
+                    for event in iter_events(r.iter_content(chunk_size=None)):
+                        self._dispatch_event(event)
+                else:
+                    self._dispatch_body(r.content)
+        return r.status_code
+
+    def _notify(self, method: str, params: Optional[dict] = None):
+        try:
+            self._post({"jsonrpc": "2.0", "method": method, "params": params or {}})
+        except Exception as e:
+            print(f"Notification {method} failed: {e}")
+
+    def request(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None,
+                _retried: bool = False):
+        """Sends an RPC and blocks until the response with the same id arrives."""
+        timeout = timeout or self.request_timeout
+        if not self._session_ready.wait(timeout):
+            raise MCPError("Cannot send: No Session ID")
+        if self._fatal is not None:
+            raise self._fatal
+
+        msg_id = self._next_id()
+        future = self._register(msg_id)
+        payload = {"jsonrpc": "2.0", "method": method, "params": params or {}, "id": msg_id}
+        try:
+            status = self._post(payload)
+            if status == 404 and not _retried:
+                # Session expired: the reader re-initializes, then the call is replayed once
+                self._forget(msg_id)
+                self._reset_session()
+                if self._stream is not None:
+                    self._stream.close()
+                return self.request(method, params, timeout, _retried=True)
+            return future.result(timeout)
+        except FutureTimeout:
+            raise MCPError(f"Timed out waiting for response to {method} (id={msg_id})")
+        finally:
+            self._forget(msg_id)
+
+    def list_tools(self, print_output: bool = True) -> Optional[List[dict]]:
+        print("Requesting tool list...")
+        try:
+            tools = self.request("tools/list").get("tools", [])
         except Exception as e:
             print(f"RPC Send Error: {e}")
             return None
+        if print_output:
+            print("\n=== AVAILABLE TOOLS ===")
+            for tool in tools:
+                print(f"- {tool['name']}: {tool.get('description', '')[:80]}...")
+            print("-----------------------")
+        return tools
 
-    def list_tools(self):
-        print("Requesting tool list...")
-        self._send_rpc("tools/list", {}, id=2)
+    def call_tool(self, name: str, arguments: Dict[str, Any], use_cache: bool = True):
+        """Calls a tool and returns the result (None on failure). Fresh results come from the cache."""
+        def load():
+            return decode_content(self.request("tools/call", {"name": name, "arguments": arguments}))
+        try:
+            if self.cache is None or not use_cache:
+                return load()
+            return self.cache.fetch(name, arguments, load)
+        except Exception as e:
+            print(f"RPC Send Error: {e}")
+            return None
+
+    def call_many(self, calls: List[Tuple[str, Dict[str, Any]]], use_cache: bool = True) -> List[Optional[dict]]:
+        """Runs many tool calls concurrently over the same session; results keep input order."""
+        futures = [self._executor.submit(self.call_tool, name, arguments, use_cache) for name, arguments in calls]
+        return [f.result() for f in futures]
+
+    # --- Asyncio API ---
+
+    async def arequest(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+        return await asyncio.wrap_future(self._executor.submit(self.request, method, params, timeout))
+
+    async def alist_tools(self) -> Optional[List[dict]]:
+        return await asyncio.wrap_future(self._executor.submit(self.list_tools, False))
+
+    async def acall_tool(self, name: str, arguments: Dict[str, Any]):
+        return await asyncio.wrap_future(self._executor.submit(self.call_tool, name, arguments))
 
-    def call_tool(self, name: str, arguments: Dict[str, Any]):
-        """Calls a tool and returns the result."""
-        # print(f"Calling tool: {name} with args: {arguments}")
-        # ID 3 for calls
-        return self._send_rpc("tools/call", {
-            "name": name,
-            "arguments": arguments
-        }, id=3)
+    async def acall_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[dict]]:
+        return await asyncio.gather(*(self.acall_tool(name, arguments) for name, arguments in calls))
 
 if __name__ == "__main__":
     load_dotenv()
@@ -198,11 +407,10 @@ if __name__ == "__main__":
     if url:
         client = MCPClient(url)
         if client.connect():
-            time.sleep(1)
             client.list_tools()
             try:
                 while True: time.sleep(1)
             except KeyboardInterrupt:
-                pass
+                client.close()
     else:
         print("Set TAOSTATS_MCP_URL")
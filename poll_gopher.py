@@ -1,18 +1,18 @@
-import requests
 import json
 import time
 import sys
 import os
 from dotenv import load_dotenv
+import http_transport
+from gopher_client import BASE_URL, DONE, FAILED, interpret_result, backoff_delay
 
 load_dotenv()
 
 GOPHER_API_KEY = os.getenv("GOPHER_API_KEY")
-BASE_URL = "https://data.gopher-ai.com/api/v1"
 
-def poll_gopher(job_id, interval=5, timeout=60):
+def poll_gopher(job_id, interval=1, timeout=60, max_interval=10):
     """
-    Polls the Gopher API for job completion.
+    Polls the Gopher API for job completion (exponential backoff with jitter).
     """
     url = f"{BASE_URL}/search/live/result/{job_id}"
     headers = {"Authorization": f"Bearer {GOPHER_API_KEY}"}
@@ -21,11 +21,11 @@ def poll_gopher(job_id, interval=5, timeout=60):
     while time.time() - start_time < timeout:
         try:
             print(f"Polling {url}...")
-            response = requests.get(url, headers=headers)
+            response = http_transport.get(url, headers=headers)
             if response.status_code == 200:
-                data = response.json()
+                state, data = interpret_result(response.json())
                 
-                if isinstance(data, list):
+                if state == DONE and isinstance(data, list):
                      print("\nJob Completed!")
                      # Print first item to avoid massive log
                      if len(data) > 0:
@@ -34,29 +34,23 @@ def poll_gopher(job_id, interval=5, timeout=60):
                      else:
                          print("[] (Empty result)")
                      return data
-
-                status = data.get("status")
-                
-                if status == "in progress":
-                    print("Job still in progress...")
-                elif status == "completed" or "result" in data: # Check for success indicators
+                elif state == DONE:
                      print("\nJob Completed!")
                      print(json.dumps(data, indent=2))
                      return data
-                elif status == "failed":
-                    print(f"Job Failed: {data.get('error')}")
+                elif state == FAILED:
+                    print(f"Job Failed: {data}")
                     return None
                 else:
-                    # If the structure is different, print what we got
-                    print(f"Unknown status or completed: {data}")
-                    return data
+                    print("Job still in progress...")
             else:
                 print(f"Request failed with status {response.status_code}: {response.text}")
                 
         except Exception as e:
             print(f"Polling error: {e}")
             
-        time.sleep(interval)
+        interval, delay = backoff_delay(interval, max_interval)
+        time.sleep(delay)
     
     print("Polling timed out.")
     return None
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Per-provider timeout envelopes (seconds) before enough latency has been observed
+PROVIDER_DEFAULTS = {
+    "chutes": {"default_timeout": 30.0, "min_timeout": 5.0, "max_timeout": 60.0},
+    "targon": {"default_timeout": 120.0, "min_timeout": 15.0, "max_timeout": 180.0},
+    "affine": {"default_timeout": 30.0, "min_timeout": 5.0, "max_timeout": 60.0},
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"Circuit open for {provider} (retry in {retry_in:.1f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ProviderHealth:
+    """
+    Rolling health of one provider: p50/p99 latency, error rate, a
+    closed/open/half-open circuit breaker and a timeout derived from latency.
+    """
+    def __init__(self, name: str, window: int = 100, min_samples: int = 5, error_threshold: float = 0.5,
+                 consecutive_failures: int = 3, cooldown: float = 30.0, timeout_multiplier: float = 1.5,
+                 default_timeout: float = 30.0, min_timeout: float = 5.0, max_timeout: float = 120.0):
+        self.name = name
+        self.min_samples = min_samples
+        self.error_threshold = error_threshold
+        self.consecutive_failures_limit = consecutive_failures
+        self.cooldown = cooldown
+        self.timeout_multiplier = timeout_multiplier
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may be attempted now. Half-open lets one trial call through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            # A trial abandoned without an outcome (e.g. a cancelled hedge) must not wedge the breaker
+            if self._trial_in_flight and time.monotonic() - self._trial_started < self.max_timeout:
+                return False
+            self._trial_in_flight = True
+            self._trial_started = time.monotonic()
+            return True
+
+    def check(self):
+        """Raises CircuitOpenError if the provider must be skipped."""
+        if not self.allow():
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self, latency: Optional[float] = None):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                console.print(f"[green]🩺 {self.name}: breaker closed (provider recovered).[/green]")
+            self.state = CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self, latency: Optional[float] = None):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+
+            if self.state == HALF_OPEN or self._should_trip():
+                if self.state != OPEN:
+                    console.print(f"[red]🩺 {self.name}: breaker OPEN for {self.cooldown:.0f}s "
+                                  f"(error rate {self.error_rate():.0%}).[/red]")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= self.consecutive_failures_limit:
+            return True
+        return len(self._outcomes) >= self.min_samples and self.error_rate() >= self.error_threshold
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return 1.0 - sum(self._outcomes) / len(self._outcomes)
+
+    def latency(self, q: float) -> float:
+        return _percentile(sorted(self._latencies), q)
+
+    def timeout(self) -> float:
+        """Per-call timeout: p99 latency times a safety margin, clamped to the envelope."""
+        if len(self._latencies) < self.min_samples:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.latency(0.99) * self.timeout_multiplier))
+
+    def snapshot(self) -> dict:
+        return {
+            "provider": self.name,
+            "state": self.state,
+            "p50_s": self.latency(0.5),
+            "p99_s": self.latency(0.99),
+            "error_rate": self.error_rate(),
+            "timeout_s": self.timeout(),
+            "samples": len(self._outcomes)
+        }
+
+
+class HealthRegistry:
+    """Shared health-tracking layer for every BrainRouter tier (one ProviderHealth per provider)."""
+    def __init__(self, **overrides):
+        self.overrides = overrides
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> ProviderHealth:
+        with self._lock:
+            if provider not in self._providers:
+                settings = {**PROVIDER_DEFAULTS.get(provider, {}), **self.overrides}
+                self._providers[provider] = ProviderHealth(provider, **settings)
+            return self._providers[provider]
+
+    def snapshot(self) -> list:
+        return [health.snapshot() for health in self._providers.values()]
+
+    def print_table(self):
+        table = Table(title="Provider Health")
+        for column in ["Provider", "Breaker", "p50", "p99", "Errors", "Timeout", "Samples"]:
+            table.add_column(column)
+        colors = {CLOSED: "green", HALF_OPEN: "yellow", OPEN: "red"}
+        for s in self.snapshot():
+            color = colors[s["state"]]
+            table.add_row(s["provider"], f"[{color}]{s['state']}[/{color}]", f"{s['p50_s']:.2f}s",
+                          f"{s['p99_s']:.2f}s", f"{s['error_rate']:.0%}", f"{s['timeout_s']:.1f}s", str(s["samples"]))
+        console.print(table)
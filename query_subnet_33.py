@@ -1,6 +1,7 @@
 from mcp_client import MCPClient
+from subnet_history import SubnetHistory
 import os
-import time
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,18 +13,14 @@ if not url:
 
 client = MCPClient(url)
 if client.connect():
-    time.sleep(1)
-    
     # Try getting Stats first (general)
     # Then try GetLatestSubnetPool for netuid 33
     
     print("\n--- Querying Subnet 33 Metrics ---\n")
-    client.call_tool("GetLatestSubnetPool", {"netuid": 33})
-    
-    # Keep alive briefly to get response
-    try:
-        time.sleep(5)
-    except KeyboardInterrupt:
-        pass
+    # call_tool blocks until the response with its request id arrives
+    result = client.call_tool("GetLatestSubnetPool", {"netuid": 33})
+    SubnetHistory().append_result(result)
+    print(json.dumps(result, indent=2))
+    client.close()
 else:
     print("Failed to connect")
@@ -0,0 +1,191 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from rich.console import Console
+
+console = Console()
+
+# Tiers whose responses must never be stored (TEE prompts stay inside the enclave)
+UNCACHEABLE_TIERS = {"secure"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt used for cache keys."""
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def hashing_embedding(text: str, dim: int = 256) -> List[float]:
+    """
+    Cheap local embedding: hashed character trigrams, L2-normalized.
+    Good enough to catch near-duplicate prompts (typos, punctuation, word order noise).
+    """
+    vec = [0.0] * dim
+    padded = f"  {text}  "
+    for i in range(len(padded) - 2):
+        digest = hashlib.md5(padded[i:i + 3].encode("utf-8")).digest()
+        vec[int.from_bytes(digest[:4], "little") % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class ResponseCache:
+    """
+    Response cache in front of the BrainRouter tiers.
+    Keyed by (tier, model, system prompt hash, normalized prompt) with:
+    - an in-memory LRU layer with TTL,
+    - an optional SQLite layer that survives restarts (`disk_path`),
+    - an optional embedding-similarity lookup for near-duplicate prompts
+      (`similarity_threshold`, cosine in [0, 1]).
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, disk_path: Optional[str] = None,
+                 similarity_threshold: Optional[float] = None, embedder: Callable = hashing_embedding):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+        self.metrics = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0,
+                        "similar_hits": 0, "latency_saved_s": 0.0, "invalidations": 0}
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, tier TEXT, model TEXT, system_hash TEXT,
+                    prompt TEXT, response TEXT, latency REAL, created_at REAL)
+            """)
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Builds the cache from BRAIN_CACHE_* environment variables."""
+        threshold = os.getenv("BRAIN_CACHE_SIMILARITY")
+        return cls(
+            max_entries=int(os.getenv("BRAIN_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("BRAIN_CACHE_TTL", "3600")),
+            disk_path=os.getenv("BRAIN_CACHE_PATH") or None,
+            similarity_threshold=float(threshold) if threshold else None
+        )
+
+    @staticmethod
+    def system_hash(system_prompt: str) -> str:
+        return hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+
+    def make_key(self, tier: str, model: str, system_prompt: str, prompt: str) -> str:
+        raw = "\x1f".join([tier, model, self.system_hash(system_prompt), normalize_prompt(prompt)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, tier: str, model: str, system_prompt: str, prompt: str) -> Optional[str]:
+        """Returns a cached response or None. Updates hit/miss metrics."""
+        if tier in UNCACHEABLE_TIERS:
+            return None
+
+        key = self.make_key(tier, model, system_prompt, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry["created_at"] <= self.ttl:
+                self._entries.move_to_end(key)
+                return self._hit(entry, "memory_hits")
+            if entry:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[2] <= self.ttl:
+                    entry = self._store(key, tier, model, system_prompt, prompt, row[0], row[1], row[2])
+                    return self._hit(entry, "disk_hits")
+
+            if self.similarity_threshold is not None:
+                entry = self._most_similar(tier, model, self.system_hash(system_prompt), prompt, now)
+                if entry:
+                    return self._hit(entry, "similar_hits")
+
+            self.metrics["misses"] += 1
+            return None
+
+    def put(self, tier: str, model: str, system_prompt: str, prompt: str, response: str, latency: float = 0.0):
+        """Stores a response along with how long the provider took to produce it."""
+        if tier in UNCACHEABLE_TIERS or response is None:
+            return
+
+        key = self.make_key(tier, model, system_prompt, prompt)
+        now = time.time()
+        with self._lock:
+            self._store(key, tier, model, system_prompt, prompt, response, latency, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, tier, model, self.system_hash(system_prompt), prompt, response, latency, now)
+                )
+                self._db.commit()
+
+    def invalidate(self):
+        """Drops every entry (memory and disk). Called when SOUL.md is rewritten."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+            self.metrics["invalidations"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "entries": len(self._entries),
+            "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        console.print(f"[cyan]🗃️ Response Cache: {s['hits']} hits / {s['misses']} misses "
+                      f"({s['hit_rate']:.0%}) | memory {s['memory_hits']} · disk {s['disk_hits']} · "
+                      f"similar {s['similar_hits']} | saved {s['latency_saved_s']:.1f}s[/cyan]")
+
+    def _hit(self, entry: dict, layer: str) -> str:
+        self.metrics["hits"] += 1
+        self.metrics[layer] += 1
+        self.metrics["latency_saved_s"] += entry["latency"]
+        return entry["response"]
+
+    def _store(self, key, tier, model, system_prompt, prompt, response, latency, created_at) -> dict:
+        entry = {
+            "tier": tier,
+            "model": model,
+            "system_hash": self.system_hash(system_prompt),
+            "response": response,
+            "latency": latency,
+            "created_at": created_at,
+            "embedding": self.embedder(normalize_prompt(prompt)) if self.similarity_threshold is not None else None
+        }
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _most_similar(self, tier, model, system_hash, prompt, now) -> Optional[dict]:
+        query = self.embedder(normalize_prompt(prompt))
+        best, best_score = None, self.similarity_threshold
+        for entry in self._entries.values():
+            if entry["tier"] != tier or entry["model"] != model or entry["system_hash"] != system_hash:
+                continue
+            if entry["embedding"] is None or now - entry["created_at"] > self.ttl:
+                continue
+            score = sum(a * b for a, b in zip(query, entry["embedding"]))
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_TTL = 3600.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Query parameters that never change page content
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "ref_src")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical URL for cache keys: lowercase scheme/host, no default port, fragment or tracking params, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith(TRACKING_PARAMS))
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def parse_domain_ttls(value: str) -> Dict[str, float]:
+    """Per-domain TTLs from "domain=seconds" pairs separated by commas, e.g. "x.com=300,docs.python.org=86400"."""
+    ttls = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        domain, sep, ttl = item.partition("=")
+        if not sep or not domain.strip():
+            raise ValueError(f"Invalid domain TTL '{item.strip()}' (expected domain=seconds)")
+        ttls[domain.strip().lower().lstrip(".")] = float(ttl)
+    return ttls
+
+
+class ScrapeCache:
+    """
+    Local cache for scraped pages (Gopher jobs, StealthBrowser fetches).
+    - keyed by (kind, normalized URL, scrape parameters),
+    - bodies stored content-addressed (sha256) and zlib-compressed under `root/objects/`,
+      so identical pages fetched through different keys are stored once,
+    - per-domain TTLs (`domain_ttls`, suffix match) with ETag/Last-Modified kept for revalidation,
+    - size-bounded LRU eviction of entries and unreferenced bodies.
+    """
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 default_ttl: float = DEFAULT_TTL, domain_ttls: Optional[Dict[str, float]] = None):
+        self.root = root or os.getenv("SCRAPE_CACHE_DIR", "scrape_cache")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.domain_ttls = domain_ttls or {}
+        self.metrics = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, url TEXT, digest TEXT, size INTEGER, status INTEGER,
+                headers TEXT, etag TEXT, last_modified TEXT, stored_at REAL, accessed_at REAL)
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds the cache from SCRAPE_CACHE_* environment variables (TTL in seconds, size in MB).
+        SCRAPE_CACHE_DOMAIN_TTLS overrides the TTL per domain, e.g. "x.com=300,docs.python.org=86400".
+        """
+        return cls(max_bytes=int(float(os.getenv("SCRAPE_CACHE_MB", "256")) * 1024 * 1024),
+                   default_ttl=float(os.getenv("SCRAPE_CACHE_TTL", str(DEFAULT_TTL))),
+                   domain_ttls=parse_domain_ttls(os.getenv("SCRAPE_CACHE_DOMAIN_TTLS", "")))
+
+    @staticmethod
+    def make_key(kind: str, url: str, params: Optional[dict] = None) -> str:
+        raw = "\x1f".join([kind, normalize_url(url), json.dumps(params or {}, sort_keys=True)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl(self, url: str) -> float:
+        host = (urlsplit(url).hostname or "").lower()
+        for domain, ttl in self.domain_ttls.items():
+            if host == domain or host.endswith(f".{domain}"):
+                return ttl
+        return self.default_ttl
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    # --- Reads ---
+
+    def get(self, kind: str, url: str, params: Optional[dict] = None, allow_stale: bool = False) -> Optional[dict]:
+        """
+        Cached entry {"body", "status", "headers", "etag", "last_modified", "fresh"} or None.
+        Stale entries are only returned with `allow_stale` (for conditional revalidation).
+        """
+        key = self.make_key(kind, url, params)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, status, headers, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.metrics["misses"] += 1
+                return None
+            fresh = time.time() - row[5] <= self.ttl(url)
+            if not fresh and not allow_stale:
+                self.metrics["stale"] += 1
+                return None
+            try:
+                with open(self._object_path(row[0]), "rb") as f:
+                    body = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                # Body evicted or corrupted underneath the index: forget the entry
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                self.metrics["misses"] += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.metrics["hits" if fresh else "stale"] += 1
+            return {"body": body, "status": row[1], "headers": json.loads(row[2] or "{}"),
+                    "etag": row[3], "last_modified": row[4], "fresh": fresh}
+
+    def get_json(self, kind: str, url: str, params: Optional[dict] = None):
+        entry = self.get(kind, url, params)
+        return json.loads(entry["body"]) if entry else None
+
+    # --- Writes ---
+
+    def put(self, kind: str, url: str, body: bytes, params: Optional[dict] = None, status: int = 200,
+            headers: Optional[dict] = None, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Stores a body content-addressed and (re)points the key at it."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        key = self.make_key(kind, url, params)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(zlib.compress(body, 6))
+                os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            previous = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), digest, size, status, json.dumps(headers or {}),
+                 etag, last_modified, now, now)
+            )
+            self._db.commit()
+            if previous and previous[0] != digest:
+                # The key moved to new content: the old body goes once nothing else points at it
+                self._release(previous[0])
+            self._evict()
+
+    def put_json(self, kind: str, url: str, value, params: Optional[dict] = None):
+        self.put(kind, url, json.dumps(value).encode("utf-8"), params)
+
+    def freshen(self, kind: str, url: str, params: Optional[dict] = None):
+        """Marks a stale entry fresh again after a 304 Not Modified."""
+        key = self.make_key(kind, url, params)
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+            self.metrics["revalidated"] += 1
+
+    def _evict(self):
+        """LRU: drops least recently used entries until the distinct bodies fit in `max_bytes`."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, digest in self._db.execute("SELECT key, digest FROM entries ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.metrics["evictions"] += 1
+            total -= self._release(digest)
+            if total <= self.max_bytes:
+                break
+        self._db.commit()
+
+    def _release(self, digest: str) -> int:
+        """Deletes a body object no entry references any more. Returns the bytes freed."""
+        if self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return 0
+        path = self._object_path(digest)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return 0
+        return size
+
+    def stats(self) -> dict:
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {**self.metrics, "entries": entries, "bytes": size}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_scrape_cache() -> ScrapeCache:
+    """Process-wide scrape cache shared by GopherClient and StealthBrowser."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ScrapeCache.from_env()
+        return _shared
@@ -10,6 +10,14 @@ class SoulManager:
     def __init__(self, soul_path="SOUL.md"):
         self.soul_path = soul_path
         self.trainer = TrajectoryTrainer()
+        self._refresh_listeners = []
+
+    def on_refresh(self, callback):
+        """
+        Registers a callback fired after SOUL.md is rewritten
+        (e.g. to drop cached responses produced under the old soul).
+        """
+        self._refresh_listeners.append(callback)
 
     def refresh_soul(self):
         """
@@ -18,6 +26,8 @@ class SoulManager:
         try:
             opp = self.trainer.fetch_opp()
             self._write_soul(opp)
+            for callback in self._refresh_listeners:
+                callback()
             return True
         except Exception as e:
             print(f"[red]Failed to refresh soul: {e}[/red]")
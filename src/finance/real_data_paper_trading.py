@@ -4,10 +4,14 @@
 # TEMA: Simulação de investimentos com Loop de Vigília (Sentinela)
 # ====================================================================
 
+import os
+import sys
 import time
-import requests
 from datetime import datetime
-import sys
+
+# Rodando direto de src/finance/, a raiz do repo (onde mora o http_transport) entra no path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import http_transport
 
 class RealDataPaperTrading:
     """
@@ -35,7 +39,7 @@ class RealDataPaperTrading:
         url = f"https://api.coingecko.com/api/v3/simple/price?ids={api_id}&vs_currencies=usd"
         
         try:
-            resposta = requests.get(url, timeout=5)
+            resposta = http_transport.get(url, timeout=5)
             dados = resposta.json()
             return float(dados[api_id]["usd"])
         except Exception as e:
@@ -1,5 +1,4 @@
 import os
-import requests
 from dotenv import load_dotenv
 
 # Carrega as chaves do cofre
@@ -26,7 +25,7 @@ class HippiusVault:
 
         try:
             # Simulação do envio para a rede SN75
-            # response = requests.post(
+            # response = http_transport.post(
             #     f"{self.endpoint}/upload",
             #     files={"file": (filename, content.encode('utf-8'))},
             #     headers={"Authorization": f"Bearer {self.api_key}"}
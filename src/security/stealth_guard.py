@@ -1,5 +1,4 @@
 import os
-import requests
 from dotenv import load_dotenv
 
 # Carrega a blindagem
@@ -27,7 +26,7 @@ class StealthGuard:
 
         try:
             # Simulação: O agente pede à SN61 para buscar a página por ele
-            # response = requests.post("https://api.redteam.tao/v1/proxy", json={"url": target_url})
+            # response = http_transport.post("https://api.redteam.tao/v1/proxy", json={"url": target_url})
             
             print("    ✅ [Sucesso] Firewall burlado. Conteúdo extraído com segurança.")
             return f"Conteúdo HTML de {target_url} recuperado sem detecção."
@@ -1,5 +1,5 @@
 import os
-import requests
+import http_transport
 
 class ManakoVision:
     def __init__(self):
@@ -21,7 +21,7 @@ class ManakoVision:
             mode = "image_captioning"
 
         try:
-            response = requests.post(
+            response = http_transport.post(
                 f"{self.endpoint}/{mode}",
                 json=payload,
                 headers={"Authorization": f"Bearer {self.api_key}"}
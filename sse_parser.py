@@ -0,0 +1,140 @@
+import json
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+
+def json_loads(data):
+    """Decodes JSON from bytes/str with orjson when installed, else the stdlib parser."""
+    return _loads(data)
+
+
+def _copy(buf: bytearray, start: int, end: int) -> bytes:
+    # Exactly one copy: slicing a memoryview is free, bytes() materializes it
+    with memoryview(buf) as view:
+        return bytes(view[start:end])
+
+
+class SSEEvent:
+    """One Server-Sent Event. `data` stays raw bytes; `json()` decodes it once and caches the value."""
+    __slots__ = ("id", "event", "data", "retry", "_json")
+    _UNSET = object()
+
+    def __init__(self, data: bytes, id: Optional[str] = None, event: Optional[str] = None,
+                 retry: Optional[int] = None):
+        self.data = data
+        self.id = id
+        self.event = event or "message"
+        self.retry = retry
+        self._json = self._UNSET
+
+    def json(self):
+        if self._json is self._UNSET:
+            self._json = json_loads(self.data)
+        return self._json
+
+    @property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    def __repr__(self):
+        return f"SSEEvent(id={self.id!r}, event={self.event!r}, data={len(self.data)} bytes)"
+
+
+class SSEParser:
+    """
+    Incremental SSE parser working on byte chunks as they arrive from the socket.
+    - lines may end in \\n or \\r\\n and may be split across chunks,
+    - multi-line `data:` fields are reassembled with \\n,
+    - `id:` / `event:` / `retry:` fields and `:` comments follow the SSE spec,
+    - each chunk is scanned once; consumed bytes are dropped in a single slice.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scanned = 0
+        self._data: List[bytes] = []
+        self._event = None
+        self._id = None
+        self._retry = None
+        self.last_event_id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Consumes a chunk and returns the events it completed."""
+        buf = self._buffer
+        buf += chunk
+        events = []
+        start = 0
+        while True:
+            end = buf.find(b"\n", self._scanned)
+            if end < 0:
+                self._scanned = len(buf)
+                break
+            line_end = end - 1 if end > start and buf[end - 1] == 0x0D else end
+            event = self._line(buf, start, line_end)
+            if event is not None:
+                events.append(event)
+            start = self._scanned = end + 1
+        if start:
+            del buf[:start]
+            self._scanned -= start
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """Ends the stream: a trailing event without its blank line is still emitted."""
+        events = []
+        if self._buffer:
+            self._buffer += b"\n"
+            events = self.feed(b"")
+        event = self._dispatch()
+        return events + ([event] if event else [])
+
+    def _line(self, buf: bytearray, start: int, end: int) -> Optional[SSEEvent]:
+        if start == end:
+            return self._dispatch()
+        if buf[start] == 0x3A:  # ":" comment / keep-alive
+            return None
+        colon = buf.find(b":", start, end)
+        if colon < 0:
+            field, value = _copy(buf, start, end), b""
+        else:
+            field = _copy(buf, start, colon)
+            value_start = colon + 1
+            if value_start < end and buf[value_start] == 0x20:
+                value_start += 1
+            value = _copy(buf, value_start, end)
+
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"id":
+            if b"\x00" not in value:
+                self._id = value.decode("utf-8")
+        elif field == b"event":
+            self._event = value.decode("utf-8")
+        elif field == b"retry" and value.isdigit():
+            self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if self._id is not None:
+            self.last_event_id = self._id
+        if not self._data:
+            self._event, self._id = None, None
+            return None
+        data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+        event = SSEEvent(data, self.last_event_id, self._event, self._retry)
+        self._data, self._event, self._id = [], None, None
+        return event
+
+
+def iter_events(chunks: Iterable[bytes]) -> Iterator[SSEEvent]:
+    """Streams parsed events from an iterable of raw byte chunks (e.g. `response.iter_content(None)`)."""
+    parser = SSEParser()
+    for chunk in chunks:
+        if chunk:
+            yield from parser.feed(chunk)
+    yield from parser.flush()
@@ -1,18 +1,171 @@
 import os
 import requests
 import random
-from typing import Dict, Any, Optional
+import threading
+import time
+import weakref
+import http_transport
+from requests.structures import CaseInsensitiveDict
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+from scrape_cache import ScrapeCache, get_scrape_cache
+
+# High-security profile for ADA v2 compliance
+PROFILE_REQUIREMENTS = {"obfuscation": "kernel", "framework": "nstbrowser"}
+
+
+def requirements_key(requirements: Optional[Dict[str, str]]) -> Tuple:
+    return tuple(sorted((requirements or {}).items()))
+
+
+def _weakly(method: Callable) -> Callable:
+    """Calls a bound method without keeping its object alive (so a pool thread never pins its browser)."""
+    ref = weakref.WeakMethod(method)
+
+    def call(*args):
+        bound = ref()
+        return bound(*args) if bound is not None else None
+    return call
+
+
+class ProfilePool:
+    """
+    Pre-warmed pool of SN61 fingerprints, `size` per requirement set.
+    - `take()` never blocks: it rotates through valid profiles round-robin and returns None when empty,
+    - a daemon thread refills pools that run low and replaces profiles close to expiry,
+    - all state sits behind one lock, so threads and async tasks can share the pool.
+    """
+    def __init__(self, fetch: Callable[[Optional[Dict[str, str]]], Optional[Dict[str, Any]]], size: int = 4,
+                 ttl: float = 900.0, refresh_interval: float = 60.0, refresh_margin: float = 0.2):
+        self.fetch = fetch
+        self.size = size
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.refresh_margin = refresh_margin
+        self.metrics = {"hits": 0, "empty": 0, "fetched": 0, "expired": 0}
+        self._pools: Dict[Tuple, Deque[Tuple[Dict[str, Any], float]]] = {}
+        self._requirements: Dict[Tuple, Optional[Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def warm(self, requirements: Optional[Dict[str, str]] = None):
+        """Registers a requirement set and starts filling it in the background."""
+        key = requirements_key(requirements)
+        with self._lock:
+            self._requirements.setdefault(key, requirements)
+            self._pools.setdefault(key, deque())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-pool", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def take(self, requirements: Optional[Dict[str, str]] = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Next valid (profile, expires_at) for the requirement set (rotated to the back), or None if the
+        pool is empty. expires_at is on the time.monotonic() clock.
+        """
+        key = requirements_key(requirements)
+        now = time.monotonic()
+        profile = None
+        with self._lock:
+            pool = self._pools.get(key)
+            while pool:
+                candidate, expires = pool.popleft()
+                if expires > now:
+                    pool.append((candidate, expires))
+                    profile = (candidate, expires)
+                    break
+                self.metrics["expired"] += 1
+            low = key not in self._pools or len(self._pools[key]) < self.size
+            self.metrics["hits" if profile else "empty"] += 1
+        if low:
+            self.warm(requirements)
+        return profile
+
+    def refill(self):
+        """Tops every registered pool up to `size` fresh profiles (run by the background thread)."""
+        with self._lock:
+            wanted = list(self._requirements.items())
+        for key, requirements in wanted:
+            while not self._closed:
+                now = time.monotonic()
+                with self._lock:
+                    pool = self._pools[key]
+                    # Drop expired profiles; ones about to expire are replaced ahead of time
+                    for entry in [e for e in pool if e[1] <= now]:
+                        pool.remove(entry)
+                        self.metrics["expired"] += 1
+                    healthy = sum(1 for _, expires in pool if expires - now > self.ttl * self.refresh_margin)
+                    if healthy >= self.size:
+                        break
+                profile = self.fetch(requirements)
+                if not profile:
+                    break
+                with self._lock:
+                    self._pools[key].append((profile, time.monotonic() + self.ttl))
+                    self.metrics["fetched"] += 1
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(timeout=self.refresh_interval)
+            self._wake.clear()
+            try:
+                self.refill()
+            except Exception as e:
+                print(f"[RedTeam] Profile pool refresh failed: {e}")
+
+    def available(self, requirements: Optional[Dict[str, str]] = None) -> int:
+        with self._lock:
+            return len(self._pools.get(requirements_key(requirements), ()))
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+
 
 class StealthBrowser:
     """
     Adapter for RedTeam (Subnet 61) - Stealth Browser.
     Provides human-like browser fingerprints to evade detection.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[ScrapeCache] = None, profile_ttl: Optional[float] = None):
         self.api_key = os.getenv("REDTEAM_API_KEY")
         # Placeholder URL - User needs to confirm actual endpoint or SDK
         self.base_url = os.getenv("REDTEAM_API_URL", "https://api.redteam.tensor/v1")
         self.current_profile = None
+        self._cache = cache
+        # Fingerprint sessions per domain: {domain: (profile, expires_at)}
+        self.profile_ttl = profile_ttl if profile_ttl is not None else float(os.getenv("REDTEAM_PROFILE_TTL", "900"))
+        self._profiles: Dict[str, tuple] = {}
+        self._profiles_lock = threading.Lock()
+        # Pre-warmed SN61 profiles so browse() never waits on the remote API
+        self.pool = ProfilePool(_weakly(self._request_profile), size=int(os.getenv("REDTEAM_POOL_SIZE", "4")),
+                                ttl=self.profile_ttl)
+        if self.configured:
+            self.pool.warm(PROFILE_REQUIREMENTS)
+
+    def close(self):
+        """Stops the pool's refresh thread."""
+        self.pool.close()
+
+    def __del__(self):
+        pool = getattr(self, "pool", None)
+        if pool is not None:
+            pool.close()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key) and "xxxx" not in self.api_key
+
+    @property
+    def cache(self) -> Optional[ScrapeCache]:
+        """Scrape cache (shared one unless injected); SCRAPE_CACHE=0 disables it."""
+        if self._cache is None and os.getenv("SCRAPE_CACHE", "1") != "0":
+            self._cache = get_scrape_cache()
+        return self._cache
 
     def get_profile(self, requirements: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """
@@ -20,10 +173,15 @@ class StealthBrowser:
         Args:
             requirements: Dict specifying security needs (e.g., {"obfuscation": "kernel"}).
         """
-        if not self.api_key or "xxxx" in self.api_key:
+        if not self.configured:
             # Fallback for testing/unconfigured state
             return self._local_fallback_profile()
+        return self._request_profile(requirements) or self._local_fallback_profile()
 
+    def _request_profile(self, requirements: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """One SN61 profile request; None when unconfigured or on failure."""
+        if not self.configured:
+            return None
         try:
             # Hypothetical API call
             headers = {"Authorization": f"Bearer {self.api_key}"}
@@ -32,30 +190,79 @@ class StealthBrowser:
                 payload["requirements"] = requirements
 
             # Post request if sending payload, or query params. Assuming POST for complex queries.
-            resp = requests.post(f"{self.base_url}/profile", json=payload, headers=headers, timeout=5)
+            resp = http_transport.post(f"{self.base_url}/profile", json=payload, headers=headers, timeout=5)
             
             if resp.status_code == 200:
                 self.current_profile = resp.json()
                 return self.current_profile
             else:
                 print(f"[RedTeam] Failed to fetch profile: {resp.status_code}")
-                return self._local_fallback_profile()
+                return None
         except Exception as e:
             print(f"[RedTeam] Error fetching profile: {e}")
+            return None
+
+    def profile_for(self, url: str) -> Dict[str, Any]:
+        """
+        Fingerprint session for the URL's domain: taken from the pre-warmed pool once and reused
+        for `profile_ttl` seconds, or until the profile itself expires if that is sooner. Never waits on SN61: with an empty pool the local fallback
+        profile is used (not pinned to the domain) while the pool refills in the background.
+        """
+        domain = (urlsplit(url).hostname or "").lower()
+        with self._profiles_lock:
+            entry = self._profiles.get(domain)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+        entry = self.pool.take(PROFILE_REQUIREMENTS) if self.configured else None
+        if entry is None:
             return self._local_fallback_profile()
+        profile, expires = entry
+        with self._profiles_lock:
+            self._profiles[domain] = (profile, min(expires, time.monotonic() + self.profile_ttl))
+        return profile
 
-    def browse(self, url: str) -> requests.Response:
+    def browse(self, url: str, use_cache: bool = True) -> requests.Response:
         """
         Performs a GET request using the stealth profile headers.
+        Fresh cached pages are returned without touching the network; stale ones are
+        revalidated with If-None-Match / If-Modified-Since and reused on 304.
         """
-        # Request high-security profile for ADA v2 compliance
-        mask = self.get_profile(requirements={"obfuscation": "kernel", "framework": "nstbrowser"})
+        cache = self.cache if use_cache else None
+        cached = cache.get("browse", url, allow_stale=True) if cache else None
+        if cached and cached["fresh"]:
+            return self._cached_response(url, cached)
+
+        mask = self.profile_for(url)
         
         # Clean mask to only include headers requests expects
-        headers = mask.get("headers", self._local_fallback_profile()["headers"])
+        headers = dict(mask.get("headers", self._local_fallback_profile()["headers"]))
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
         
         print(f"[StealthBrowser] Browsing {url} with ADA v2 mask...")
-        return requests.get(url, headers=headers, timeout=15)
+        resp = http_transport.get(url, headers=headers, timeout=15)
+        if cached and resp.status_code == 304:
+            cache.freshen("browse", url)
+            return self._cached_response(url, cached)
+        if cache and resp.status_code == 200:
+            cache.put("browse", url, resp.content, status=resp.status_code,
+                      headers={"Content-Type": resp.headers.get("Content-Type", "")},
+                      etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+        return resp
+
+    @staticmethod
+    def _cached_response(url: str, cached: Dict[str, Any]) -> requests.Response:
+        """Rebuilds a requests.Response from a scrape cache entry."""
+        resp = requests.Response()
+        resp.url = url
+        resp.status_code = cached["status"]
+        resp.headers = CaseInsensitiveDict(cached["headers"])
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp._content = cached["body"]
+        return resp
 
     def _local_fallback_profile(self) -> Dict[str, Any]:
         """Returns a generic high-quality fingerprint if SN61 is unavailable."""
@@ -0,0 +1,307 @@
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from rich.console import Console
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+console = Console()
+
+# Column name -> array typecode. One append-only file per column ("<dir>/<name>.col").
+COLUMNS = {
+    "netuid": "i",
+    "block_number": "q",
+    "timestamp": "d",
+    "price": "d",
+    "market_cap": "d",
+    "liquidity": "d",
+    "tao_volume_24_hr": "d",
+    "total_tao": "d",
+    "total_alpha": "d",
+    "buys_24_hr": "q",
+    "sells_24_hr": "q",
+}
+METRICS = [name for name in COLUMNS if name not in ("netuid", "block_number", "timestamp")]
+
+AGGREGATES = {
+    "mean": lambda values: sum(values) / len(values),
+    "min": min,
+    "max": max,
+    "first": lambda values: values[0],
+    "last": lambda values: values[-1],
+}
+
+
+def _number(value, integer: bool = False):
+    """Taostats returns most numbers as strings; missing/invalid values become NaN (or 0 for counts)."""
+    try:
+        return int(float(value)) if integer else float(value)
+    except (TypeError, ValueError):
+        return 0 if integer else float("nan")
+
+
+def _timestamp(value, default: float) -> float:
+    """Unix time from a Taostats timestamp (ISO-8601 string or number)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return default
+
+
+def _unmap(mapped):
+    """Releases a column mapping. A caller still holding a view keeps it alive until garbage collection."""
+    if not mapped:
+        return
+    m, view, _ = mapped
+    try:
+        view.release()
+        m.close()
+    except BufferError:
+        pass
+
+
+class SubnetHistory:
+    """
+    Local time-series store for Taostats `GetLatestSubnetPool` snapshots.
+    Columnar and append-only: each field is a flat binary file read through mmap,
+    so queries never parse or load the whole history. Rows are keyed by
+    (netuid, block_number); duplicate or older blocks for a netuid are ignored.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SUBNET_HISTORY_DIR", "subnet_history")
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, tuple] = {}
+        self._rows_by_netuid: Dict[int, array] = {}
+        self._last_block: Dict[int, int] = {}
+        self.rows = 0
+        with self._file_lock():
+            self._sync()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.col")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the store across processes (e.g. the --watch dashboard and a collector)."""
+        with open(os.path.join(self.path, ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _sync(self):
+        """Picks up rows other writers appended since we last looked. Caller holds the file lock."""
+        known = self.rows
+        self.rows = self._repair()
+        if self.rows < known:
+            # Another process repaired a torn tail we had indexed: rebuild the row index
+            known = 0
+            self._rows_by_netuid, self._last_block = {}, {}
+        self._refresh()
+        netuids, blocks = self._column("netuid"), self._column("block_number")
+        for row in range(known, self.rows):
+            self._rows_by_netuid.setdefault(netuids[row], array("q")).append(row)
+            self._last_block[netuids[row]] = blocks[row]
+
+    def _repair(self) -> int:
+        """Truncates columns to the shortest one, dropping a row torn by a crash mid-append."""
+        counts = []
+        for name, code in COLUMNS.items():
+            size = os.path.getsize(self._file(name)) if os.path.exists(self._file(name)) else 0
+            counts.append(size // array(code).itemsize)
+        rows = min(counts)
+        for name, code in COLUMNS.items():
+            expected = rows * array(code).itemsize
+            with open(self._file(name), "ab") as f:
+                if f.tell() != expected:
+                    f.truncate(expected)
+        return rows
+
+    def _refresh(self):
+        """(Re)maps column files after they grew. Old maps are closed once no reader holds a view."""
+        for name, code in COLUMNS.items():
+            mapped = self._maps.get(name)
+            if mapped and mapped[2] == self.rows:
+                continue
+            _unmap(mapped)
+            if self.rows == 0:
+                self._maps[name] = None
+                continue
+            with open(self._file(name), "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[name] = (m, memoryview(m).cast(code), self.rows)
+
+    def _column(self, name: str):
+        mapped = self._maps.get(name)
+        return mapped[1][:self.rows] if mapped else []
+
+    # --- Writes ---
+
+    def append(self, pools: Iterable[dict], timestamp: Optional[float] = None) -> int:
+        """Appends pool records (GetLatestSubnetPool `data` entries). Returns how many were new."""
+        now = timestamp if timestamp is not None else time.time()
+        batch = {name: array(code) for name, code in COLUMNS.items()}
+        pools = list(pools)
+        with self._lock, self._file_lock():
+            self._sync()
+            added = []
+            for pool in pools:
+                if not pool or "netuid" not in pool:
+                    continue
+                netuid = int(pool["netuid"])
+                try:
+                    block = int(float(pool.get("block_number")))
+                except (TypeError, ValueError):
+                    continue  # without a block the snapshot cannot be ordered or deduplicated
+                if block <= self._last_block.get(netuid, -1):
+                    continue
+                self._last_block[netuid] = block
+                batch["netuid"].append(netuid)
+                batch["block_number"].append(block)
+                batch["timestamp"].append(_timestamp(pool.get("timestamp"), now))
+                for name in METRICS:
+                    batch[name].append(_number(pool.get(name), integer=COLUMNS[name] == "q"))
+                added.append(netuid)
+            if not added:
+                return 0
+
+            for name, values in batch.items():
+                with open(self._file(name), "ab") as f:
+                    f.write(values.tobytes())
+            for offset, netuid in enumerate(added):
+                self._rows_by_netuid.setdefault(netuid, array("q")).append(self.rows + offset)
+            self.rows += len(added)
+            self._refresh()
+            return len(added)
+
+    def append_result(self, result: dict, timestamp: Optional[float] = None) -> int:
+        """Appends every pool contained in a raw `call_tool("GetLatestSubnetPool")` result."""
+        if not result or not result.get("content"):
+            return 0
+        data_obj = result["content"][0].get("text")
+        if not isinstance(data_obj, dict):
+            return 0
+        return self.append(data_obj.get("data", []), timestamp)
+
+    # --- Reads ---
+
+    def _catch_up(self):
+        """Every read first picks up rows appended by other processes (collector, dashboard)."""
+        with self._lock, self._file_lock():
+            self._sync()
+
+    def netuids(self) -> List[int]:
+        self._catch_up()
+        return sorted(self._rows_by_netuid)
+
+    def _row_range(self, netuid: int, start_block: Optional[int], end_block: Optional[int]):
+        rows = self._rows_by_netuid.get(netuid)
+        if not rows:
+            return []
+        blocks = self._column("block_number")
+        # Blocks are strictly increasing per netuid: binary search the bounds
+        lo, hi = 0, len(rows)
+        if start_block is not None:
+            a, b = 0, len(rows)
+            while a < b:
+                mid = (a + b) // 2
+                if blocks[rows[mid]] < start_block:
+                    a = mid + 1
+                else:
+                    b = mid
+            lo = a
+        if end_block is not None:
+            a, b = lo, len(rows)
+            while a < b:
+                mid = (a + b) // 2
+                if blocks[rows[mid]] <= end_block:
+                    a = mid + 1
+                else:
+                    b = mid
+            hi = a
+        return rows[lo:hi]
+
+    def query(self, netuid: int, start_block: Optional[int] = None, end_block: Optional[int] = None,
+              start_time: Optional[float] = None, end_time: Optional[float] = None,
+              fields: Optional[List[str]] = None) -> List[dict]:
+        """Snapshots of one subnet in [start, end] (blocks and/or unix time), oldest first."""
+        self._catch_up()
+        fields = fields or list(COLUMNS)
+        columns = {name: self._column(name) for name in set(fields) | {"timestamp"}}
+        out = []
+        for row in self._row_range(netuid, start_block, end_block):
+            ts = columns["timestamp"][row]
+            if (start_time is not None and ts < start_time) or (end_time is not None and ts > end_time):
+                continue
+            out.append({name: columns[name][row] for name in fields})
+        return out
+
+    def latest(self, netuid: int) -> Optional[dict]:
+        self._catch_up()
+        rows = self._rows_by_netuid.get(netuid)
+        if not rows:
+            return None
+        return {name: self._column(name)[rows[-1]] for name in COLUMNS}
+
+    def downsample(self, netuid: int, field: str, bucket: float, by: str = "timestamp", agg: str = "mean",
+                   start: Optional[float] = None, end: Optional[float] = None) -> List[tuple]:
+        """
+        Aggregates `field` into fixed-width buckets of `bucket` seconds (by="timestamp")
+        or blocks (by="block_number"). `agg` is mean/min/max/first/last.
+        Returns [(bucket_start, value), ...]; NaN samples are skipped.
+        """
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}'. Use one of {sorted(AGGREGATES)}")
+        if by == "block_number":
+            snapshots = self.query(netuid, start_block=start, end_block=end, fields=[by, field])
+        else:
+            snapshots = self.query(netuid, start_time=start, end_time=end, fields=[by, field])
+
+        buckets = []
+        for snap in snapshots:
+            value = snap[field]
+            if value != value:  # NaN
+                continue
+            key = (snap[by] // bucket) * bucket
+            if buckets and buckets[-1][0] == key:
+                buckets[-1][1].append(value)
+            else:
+                buckets.append((key, [value]))
+        return [(key, AGGREGATES[agg](values)) for key, values in buckets]
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                _unmap(mapped)
+            self._maps = {}
+
+
+def main():
+    """Quick look at stored history: `python subnet_history.py [netuid] [field]`."""
+    history = SubnetHistory()
+    if len(sys.argv) < 2:
+        console.print(f"[cyan]{history.rows} snapshots for {len(history.netuids())} subnets in {history.path}/[/cyan]")
+        return
+    netuid = int(sys.argv[1])
+    field = sys.argv[2] if len(sys.argv) > 2 else "price"
+    for ts, value in history.downsample(netuid, field, bucket=3600, agg="last"):
+        console.print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(ts))}  {field}={value:,.4f}")
+
+
+if __name__ == "__main__":
+    main()
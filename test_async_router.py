@@ -0,0 +1,52 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from rich.console import Console
+from brain import BrainRouter
+
+console = Console()
+
+class FakeCompletions:
+    """Stands in for an OpenAI-compatible chat.completions endpoint."""
+    def __init__(self, delay, text, fail=False):
+        self.delay, self.text, self.fail = delay, text, fail
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        message = SimpleNamespace(content=self.text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def fake_client(delay, text, fail=False):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(delay, text, fail)))
+
+async def _scenarios(engine):
+    engine._bind_loop()
+
+    # 1. Hedging: slow Targon gets raced by Chutes after the budget
+    engine._clients = {"targon": fake_client(2.0, "deep"), "chutes": fake_client(0.05, "fast")}
+    start = time.perf_counter()
+    result = await engine.run_tier("deep", "plan a launch", hedge_after=0.2)
+    assert result == "fast" and time.perf_counter() - start < 1.0, "Hedge should answer within budget"
+
+    # 2. Failing tier falls back immediately
+    engine._clients["targon"] = fake_client(0.01, "", fail=True)
+    assert await engine.run_tier("deep", "plan a launch") == "fast"
+
+    # 3. Concurrent fan-out: 20 prompts take ~one round trip, not twenty
+    engine._clients["chutes"] = fake_client(0.2, "ok")
+    start = time.perf_counter()
+    results = await engine.think_many([f"hi {i}" for i in range(20)])
+    assert results == ["ok"] * 20
+    assert time.perf_counter() - start < 1.0, "Prompts should be served concurrently"
+
+def test_async_router():
+    console.print("[bold white]🧪 Testing Async Routing Engine...[/bold white]")
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+    asyncio.run(_scenarios(brain.llm_engine))
+    console.print("\n[bold green]✅ Async routing, hedging and fan-out verified![/bold green]")
+
+if __name__ == "__main__":
+    test_async_router()
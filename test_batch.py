@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from rich.console import Console
+from brain import BrainRouter
+from budget_scheduler import BudgetScheduler
+
+console = Console()
+
+class FakeCompletions:
+    """Answers merged requests with a JSON array and single prompts with an echo."""
+    def __init__(self, fail=False, malformed=False):
+        self.fail, self.malformed = fail, malformed
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("provider down")
+        user = kwargs["messages"][-1]["content"]
+        count = user.count("### Prompt ")
+        if count and not self.malformed:
+            text = json.dumps([f"merged {n}" for n in range(count)])
+        else:
+            text = f"single: {user[-10:]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+class ClosingClient:
+    """Provider client that counts how often its connection pool was closed."""
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+        self.closed = 0
+
+    async def close(self):
+        self.closed += 1
+
+def _run(brain, prompts, chutes, targon):
+    async def go():
+        brain.llm_engine._bind_loop()
+        brain.llm_engine._clients = {"chutes": _client(chutes), "targon": _client(targon)}
+        return await brain.athink_batch(prompts, merge_size=4)
+    return asyncio.run(go())
+
+def test_think_batch():
+    console.print("[bold white]🧪 Testing Batch Prompt API...[/bold white]")
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+    brain.cache_enabled = False
+
+    prompts = [f"Grade result {i}" for i in range(6)] + ["Plan the next sprint"]
+    chutes, targon = FakeCompletions(), FakeCompletions(fail=True)
+    results = _run(brain, prompts, chutes, targon)
+
+    # Results keep input order, short System 1 prompts were merged (6 prompts -> 2 requests)
+    assert [r["index"] for r in results] == list(range(7))
+    assert results[0]["output"] == "merged 0" and results[5]["output"] == "merged 1"
+    # Targon failed: item fell back to Chutes and succeeded there
+    assert results[6]["tier"] == "fast" and results[6]["error"] is None
+    assert chutes.calls == 3, f"Expected 2 merged + 1 fallback request, got {chutes.calls}"
+
+    # Malformed merged output degrades to one request per prompt
+    chutes = FakeCompletions(malformed=True)
+    results = _run(brain, prompts[:4], chutes, FakeCompletions())
+    assert all(r["output"].startswith("single") for r in results) and chutes.calls == 5
+
+    # Errors are reported per item when every tier fails
+    results = _run(brain, prompts[:2], FakeCompletions(fail=True), FakeCompletions(fail=True))
+    assert all(r["output"] is None and "provider down" in r["error"] for r in results)
+
+def test_blocking_batch_closes_clients():
+    # Every think_batch() runs on a fresh loop: its provider pools must not outlive it
+    brain = BrainRouter()
+    brain.cache_enabled = False
+    # Private rate limits, so this test does not drain the process-wide buckets
+    brain.components.set("budget", BudgetScheduler(os.path.join(tempfile.mkdtemp(), "status.json")))
+    engine = brain.llm_engine
+    fakes = {"chutes": ClosingClient(FakeCompletions()), "targon": ClosingClient(FakeCompletions())}
+    engine._client = lambda provider: engine._clients.setdefault(provider, fakes[provider])
+
+    for _ in range(2):
+        results = brain.think_batch([f"Grade result {i}" for i in range(3)], merge_size=4)
+        assert all(r["error"] is None for r in results)
+    assert fakes["chutes"].closed == 2, f"Pools closed {fakes['chutes'].closed} times over 2 batches"
+    assert engine._clients == {}
+    console.print("\n[bold green]✅ Batch API verified![/bold green]")
+
+if __name__ == "__main__":
+    test_think_batch()
+    test_blocking_batch_closes_clients()
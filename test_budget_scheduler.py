@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from rich.console import Console
+from budget_scheduler import BudgetScheduler, TokenBucket
+
+console = Console()
+
+def _status_file():
+    path = os.path.join(tempfile.mkdtemp(), "status_frota.json")
+    with open(path, "w") as f:
+        json.dump({"chutes": {"saldo": 16000, "limite": 15000},
+                   "targon": {"saldo": 5300, "limite": 5000}}, f)
+    return path
+
+def test_token_bucket():
+    console.print("[bold white]🧪 Testing Budget Scheduler...[/bold white]")
+    bucket = TokenBucket(rate_per_s=10.0, capacity=2)
+    assert bucket.reserve() == 0.0 and bucket.reserve() == 0.0
+    delay = bucket.reserve()
+    assert 0.05 < delay <= 0.1, f"Third call should wait ~1/rate, got {delay}"
+
+def test_batched_atomic_spend():
+    path = _status_file()
+    budget = BudgetScheduler(path, flush_interval=3600, flush_every=3)
+
+    budget.record_usage("chutes", 100)
+    budget.record_usage("chutes", 200)
+    assert budget.balance("chutes") == 15700
+    with open(path) as f:
+        assert json.load(f)["chutes"]["saldo"] == 16000, "Updates must be batched, not written per call"
+
+    budget.record_usage("chutes", 300)
+    with open(path) as f:
+        assert json.load(f)["chutes"]["saldo"] == 15400
+    assert not os.path.exists(f"{path}.tmp")
+
+    # Unknown providers and responses without usage are ignored
+    budget.record_usage("nowhere", 50)
+    budget.record_usage("chutes", 0)
+    budget.flush()
+    assert budget.balance("chutes") == 15400
+
+def test_router_degrades_near_limit():
+    from brain import BrainRouter
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+    brain.cache_enabled = False
+    brain.budget = BudgetScheduler(_status_file(), flush_interval=3600)
+
+    used = {"targon": 0}
+    def targon_create(**kwargs):
+        used["targon"] += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="deep answer"))],
+                               usage=SimpleNamespace(total_tokens=100))
+    brain.targon_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=targon_create)))
+    brain.chutes_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="fast answer"))]))))
+
+    # 5300 -> 5200 is still above 5000 * 1.05; the next call degrades to System 1
+    assert brain.think("Plan a marketing strategy for a coffee brand.") == "deep answer"
+    assert brain.budget.balance("targon") == 5200
+    start = time.perf_counter()
+    assert brain.think("Plan a marketing strategy for a coffee brand.") == "fast answer"
+    assert used["targon"] == 1
+    assert time.perf_counter() - start < 1.0
+    console.print("\n[bold green]✅ Budget scheduler verified![/bold green]")
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_batched_atomic_spend()
+    test_router_degrades_near_limit()
@@ -0,0 +1,66 @@
+import contextlib
+import io
+from rich.console import Console
+from check_subnet import build_dashboard, build_parser, resolve_netuids, row_cells, sweep
+
+console = Console()
+
+class FakeMCP:
+    """Stands in for MCPClient: GetLatestSubnetPool returns one pool per netuid."""
+    def __init__(self):
+        self.prices = {}
+        self.batches = []
+        self.cached = []
+
+    def call_tool(self, name, arguments):
+        if "netuid" not in arguments:
+            pools = [{"netuid": n} for n in (0, 1, 33, 64)]
+        else:
+            n = arguments["netuid"]
+            pools = [{"netuid": n, "name": f"SN{n}", "price": str(self.prices.get(n, 1.0)), "price_change_1_day": "1%"}]
+        return {"content": [{"type": "text", "text": {"data": pools}}]}
+
+    def call_many(self, calls, use_cache=True):
+        self.batches.append(len(calls))
+        self.cached.append(use_cache)
+        return [self.call_tool(name, args) for name, args in calls]
+
+def test_dashboard_sweep():
+    console.print("[bold white]🧪 Testing check_subnet dashboard...[/bold white]")
+    client = FakeMCP()
+    assert resolve_netuids(client, ["33", "1", "33"]) == [1, 33]
+    netuids = resolve_netuids(client, ["all"])
+    assert netuids == [0, 1, 33, 64]
+
+    rows = {}
+    changed, _ = sweep(client, netuids, rows)
+    assert changed == set(netuids) and client.batches == [4], "One concurrent batch per sweep"
+    build_dashboard(rows, changed)
+
+    client.prices[33] = 2.5
+    changed, elapsed = sweep(client, netuids, rows)
+    assert changed == {33}, "Only rows whose data changed are re-rendered"
+    assert "$2.5000" in rows[33]
+    sweep(client, netuids, rows, use_cache=False)
+    assert client.cached == [True, True, False], "--watch ticks can bypass the MCP result cache"
+
+    before = row_cells.cache_info()
+    build_dashboard(rows, {33}, elapsed)
+    after = row_cells.cache_info()
+    assert after.misses - before.misses == 1 and after.hits - before.hits == 3, "Unchanged rows reuse their cells"
+
+    assert build_parser().parse_args(["5", "ALL", "33"]).netuid == [5, "all", 33]
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        try:
+            build_parser().parse_args(["5", "abc"])
+            assert False, "Bad netuids are rejected"
+        except SystemExit as e:
+            assert e.code == 2
+    assert "invalid netuid 'abc'" in stderr.getvalue()
+
+    console.print(build_dashboard(rows, changed, elapsed))
+    console.print("\n[bold green]✅ Subnet dashboard verified![/bold green]")
+
+if __name__ == "__main__":
+    test_dashboard_sweep()
@@ -0,0 +1,70 @@
+import random
+import time
+from rich.console import Console
+from clean_data import CleaningEngine, MinHasher, Subnet74Client, detect_language, shingles, similarity, spam_score
+
+console = Console()
+
+BASE = ("Bittensor is a decentralized protocol where subnets compete to produce machine intelligence "
+        "and validators score miners on the quality of their work every tempo")
+
+def test_heuristics():
+    console.print("[bold white]🧪 Testing SN74 Cleaning Engine...[/bold white]")
+    assert spam_score("SPAM_BOT_55: BUY TAO NOW!!! CLICK HERE...") >= 0.5
+    assert spam_score(BASE) == 0.0
+    assert detect_language(BASE) == "en"
+    assert detect_language("Протокол децентрализованный и подсети соревнуются каждый день") == "other"
+    assert detect_language("TAO to the moon") == "unknown"
+
+def test_minhash_similarity():
+    hasher = MinHasher(num_perm=128)
+    near = BASE.replace("every tempo", "each tempo")
+    other = "The weather in Lisbon is sunny with a light breeze coming from the Atlantic ocean today"
+    sig = hasher.signature(shingles(BASE))
+    assert similarity(sig, hasher.signature(shingles(near))) > 0.7
+    assert similarity(sig, hasher.signature(shingles(other))) < 0.2
+
+def test_pipeline():
+    records = [
+        {"source": "wiki", "text": BASE},
+        {"source": "x", "text": BASE},                                       # exact duplicate
+        {"source": "reddit", "text": BASE.replace("every tempo", "each tempo")},  # near duplicate
+        {"source": "x", "text": "BUY the TAO NOW!!! this giveaway is for you, CLICK HERE t.me/pump"},
+        {"source": "x", "text": "too short"},
+        {"source": "forum", "text": "How does Yuma consensus weigh validator stake when miners collude on a subnet?"},
+    ]
+    engine = CleaningEngine()
+    kept = list(engine.clean(records))
+    assert [r["source"] for r in kept] == ["wiki", "forum"]
+    assert kept[0]["score"] > kept[1]["score"], "Sources are scored by reputation"
+    for reason in ("duplicate", "near_duplicate", "spam", "too_short"):
+        assert engine.stats[reason] == 1, reason
+
+    context = Subnet74Client().process(iter(records))
+    assert "**Source Count:** 6 | **Kept:** 2" in context and "(Source: wiki)" in context
+
+def test_throughput_and_memory():
+    rng = random.Random(1)
+    vocab = [f"w{i}" for i in range(3000)] + ["the", "and", "is", "of", "to"]
+
+    def records(n):
+        for i in range(n):
+            yield {"source": "x", "text": " ".join(rng.choice(vocab) for _ in range(40))}
+
+    engine = CleaningEngine(max_seen=500, languages=None)
+    start = time.perf_counter()
+    kept = sum(1 for _ in engine.clean(records(1000)))
+    elapsed = time.perf_counter() - start
+    assert kept > 900 and elapsed < 5.0, f"1000 records cleaned in {elapsed:.2f}s"
+
+    for _ in engine.clean(records(1000)):
+        pass
+    assert len(engine._signatures) <= 500 and len(engine._hashes) <= 500, "Dedup state stays bounded"
+    console.print(f"[dim]1000 records in {elapsed * 1000:.0f}ms[/dim]")
+    console.print("\n[bold green]✅ Cleaning engine verified![/bold green]")
+
+if __name__ == "__main__":
+    test_heuristics()
+    test_minhash_similarity()
+    test_pipeline()
+    test_throughput_and_memory()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+from rich.console import Console
+from complexity_classifier import (KeywordClassifier, HashedLinearClassifier, HybridClassifier,
+                                   RoutingLog, labels_from_log, benchmark, print_benchmark, SEED_EXAMPLES)
+
+console = Console()
+
+def test_keyword_automaton():
+    console.print("[bold white]🧪 Testing Complexity Classifier...[/bold white]")
+    keywords = KeywordClassifier()
+    assert keywords.classify("Hi there!") == "low"
+    assert keywords.classify("Plan a marketing strategy for a new coffee brand.") == "high"
+    assert keywords.classify("CRITICAL: Design a supreme architecture for governance.") == "insane"
+    # Long prompts without cues no longer go to Targon just for being long
+    assert keywords.classify("Please reply to my friend and say thank you for the lovely dinner " * 3) == "low"
+
+def test_linear_model_roundtrip_and_benchmark():
+    model = HashedLinearClassifier(n_features=2 ** 14).fit(SEED_EXAMPLES, epochs=20)
+    result = benchmark(HybridClassifier(model), SEED_EXAMPLES)
+    print_benchmark("hybrid (seed)", result)
+    assert result["accuracy"] >= 0.9, "Model should fit its training set"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        model.save(path)
+        reloaded = HashedLinearClassifier.load(path)
+        for prompt, _ in SEED_EXAMPLES:
+            assert reloaded.classify(prompt) == model.classify(prompt)
+
+def test_labels_from_routing_log():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = RoutingLog(os.path.join(tmp, "routing.jsonl"))
+        # Cheap tier was good enough -> label low even though it was also sent to Targon
+        log.record("Summarize this tweet", "high", 9.0)
+        log.record("Summarize this tweet", "low", 1.0)
+        # Fast tier failed quality -> escalate
+        log.record("Prove this protocol is safe", "low", 1.0, quality=0.2)
+        labels = dict(labels_from_log(log.read()))
+    assert labels == {"Summarize this tweet": "low", "Prove this protocol is safe": "high"}
+    console.print("\n[bold green]✅ Complexity classifier verified![/bold green]")
+
+if __name__ == "__main__":
+    test_keyword_automaton()
+    test_linear_model_roundtrip_and_benchmark()
+    test_labels_from_routing_log()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import time
+from rich.console import Console
+from context_cache import ContextCache, topic_key
+from context_loader import ContextLoader
+from data_universe import SimulatedBackend
+from vector_index import VectorIndex
+
+console = Console()
+
+def temp_db():
+    return os.path.join(tempfile.mkdtemp(), "context_cache.sqlite")
+
+def test_topic_key():
+    console.print("[bold white]🧪 Testing Context Cache...[/bold white]")
+    assert topic_key("Explain how the Subnets emissions work") == topic_key("subnet emission working?")
+    assert topic_key("Bittensor staking") != topic_key("Bittensor subnets")
+
+def test_freshness_and_stale_refresh():
+    path = temp_db()
+    cache = ContextCache(path=path, ttls={"sn13": 0.2}, max_stale=60)
+    calls = []
+
+    def loader():
+        calls.append(time.time())
+        time.sleep(0.05)
+        return f"context v{len(calls)}", "sn13"
+
+    assert cache.fetch("Bittensor subnets", loader) == "context v1"
+    assert cache.fetch("bittensor SUBNET", loader) == "context v1" and len(calls) == 1, "Fresh hit skips the loader"
+
+    time.sleep(0.25)
+    start = time.perf_counter()
+    assert cache.fetch("Bittensor subnets", loader) == "context v1", "Stale entry is served immediately"
+    assert time.perf_counter() - start < 0.03
+    deadline = time.time() + 2
+    while cache.get("Bittensor subnets")[0] != "context v2" and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("Bittensor subnets")[0] == "context v2", "Background refresh replaced the stale entry"
+
+    reopened = ContextCache(path=path, ttls={"sn13": 60})
+    assert reopened.fetch("bittensor subnets", loader) == "context v2" and len(calls) == 2, "Survives restarts"
+
+def test_coalescing_and_uncacheable():
+    cache = ContextCache(path=temp_db())
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return "shared", "corpus"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch("dTAO pools", slow_loader))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["shared"] * 5 and len(calls) == 1, "Concurrent misses share one build"
+
+    assert cache.fetch("unknown", lambda: ("No historical data found.", None)) == "No historical data found."
+    assert cache.get("unknown") is None, "Results without a source are not cached"
+
+def test_warm_deep_context():
+    loader = ContextLoader(cache=ContextCache(path=temp_db()))
+    loader.sn13.backend = SimulatedBackend()
+    previous = os.environ.get("CONTEXT_INDEX")
+    os.environ["CONTEXT_INDEX"] = "0"
+    try:
+        cold = loader.get_deep_context("Bittensor consensus")
+        start = time.perf_counter()
+        warm = loader.get_deep_context("bittensor  Consensus?")
+        elapsed = time.perf_counter() - start
+    finally:
+        if previous is None:
+            del os.environ["CONTEXT_INDEX"]
+        else:
+            os.environ["CONTEXT_INDEX"] = previous
+    assert warm == cold and elapsed < 0.05, f"Warm grounding took {elapsed * 1000:.1f}ms"
+    console.print(f"[dim]warm deep context in {elapsed * 1000:.2f}ms[/dim]")
+    console.print("\n[bold green]✅ Context cache verified![/bold green]")
+
+def test_refresh_reaches_source():
+    # The index stays fresh for hours, but a refresh after the source TTL must mine SN13 again
+    cache = ContextCache(path=temp_db(), ttls={"simulated": 0.2}, max_stale=60)
+    loader = ContextLoader(index=VectorIndex(path=tempfile.mkdtemp()), max_age=3600, cache=cache)
+    loader.sn13.backend = SimulatedBackend()
+    mined = []
+    stream_bulk = loader.sn13.stream_bulk
+    loader.sn13.stream_bulk = lambda *a, **kw: mined.append(a) or stream_bulk(*a, **kw)
+
+    loader.get_deep_context("Bittensor")
+    assert len(mined) == 1 and cache.get("Bittensor")[1] == "simulated"
+    time.sleep(0.3)
+    loader.get_deep_context("Bittensor")  # stale: served, refreshed in the background
+    for _ in range(100):
+        if cache.metrics["refreshes"] and not cache._refreshing:
+            break
+        time.sleep(0.02)
+    assert len(mined) == 2, "The refresh went back to SN13"
+    assert cache.get("Bittensor")[1] == "simulated", "Refreshed context is not re-labelled as index data"
+
+if __name__ == "__main__":
+    test_topic_key()
+    test_freshness_and_stale_refresh()
+    test_coalescing_and_uncacheable()
+    test_warm_deep_context()
+    test_refresh_reaches_source()
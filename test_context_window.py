@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from rich.console import Console
+from context_window import ContextWindow, estimate_tokens, stable_prefix, split_chunks
+
+console = Console()
+
+NOISE = "\n\n".join(f"FORUM_POST {i}: unrelated chatter about memes, airdrops and price predictions." for i in range(400))
+CONTEXT = f"""## Context Summary
+
+**Key Facts regarding Topic:**
+1. Bittensor consensus uses Yuma scoring of validator weights.
+2. Community sentiment appears mixed.
+
+{NOISE}
+"""
+
+def test_token_estimate():
+    console.print("[bold white]🧪 Testing Context Window Manager...[/bold white]")
+    assert estimate_tokens("") == 0
+    sentence = "The quick brown fox jumps over the lazy dog."
+    assert 8 <= estimate_tokens(sentence) <= 12
+    assert estimate_tokens(sentence * 10) > estimate_tokens(sentence) * 9
+
+def test_rank_and_truncate():
+    window = ContextWindow(grounding_tokens=200)
+    question = "Explain the history of Bittensor consensus and Yuma scoring."
+    message = window.assemble("You are a test agent.", question, CONTEXT, "deepseek-ai/DeepSeek-R1", 6000)
+
+    assert message.endswith(f"User Question:\n{question}")
+    assert "Yuma scoring" in message, "The most relevant chunk must survive truncation"
+    assert estimate_tokens(message) <= 200 + estimate_tokens(question) + 20
+    assert len(split_chunks(CONTEXT)) > 400
+
+    # Tiny models leave no room for grounding: the question goes through alone
+    tiny = ContextWindow(model_tokens={"tiny": 6050})
+    assert tiny.assemble("sys", question, CONTEXT, "tiny", 6000) == question
+
+def test_stable_system_prefix():
+    assert stable_prefix("# Soul  \r\nBe kind.\t\n\n") == stable_prefix("# Soul\nBe kind.")
+
+    from brain import BrainRouter
+    brain = BrainRouter()
+    brain.soul_manager = SimpleNamespace(load_soul=lambda: "# Soul v1   \r\nBe sovereign.\n")
+    brain.context_loader = SimpleNamespace(get_deep_context=lambda topic: CONTEXT)
+    first = brain.system_prompt
+    assert first == "# Soul v1\nBe sovereign."
+    grounded = brain._ground("Research the history of Bittensor consensus.")
+    assert "Yuma" in grounded and estimate_tokens(grounded) < estimate_tokens(CONTEXT)
+    console.print("\n[bold green]✅ Context window manager verified![/bold green]")
+
+if __name__ == "__main__":
+    test_token_estimate()
+    test_rank_and_truncate()
+    test_stable_system_prefix()
@@ -0,0 +1,130 @@
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from requests.structures import CaseInsensitiveDict
+from rich.console import Console
+import crawler
+import stealth_browser
+from crawler import Crawler, extract_links
+from scrape_cache import ScrapeCache
+from stealth_browser import ProfilePool, StealthBrowser
+
+console = Console()
+
+ROBOTS = {"a.com": "User-agent: *\nDisallow: /private\n", "d.com": "User-agent: *\nCrawl-delay: 2\n"}
+
+def page(links):
+    return "<html><body>" + "".join(f'<a href="{link}">x</a>' for link in links) + "</body></html>"
+
+SITE = {
+    "https://a.com/": page(["/one", "/two", "/private/secret", "/one#dup", "https://b.com/elsewhere"]),
+    "https://a.com/one": page(["/two", "/three"]),
+    "https://a.com/two": page([]),
+    "https://a.com/three": page([]),
+    "https://c.com/": page(["/x"]),
+    "https://c.com/x": page([]),
+    "https://d.com/": page([]),
+}
+
+class FakeBrowser:
+    """Serves SITE and records per-domain concurrency and fetch times."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.fetches = []
+
+    def browse(self, url):
+        host = url.split("/")[2]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+            self.fetches.append((url, time.monotonic()))
+        time.sleep(0.03)
+        with self.lock:
+            self.active[host] -= 1
+        body = SITE.get(url)
+        return SimpleNamespace(status_code=200 if body else 404, text=body or "",
+                               headers=CaseInsensitiveDict({"Content-Type": "text/html"}))
+
+def fake_get(url, **kwargs):
+    host = url.split("/")[2]
+    if url.endswith("/robots.txt") and host in ROBOTS:
+        return SimpleNamespace(status_code=200, text=ROBOTS[host])
+    return SimpleNamespace(status_code=404, text="")
+
+def test_extract_links():
+    console.print("[bold white]🧪 Testing Crawl Frontier...[/bold white]")
+    links = extract_links("https://a.com/dir/", '<a href="p">1</a><a href="/q#f">2</a><a href="mailto:x">3</a>')
+    assert links == ["https://a.com/dir/p", "https://a.com/q"]
+
+def test_crawl_politeness():
+    browser = FakeBrowser()
+    original = crawler.http_transport.get
+    crawler.http_transport.get = fake_get
+    try:
+        spider = Crawler(browser=browser, max_workers=8, per_domain_concurrency=1, per_domain_rate=20, max_depth=2)
+        seeds = ["https://a.com/", "https://c.com/", "https://d.com/"]
+        results = {r["url"]: r for r in spider.crawl(seeds, max_pages=20)}
+    finally:
+        crawler.http_transport.get = original
+
+    fetched = [url for url, _ in browser.fetches]
+    assert sorted(fetched) == sorted(SITE), "Every page fetched exactly once, off-site links ignored"
+    assert results["https://a.com/private/secret"]["error"] == "disallowed by robots.txt"
+    assert all(n == 1 for n in browser.max_active.values()), "Per-domain concurrency is respected"
+    a_times = [t for url, t in browser.fetches if "a.com" in url]
+    gaps = [b - a for a, b in zip(a_times, a_times[1:])]
+    assert min(gaps) >= 0.045, f"Per-domain rate spaces requests on a.com ({min(gaps):.3f}s)"
+    assert spider._domains["d.com"].interval == 2, "robots.txt Crawl-delay raises the spacing"
+    assert fetched.index("https://a.com/one") < fetched.index("https://a.com/three"), "Shallower pages first"
+
+def test_robots_in_parallel_and_page_budget():
+    hosts = [f"e{i}.com" for i in range(4)]
+
+    def slow_robots(url, **kwargs):
+        time.sleep(0.2)
+        return SimpleNamespace(status_code=200, text="User-agent: *\nDisallow: /private\n")
+
+    browser = FakeBrowser()
+    original = crawler.http_transport.get
+    crawler.http_transport.get = slow_robots
+    try:
+        spider = Crawler(browser=browser, max_workers=8, per_domain_rate=0)
+        for host in hosts:
+            spider.add(f"https://{host}/private/a", priority=-1)
+            spider.add(f"https://{host}/")
+        start = time.perf_counter()
+        results = spider.run([], max_pages=4)
+        elapsed = time.perf_counter() - start
+    finally:
+        crawler.http_transport.get = original
+
+    assert sorted(url for url, _ in browser.fetches) == sorted(f"https://{host}/" for host in hosts), \
+        "Disallowed URLs do not use up max_pages"
+    assert sum(r["error"] == "disallowed by robots.txt" for r in results) == 4
+    assert elapsed < 0.6, f"robots.txt loads for different domains overlap ({elapsed:.2f}s for 4 x 0.2s)"
+
+def test_profile_reuse():
+    browser = StealthBrowser(cache=ScrapeCache(root=tempfile.mkdtemp()))
+    browser.api_key = "test"
+    browser.pool = ProfilePool(lambda requirements: {"headers": {"User-Agent": "pooled"}}, size=2)
+    browser.pool.refill()
+    original = stealth_browser.http_transport.get
+    stealth_browser.http_transport.get = lambda url, **kw: SimpleNamespace(
+        status_code=200, content=b"ok", headers=CaseInsensitiveDict())
+    try:
+        for i in range(5):
+            browser.browse(f"https://a.com/{i}")
+        browser.browse("https://b.com/")
+    finally:
+        stealth_browser.http_transport.get = original
+    assert browser.pool.metrics["hits"] == 2, "One fingerprint session per domain"
+    console.print("\n[bold green]✅ Crawler verified![/bold green]")
+
+if __name__ == "__main__":
+    test_extract_links()
+    test_crawl_politeness()
+    test_robots_in_parallel_and_page_budget()
+    test_profile_reuse()
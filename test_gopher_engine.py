@@ -0,0 +1,199 @@
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+from rich.console import Console
+import gopher_client
+from gopher_client import GopherClient, GopherJobEngine, interpret_result, DONE, FAILED, PENDING
+from scrape_cache import ScrapeCache
+
+console = Console()
+
+class FakeGopher:
+    """In-process Gopher API: each job completes after its own delay; one URL fails."""
+    def __init__(self):
+        self.jobs = {}
+        self.submitted = 0
+        self.polls = 0
+
+    async def apost(self, url, json=None, **kwargs):
+        await asyncio.sleep(0.05)
+        self.submitted += 1
+        target = json["arguments"]["url"]
+        job_id = f"job-{self.submitted}"
+        delay = 0.1 if "fast" in target else 0.4
+        self.jobs[job_id] = (target, time.monotonic() + delay)
+        return SimpleNamespace(status_code=200, json=lambda: {"uuid": job_id}, text="")
+
+    async def aget(self, url, **kwargs):
+        self.polls += 1
+        target, ready_at = self.jobs[url.rsplit("/", 1)[1]]
+        if "broken" in target:
+            body = {"status": "failed", "error": "blocked"}
+        elif time.monotonic() >= ready_at:
+            body = [{"url": target, "content": "scraped"}]
+        else:
+            body = {"status": "in progress"}
+        return SimpleNamespace(status_code=200, json=lambda: body)
+
+class FakePagedJob:
+    """One multi-page job that exposes a growing `results` list until it completes."""
+    def __init__(self, pages=3, final=None):
+        self.pages = [{"url": f"https://example.com/p{i}", "content": f"page {i}"} for i in range(pages)]
+        self.final = self.pages if final is None else final
+        self.polls = 0
+
+    def document(self):
+        self.polls += 1
+        if self.polls > len(self.pages):
+            return {"status": "completed", "result": self.final}
+        return {"status": "in progress", "results": self.pages[:self.polls]}
+
+    def post(self, url, json=None, **kwargs):
+        return SimpleNamespace(status_code=200, json=lambda: {"uuid": "paged"}, text="")
+
+    def get(self, url, **kwargs):
+        body = self.document()
+        return SimpleNamespace(status_code=200, json=lambda: body)
+
+    async def apost(self, url, json=None, **kwargs):
+        return self.post(url, json=json)
+
+    async def aget(self, url, **kwargs):
+        return self.get(url)
+
+def test_interpret_result():
+    console.print("[bold white]🧪 Testing Gopher Job Engine...[/bold white]")
+    assert interpret_result([{"a": 1}])[0] == DONE
+    assert interpret_result({"status": "failed", "error": "x"}) == (FAILED, "x")
+    assert interpret_result({"status": "in progress"})[0] == PENDING
+
+def test_concurrent_jobs():
+    fake = FakeGopher()
+    original = (gopher_client.http_transport.apost, gopher_client.http_transport.aget)
+    gopher_client.http_transport.apost, gopher_client.http_transport.aget = fake.apost, fake.aget
+    try:
+        cache = ScrapeCache(root=tempfile.mkdtemp())
+        client = GopherClient(cache=cache)
+        client.api_key = "test"
+        urls = [f"https://example.com/slow/{i}" for i in range(17)] + \
+               [f"https://example.com/fast/{i}" for i in range(2)] + ["https://example.com/broken"]
+        engine = GopherJobEngine(client, max_concurrency=20, poll_interval=0.05, max_interval=0.2, timeout=5)
+
+        async def run():
+            order = []
+            async for url, result in engine.as_completed(urls):
+                order.append((url, result))
+            return order
+
+        start = time.perf_counter()
+        order = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        # Second pass: every finished job is served from the scrape cache, only the failed one is resubmitted
+        submitted = fake.submitted
+        again = dict(asyncio.run(engine.scrape_many(urls)))
+    finally:
+        gopher_client.http_transport.apost, gopher_client.http_transport.aget = original
+
+    assert len(order) == 20 and submitted == 20
+    assert elapsed < 2.0, f"20 jobs should overlap, took {elapsed:.2f}s"
+    done_first = [url for url, _ in order[:3]]
+    assert "https://example.com/broken" in done_first or any("fast" in u for u in done_first), \
+        "Results are yielded as jobs finish, not in submission order"
+    results = dict(order)
+    assert results["https://example.com/broken"] is None
+    assert results["https://example.com/slow/3"][0]["content"] == "scraped"
+    assert fake.submitted == submitted + 1 and again["https://example.com/slow/3"] == results["https://example.com/slow/3"]
+    console.print(f"[dim]{fake.polls} polls for 20 jobs in {elapsed:.2f}s[/dim]")
+    console.print("\n[bold green]✅ Gopher job engine verified![/bold green]")
+
+def test_poller_failure_reaches_caller():
+    # A non-dict result document breaks interpret_result(): the error must surface instead of hanging
+    fake = FakeGopher()
+
+    async def garbled(url, **kwargs):
+        return SimpleNamespace(status_code=200, json=lambda: "<html>gateway error</html>")
+
+    original = (gopher_client.http_transport.apost, gopher_client.http_transport.aget)
+    gopher_client.http_transport.apost, gopher_client.http_transport.aget = fake.apost, garbled
+    try:
+        client = GopherClient(cache=ScrapeCache(root=tempfile.mkdtemp()))
+        client.api_key = "test"
+        engine = GopherJobEngine(client, poll_interval=0.01)
+
+        async def run():
+            return await asyncio.wait_for(engine.scrape_many(["https://example.com/a", "https://example.com/b"]), 5)
+
+        try:
+            asyncio.run(run())
+            assert False, "Poller error was swallowed"
+        except AttributeError:
+            pass
+    finally:
+        gopher_client.http_transport.apost, gopher_client.http_transport.aget = original
+
+def test_streaming_pages():
+    job = FakePagedJob()
+    names = ("post", "get", "apost", "aget")
+    original = [getattr(gopher_client.http_transport, name) for name in names]
+    for name in names:
+        setattr(gopher_client.http_transport, name, getattr(job, name))
+    try:
+        client = GopherClient(cache=ScrapeCache(root=tempfile.mkdtemp()))
+        client.api_key = "test"
+        seen = []
+        for record in client.iter_scrape("https://example.com", interval=0.01, max_interval=0.02):
+            seen.append((record["content"], job.polls))
+        assert [c for c, _ in seen] == ["page 0", "page 1", "page 2"], "Each page is delivered exactly once"
+        assert seen[0][1] == 1, "First page is yielded after the first poll, not at completion"
+
+        # Completed job is cached: replayed page by page without a new job
+        polls = job.polls
+        assert [r["content"] for r in client.iter_scrape("https://example.com")] == ["page 0", "page 1", "page 2"]
+        assert job.polls == polls
+
+        job.polls = 0
+        engine = GopherJobEngine(client, poll_interval=0.01, max_interval=0.02, max_pages=5)
+
+        async def run():
+            return [record["content"] async for record in engine.stream("https://example.com/async")]
+
+        assert asyncio.run(run()) == ["page 0", "page 1", "page 2"]
+    finally:
+        for name, fn in zip(names, original):
+            setattr(gopher_client.http_transport, name, fn)
+    console.print("[dim]Pages streamed as soon as the job exposed them[/dim]")
+
+def test_reordered_final_result():
+    # The final result lists pages in another order, drops one already streamed and adds a new one
+    job = FakePagedJob()
+    extra = {"url": "https://example.com/p3", "content": "page 3"}
+    job.final = [job.pages[2], extra, job.pages[0]]
+    names = ("post", "get", "apost", "aget")
+    original = [getattr(gopher_client.http_transport, name) for name in names]
+    for name in names:
+        setattr(gopher_client.http_transport, name, getattr(job, name))
+    try:
+        client = GopherClient(cache=ScrapeCache(root=tempfile.mkdtemp()))
+        client.api_key = "test"
+        pages = [r["content"] for r in client.iter_scrape("https://example.com", interval=0.01, max_interval=0.02)]
+        assert pages == ["page 0", "page 1", "page 2", "page 3"], pages
+
+        job.polls = 0
+        engine = GopherJobEngine(client, poll_interval=0.01, max_interval=0.02, max_pages=5)
+
+        async def run():
+            return [record["content"] async for record in engine.stream("https://example.com/async")]
+
+        assert asyncio.run(run()) == ["page 0", "page 1", "page 2", "page 3"]
+    finally:
+        for name, fn in zip(names, original):
+            setattr(gopher_client.http_transport, name, fn)
+
+if __name__ == "__main__":
+    test_interpret_result()
+    test_concurrent_jobs()
+    test_poller_failure_reaches_caller()
+    test_streaming_pages()
+    test_reordered_final_result()
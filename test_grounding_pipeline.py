@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from rich.console import Console
+from clean_data import CleaningEngine, Subnet74Client
+from data_universe import Subnet13Client
+from grounding_pipeline import GroundingPipeline
+
+console = Console()
+
+VOCAB = [f"w{i}" for i in range(3000)]
+
+class PagedBackend:
+    """One partition of `pages` pages, each taking `delay` seconds; counts records served."""
+    source = "sn13"
+
+    def __init__(self, pages=10, page_rows=50, delay=0.05):
+        self.pages = pages
+        self.page_rows = page_rows
+        self.delay = delay
+        self.served = 0
+        self.last_page_at = 0.0
+        self.rng = random.Random(7)
+
+    def partitions(self, topic):
+        return [0]
+
+    def fetch_page(self, topic, cursor, page_size):
+        time.sleep(self.delay)
+        rows = [{"source": "wiki" if (cursor + i) % 2 == 0 else "x",
+                 "text": f"{topic} " + " ".join(self.rng.choice(VOCAB) for _ in range(30))}
+                for i in range(min(page_size, self.page_rows, self.pages * self.page_rows - cursor))]
+        self.served += len(rows)
+        self.last_page_at = time.perf_counter()
+        nxt = cursor + len(rows)
+        return rows, (nxt if nxt < self.pages * self.page_rows else None)
+
+class SlowFilter:
+    """Wraps RecordFilter.prepare with a fixed per-batch cost and records how far retrieval ran ahead."""
+    def __init__(self, inner, delay, backend):
+        self.inner = inner
+        self.delay = delay
+        self.backend = backend
+        self.prepared = 0
+        self.max_lag = 0
+        self.first_clean_at = None
+        self.lock = threading.Lock()
+
+    def prepare(self, batch):
+        with self.lock:
+            if self.first_clean_at is None:
+                self.first_clean_at = time.perf_counter()
+        time.sleep(self.delay)
+        with self.lock:
+            self.prepared += len(batch)
+            self.max_lag = max(self.max_lag, self.backend.served - self.prepared)
+        return self.inner.prepare(batch)
+
+class SlowSN74(Subnet74Client):
+    def __init__(self, backend, delay):
+        super().__init__()
+        self.backend = backend
+        self.delay = delay
+        self.filters = []
+
+    def new_engine(self):
+        engine = CleaningEngine(languages=None)
+        engine.filter = SlowFilter(engine.filter, self.delay, self.backend)
+        self.filters.append(engine.filter)
+        return engine
+
+def make_pipeline(pages=10, fetch_delay=0.05, clean_delay=0.05, **kwargs):
+    backend = PagedBackend(pages=pages, delay=fetch_delay)
+    sn74 = SlowSN74(backend, clean_delay)
+    return GroundingPipeline(Subnet13Client(backend=backend, page_size=50), sn74, batch_size=50, **kwargs), backend, sn74
+
+def test_stages_overlap():
+    console.print("[bold white]🧪 Testing pipelined SN13 -> SN74 grounding...[/bold white]")
+    pipeline, backend, sn74 = make_pipeline(workers=1)
+    kept = []
+    context, metrics = pipeline.run("bittensor", limit=1000, on_record=kept.append)
+
+    assert "**Source Count:** 500 | **Kept:** 500" in context and "(Source: wiki)" in context
+    assert len(kept) == 500 and metrics["records"] == 500 and not metrics["stopped_early"]
+    for stage in ("retrieve", "clean", "summarize"):
+        assert metrics[stage]["items"] == 500 and metrics[stage]["busy_s"] > 0, stage
+    # Cleaning of the first batch starts while SN13 is still serving pages
+    first_clean, last_page = sn74.filters[0].first_clean_at, backend.last_page_at
+    assert first_clean < last_page, f"Cleaning started {(first_clean - last_page) * 1000:.0f}ms after retrieval ended"
+    pipeline.print_metrics()
+
+def test_back_pressure():
+    # Retrieval is 10x faster than cleaning: bounded queues keep it from running ahead
+    pipeline, backend, sn74 = make_pipeline(pages=40, fetch_delay=0.005, clean_delay=0.05, workers=1, queue_size=2)
+    context, metrics = pipeline.run("bittensor", limit=2000)
+    assert metrics["records"] == 2000
+    lag = sn74.filters[0].max_lag
+    assert lag <= 6 * 50, f"Retrieval ran {lag} records ahead of cleaning"
+    console.print(f"[dim]max retrieval lead: {lag} records[/dim]")
+
+def test_cancellation():
+    pipeline, backend, _ = make_pipeline(pages=40, target_records=60, min_score=0.9)
+    context, metrics = pipeline.run("bittensor", limit=2000)
+    time.sleep(0.2)
+    assert metrics["stopped_early"] and metrics["kept"] < 2000
+    assert backend.served < 1000, f"Retrieval kept going after cancellation ({backend.served} records)"
+    served = backend.served
+    time.sleep(0.2)
+    assert backend.served == served, "No pages are fetched after the pipeline returns"
+    assert "(Source: wiki)" in context and "**Quality Score:** 100.0%" in context
+
+    empty, _ = make_pipeline(pages=0)[0].run("bittensor")
+    assert empty is None
+    console.print("\n[bold green]✅ Grounding pipeline verified![/bold green]")
+
+if __name__ == "__main__":
+    test_stages_overlap()
+    test_back_pressure()
+    test_cancellation()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rich.console import Console
+from http_transport import HTTPTransport
+
+console = Console()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    peers = set()
+    hits = {"flaky": 0}
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        _Handler.peers.add(self.client_address[1])
+        if self.path == "/flaky":
+            _Handler.hits["flaky"] += 1
+            if _Handler.hits["flaky"] == 1:
+                return self._reply(503, {"error": "warming up"})
+        self._reply(200, {"path": self.path})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(200, json.loads(self.rfile.read(length) or b"{}"))
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_keep_alive_and_retries():
+    console.print("[bold white]🧪 Testing Shared HTTP Transport...[/bold white]")
+    server, base = _serve()
+    transport = HTTPTransport(pool_connections=2, pool_maxsize=2)
+    try:
+        for i in range(10):
+            assert transport.get(f"{base}/ping/{i}").json() == {"path": f"/ping/{i}"}
+        assert transport.post(f"{base}/echo", json={"q": 1}).json() == {"q": 1}
+        assert len(_Handler.peers) == 1, f"Expected one pooled connection, saw {len(_Handler.peers)}"
+
+        # Idempotent GETs are retried on 503
+        assert transport.get(f"{base}/flaky").status_code == 200
+        assert _Handler.hits["flaky"] == 2
+    finally:
+        transport.close()
+        server.shutdown()
+
+def test_async_facade():
+    server, base = _serve()
+    transport = HTTPTransport()
+
+    async def run():
+        responses = await asyncio.gather(*(transport.aget(f"{base}/async/{i}") for i in range(5)))
+        await transport.aclose()
+        return [r.json()["path"] for r in responses]
+
+    try:
+        assert asyncio.run(run()) == [f"/async/{i}" for i in range(5)]
+    finally:
+        transport.close()
+        server.shutdown()
+
+def test_run_closes_async_client():
+    # Blocking wrappers run on a fresh loop each time; its client must not outlive it
+    transport = HTTPTransport()
+    clients = []
+
+    class FakeClient:
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    async def scrape():
+        client = FakeClient()
+        transport._async_clients[asyncio.get_running_loop()] = client
+        clients.append(client)
+        return "done"
+
+    assert transport.run(scrape()) == "done" and transport.run(scrape()) == "done"
+    assert all(client.closed for client in clients) and len(transport._async_clients) == 0
+    console.print("\n[bold green]✅ Shared HTTP transport verified![/bold green]")
+
+if __name__ == "__main__":
+    test_keep_alive_and_retries()
+    test_async_facade()
+    test_run_closes_async_client()
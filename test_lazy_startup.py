@@ -0,0 +1,38 @@
+import sys
+import time
+from rich.console import Console
+
+console = Console()
+
+def test_lazy_startup():
+    console.print("[bold white]🧪 Testing Lazy BrainRouter Startup...[/bold white]")
+
+    for module in ["gopher_client", "taoshi_client", "openai"]:
+        sys.modules.pop(module, None)
+
+    start = time.perf_counter()
+    from brain import BrainRouter
+    brain = BrainRouter()
+    elapsed = time.perf_counter() - start
+    console.print(f"[cyan]Cold BrainRouter(): {elapsed * 1000:.1f} ms[/cyan]")
+
+    # 1. Nothing heavy is imported or built at construction time
+    assert "gopher_client" not in sys.modules, "GopherClient should not be imported eagerly"
+    assert not any(row["loaded"] for row in brain.components.report()), "No component should be built yet"
+
+    # 2. First access builds only that component
+    gopher = brain.gopher_client
+    assert gopher is brain.gopher_client, "Components must be built once and reused"
+    loaded = [row["name"] for row in brain.components.report() if row["loaded"]]
+    assert loaded == ["gopher_client"], f"Unexpected components loaded: {loaded}"
+
+    # 3. Components can be overridden (e.g. test doubles)
+    brain.taoshi_client = "stub"
+    assert brain.taoshi_client == "stub"
+    assert "taoshi_client" not in sys.modules
+
+    brain.startup_report()
+    console.print("\n[bold green]✅ Lazy startup verified![/bold green]")
+
+if __name__ == "__main__":
+    test_lazy_startup()
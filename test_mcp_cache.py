@@ -0,0 +1,73 @@
+import os
+import tempfile
+import threading
+import time
+from rich.console import Console
+from mcp_cache import MCPResultCache, canonical_arguments
+
+console = Console()
+
+def test_ttl_and_coalescing():
+    console.print("[bold white]🧪 Testing MCP Result Cache...[/bold white]")
+    cache = MCPResultCache(ttls={"GetLatestSubnetPool": 0.2, "Live": 0})
+    calls = {"n": 0}
+
+    def slow_loader():
+        calls["n"] += 1
+        time.sleep(0.2)
+        return {"content": [{"type": "text", "text": {"data": [{"netuid": 33}]}}]}
+
+    # 10 identical simultaneous calls share one request
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch("GetLatestSubnetPool", {"netuid": 33}, slow_loader)))
+               for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls["n"] == 1 and len(results) == 10
+    assert cache.stats()["coalesced"] == 9
+
+    # Argument order does not matter; callers get independent copies
+    assert canonical_arguments({"a": 1, "b": 2}) == canonical_arguments({"b": 2, "a": 1})
+    first = cache.fetch("GetLatestSubnetPool", {"netuid": 33}, slow_loader)
+    first["content"].clear()
+    assert cache.fetch("GetLatestSubnetPool", {"netuid": 33}, slow_loader)["content"]
+    assert calls["n"] == 1 and cache.stats()["hits"] == 2
+
+    # Per-tool TTL: expiry triggers a refetch; TTL 0 never caches
+    time.sleep(0.25)
+    cache.fetch("GetLatestSubnetPool", {"netuid": 33}, slow_loader)
+    assert calls["n"] == 2
+    cache.fetch("Live", {}, slow_loader)
+    cache.fetch("Live", {}, slow_loader)
+    assert calls["n"] == 4
+
+    # Tools without a TTL of their own are not cached at all
+    uncached = MCPResultCache()
+    uncached.fetch("SubmitExtrinsic", {}, slow_loader)
+    uncached.fetch("SubmitExtrinsic", {}, slow_loader)
+    assert calls["n"] == 6 and uncached.get("SubmitExtrinsic", {}) is None
+
+    # Failures are shared with waiters and never cached
+    def failing():
+        raise TimeoutError("taostats down")
+    try:
+        cache.fetch("GetLatestSubnetPool", {"netuid": 1}, failing)
+        assert False
+    except TimeoutError:
+        pass
+    assert cache.get("GetLatestSubnetPool", {"netuid": 1}) is None
+
+def test_disk_persistence():
+    path = os.path.join(tempfile.mkdtemp(), "mcp_cache.sqlite")
+    MCPResultCache(default_ttl=60, disk_path=path).put("GetStats", {"x": 1}, {"price": 1.5})
+    restarted = MCPResultCache(default_ttl=60, disk_path=path)
+    assert restarted.get("GetStats", {"x": 1}) == {"price": 1.5}
+    assert restarted.stats()["disk_hits"] == 1
+    restarted.print_stats()
+    console.print("\n[bold green]✅ MCP result cache verified![/bold green]")
+
+if __name__ == "__main__":
+    test_ttl_and_coalescing()
+    test_disk_persistence()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rich.console import Console
+from mcp_client import MCPClient, MCPError
+
+console = Console()
+
+class FakeTaostats(BaseHTTPRequestHandler):
+    """Streamable-HTTP MCP server: answers in POST bodies, or later on the session stream."""
+    protocol_version = "HTTP/1.1"
+    pushed = queue.Queue()      # responses delivered on the GET stream
+    resumes = []                # (session id, Last-Event-ID) of every GET reconnect
+    stop = threading.Event()
+
+    def _start_stream(self, extra_headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for k, v in (extra_headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+
+    def _event(self, msg, event_id=None):
+        body = (f"id: {event_id}\n" if event_id else "") + f"data: {json.dumps(msg)}\n\n"
+        data = body.encode()
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        msg = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if msg["method"] == "initialize":
+            # Send the result, then drop the stream to force a resume via GET
+            self._start_stream({"Mcp-Session-Id": "sess-1"})
+            self._event({"jsonrpc": "2.0", "id": msg["id"], "result": {"protocolVersion": "2024-11-05"}}, "e1")
+            return self._end_stream()
+        if "id" not in msg:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        if msg["method"] == "tools/call" and msg["params"]["name"] == "Deferred":
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            FakeTaostats.pushed.put({"jsonrpc": "2.0", "id": msg["id"], "result": {"content": [
+                {"type": "text", "text": json.dumps({"deferred": True})}]}})
+            return
+        args = msg["params"].get("arguments", {})
+        time.sleep(0.2)  # per-call latency: parallel calls must overlap
+        self._start_stream()
+        if msg["params"].get("name") == "Broken":
+            self._event({"jsonrpc": "2.0", "id": msg["id"], "error": {"code": -32602, "message": "bad netuid"}})
+        else:
+            text = json.dumps({"data": [{"netuid": args.get("netuid")}]})
+            self._event({"jsonrpc": "2.0", "id": msg["id"], "result": {"content": [{"type": "text", "text": text}]}})
+        self._end_stream()
+
+    def do_GET(self):
+        FakeTaostats.resumes.append((self.headers.get("Mcp-Session-Id"), self.headers.get("Last-Event-ID")))
+        self._start_stream()
+        while not FakeTaostats.stop.is_set():
+            try:
+                self._event(FakeTaostats.pushed.get(timeout=0.05))
+            except queue.Empty:
+                continue
+        self._end_stream()
+
+    def log_message(self, *args):
+        pass
+
+def test_multiplexed_calls():
+    console.print("[bold white]🧪 Testing Multiplexed MCP Client...[/bold white]")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTaostats)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = MCPClient("https://mcp.taostats.io/?api_key=test", reconnect_delay=0.05)
+    client.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        assert client.connect(timeout=5)
+        assert client.session_id == "sess-1"
+
+        # 20 calls in parallel over one session: ids never collide and results come back in order
+        start = time.perf_counter()
+        results = client.call_many([("GetLatestSubnetPool", {"netuid": n}) for n in range(20)])
+        elapsed = time.perf_counter() - start
+        assert [r["content"][0]["text"]["data"][0]["netuid"] for r in results] == list(range(20))
+        assert elapsed < 2.0, f"Calls should overlap, took {elapsed:.2f}s"
+
+        # A response delivered on the resumed session stream is routed to its caller
+        deadline = time.time() + 5
+        while not FakeTaostats.resumes and time.time() < deadline:
+            time.sleep(0.01)
+        assert FakeTaostats.resumes[0] == ("sess-1", "e1"), "Reconnect must resume with Last-Event-ID"
+        assert client.call_tool("Deferred", {})["content"][0]["text"] == {"deferred": True}
+
+        try:
+            client.request("tools/call", {"name": "Broken", "arguments": {}})
+            assert False, "JSON-RPC errors must raise"
+        except MCPError as e:
+            assert e.code == -32602
+
+        async def run_async():
+            return await client.acall_many([("GetLatestSubnetPool", {"netuid": n}) for n in (1, 2, 3)])
+        assert [r["content"][0]["text"]["data"][0]["netuid"] for r in asyncio.run(run_async())] == [1, 2, 3]
+    finally:
+        FakeTaostats.stop.set()
+        client.close()
+        server.shutdown()
+    console.print("\n[bold green]✅ Multiplexed MCP client verified![/bold green]")
+
+class SessionlessServer(BaseHTTPRequestHandler):
+    """Answers initialize but never assigns an Mcp-Session-Id."""
+    protocol_version = "HTTP/1.1"
+    initializes = 0
+
+    def do_POST(self):
+        msg = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        SessionlessServer.initializes += msg["method"] == "initialize"
+        body = json.dumps({"jsonrpc": "2.0", "id": msg.get("id"), "result": {}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_initialize_failures():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SessionlessServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = MCPClient("https://mcp.taostats.io/?api_key=test", reconnect_delay=0.05, cache=False)
+    client.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        assert not client.connect(timeout=5)
+        time.sleep(0.2)
+        assert SessionlessServer.initializes == 2, "A missing session id is retried exactly once"
+        try:
+            client.request("tools/list", timeout=1)
+            assert False, "Requests fail fast once the session cannot be established"
+        except MCPError as e:
+            assert "Mcp-Session-Id" in str(e)
+        assert not client._pending, "Failed initialize calls leave nothing pending"
+    finally:
+        client.close()
+        server.shutdown()
+
+    # Initialize POSTs that never reach the server do not leak their pending Future either
+    unreachable = MCPClient("https://mcp.taostats.io/?api_key=test", reconnect_delay=0.05, cache=False)
+    unreachable.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    server.server_close()
+    try:
+        assert not unreachable.connect(timeout=0.3)
+        unreachable._stop_event.set()
+        unreachable._thread.join(timeout=10)
+        assert not unreachable._pending
+    finally:
+        unreachable.close()
+
+if __name__ == "__main__":
+    test_multiplexed_calls()
+    test_initialize_failures()
@@ -0,0 +1,129 @@
+import gc
+import os
+import threading
+import time
+from rich.console import Console
+import stealth_browser
+from stealth_browser import PROFILE_REQUIREMENTS, ProfilePool, StealthBrowser
+
+console = Console()
+
+class SlowSN61:
+    """Fake SN61 profile endpoint: every request takes `delay` seconds."""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, requirements):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls += 1
+            return {"id": self.calls, "requirements": requirements, "headers": {"User-Agent": f"ua-{self.calls}"}}
+
+def wait_until_full(pool, requirements=None, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while pool.available(requirements) < pool.size and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return pool.available(requirements)
+
+def test_rotation_and_expiry():
+    console.print("[bold white]🧪 Testing Profile Pool...[/bold white]")
+    sn61 = SlowSN61(delay=0)
+    pool = ProfilePool(sn61.fetch, size=3, ttl=0.2, refresh_interval=10)
+    pool.warm()
+    assert wait_until_full(pool) == 3
+    ids = [pool.take()[0]["id"] for _ in range(6)]
+    assert ids == [1, 2, 3, 1, 2, 3], "Profiles rotate round-robin"
+
+    time.sleep(0.25)
+    assert pool.take() is None, "Expired profiles are never handed out"
+    pool.close()
+
+def test_never_blocks():
+    sn61 = SlowSN61(delay=0.2)
+    browser = StealthBrowser()
+    browser.api_key = "test"
+    browser.pool = ProfilePool(sn61.fetch, size=2, refresh_interval=10)
+
+    start = time.perf_counter()
+    profile = browser.profile_for("https://cold.example.com/")
+    assert time.perf_counter() - start < 0.05, "Empty pool falls back instantly"
+    assert profile == browser._local_fallback_profile()
+
+    assert wait_until_full(browser.pool, PROFILE_REQUIREMENTS) == 2, "Pool refills in the background"
+
+    start = time.perf_counter()
+    warm = browser.profile_for("https://warm.example.com/")
+    assert time.perf_counter() - start < 0.05 and warm["requirements"] == PROFILE_REQUIREMENTS
+    assert browser.profile_for("https://warm.example.com/other") is warm, "Domain keeps its session"
+    browser.pool.close()
+
+def test_session_ends_with_profile():
+    sn61 = SlowSN61(delay=0)
+    browser = StealthBrowser(profile_ttl=60)
+    browser.api_key = "test"
+    browser.pool = ProfilePool(sn61.fetch, size=1, ttl=0.2, refresh_interval=10)
+    browser.pool.warm(PROFILE_REQUIREMENTS)
+    wait_until_full(browser.pool, PROFILE_REQUIREMENTS)
+    first = browser.profile_for("https://pinned.example.com/")
+    assert first["id"] == 1
+    time.sleep(0.25)
+    assert browser.profile_for("https://pinned.example.com/") is not first, "Sessions never outlive their profile"
+    browser.close()
+
+def test_pool_thread_stops():
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {"headers": {"User-Agent": "sn61"}}
+
+    previous_key = os.environ.get("REDTEAM_API_KEY")
+    original = stealth_browser.http_transport.post
+    os.environ["REDTEAM_API_KEY"] = "test"
+    stealth_browser.http_transport.post = lambda *a, **kw: FakeResponse()
+    try:
+        closed = StealthBrowser()
+        assert wait_until_full(closed.pool, PROFILE_REQUIREMENTS) == closed.pool.size
+        thread = closed.pool._thread
+        closed.close()
+        thread.join(timeout=2)
+        assert not thread.is_alive(), "close() stops the refresh thread"
+
+        dropped = StealthBrowser()
+        thread = dropped.pool._thread
+        del dropped
+        gc.collect()
+        thread.join(timeout=2)
+        assert not thread.is_alive(), "A browser that is garbage collected takes its pool thread with it"
+    finally:
+        stealth_browser.http_transport.post = original
+        if previous_key is None:
+            del os.environ["REDTEAM_API_KEY"]
+        else:
+            os.environ["REDTEAM_API_KEY"] = previous_key
+
+def test_shared_across_threads():
+    sn61 = SlowSN61(delay=0)
+    pool = ProfilePool(sn61.fetch, size=4, refresh_interval=10)
+    pool.warm({"obfuscation": "kernel"})
+    wait_until_full(pool, {"obfuscation": "kernel"})
+    taken = []
+    threads = [threading.Thread(target=lambda: taken.extend(pool.take({"obfuscation": "kernel"}) for _ in range(50)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(taken) == 400 and all(taken), "Concurrent takes always get a profile"
+    assert sn61.calls == 4, "Takes do not trigger extra SN61 requests while the pool is full"
+    pool.close()
+    console.print("\n[bold green]✅ Profile pool verified![/bold green]")
+
+if __name__ == "__main__":
+    test_rotation_and_expiry()
+    test_never_blocks()
+    test_session_ends_with_profile()
+    test_pool_thread_stops()
+    test_shared_across_threads()
@@ -0,0 +1,68 @@
+import time
+from types import SimpleNamespace
+from rich.console import Console
+from provider_health import ProviderHealth, HealthRegistry, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+console = Console()
+
+def test_breaker_lifecycle():
+    console.print("[bold white]🧪 Testing Provider Health & Circuit Breaker...[/bold white]")
+    health = ProviderHealth("targon", consecutive_failures=3, cooldown=0.05,
+                            default_timeout=60.0, min_timeout=1.0, max_timeout=90.0)
+
+    # Adaptive timeout: default until enough samples, then p99 * margin (clamped)
+    assert health.timeout() == 60.0
+    for latency in [2.0, 2.2, 2.1, 2.4, 4.0]:
+        health.record_success(latency)
+    assert health.latency(0.5) == 2.2 and health.latency(0.99) == 4.0
+    assert health.timeout() == 6.0
+
+    # Three consecutive failures open the breaker; calls are skipped immediately
+    for _ in range(3):
+        health.record_failure(6.0)
+    assert health.state == OPEN and not health.allow()
+    try:
+        health.check()
+        assert False, "check() should raise while open"
+    except CircuitOpenError as e:
+        assert e.provider == "targon"
+
+    # After the cooldown a single trial call is let through (half-open)
+    time.sleep(0.06)
+    assert health.allow() and health.state == HALF_OPEN
+    assert not health.allow(), "Only one trial call while half-open"
+    health.record_failure()
+    assert health.state == OPEN, "Failed trial re-opens the breaker"
+
+    time.sleep(0.06)
+    assert health.allow()
+    health.record_success(2.0)
+    assert health.state == CLOSED
+
+def test_router_skips_open_provider():
+    from brain import BrainRouter
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+    brain.cache_enabled = False
+    brain.health = HealthRegistry(cooldown=60.0)
+
+    calls = {"targon": 0}
+    def failing_create(**kwargs):
+        calls["targon"] += 1
+        assert "timeout" in kwargs, "Calls must carry the adaptive timeout"
+        raise TimeoutError("read timed out")
+    message = SimpleNamespace(content="fast answer")
+    brain.targon_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=failing_create)))
+    brain.chutes_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: SimpleNamespace(choices=[SimpleNamespace(message=message)]))))
+
+    for _ in range(5):
+        assert brain.think("Plan a marketing strategy for a coffee brand.") == "fast answer"
+    assert calls["targon"] == 3, "Targon should be skipped once its breaker opens"
+    assert brain.health.get("targon").state == OPEN
+    brain.health_report()
+    console.print("\n[bold green]✅ Circuit breaker and adaptive timeouts verified![/bold green]")
+
+if __name__ == "__main__":
+    test_breaker_lifecycle()
+    test_router_skips_open_provider()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from rich.console import Console
+from response_cache import ResponseCache
+
+console = Console()
+
+SOUL = "You are OpenClaw."
+
+def test_response_cache():
+    console.print("[bold white]🧪 Testing Response Cache...[/bold white]")
+
+    # 1. Exact hits ignore case/whitespace; misses on other tier/model/soul
+    cache = ResponseCache(max_entries=2)
+    cache.put("fast", "hermes", SOUL, "What is  TAO?", "A token.", latency=1.5)
+    assert cache.get("fast", "hermes", SOUL, "what is tao?") == "A token."
+    assert cache.get("deep", "hermes", SOUL, "what is tao?") is None
+    assert cache.get("fast", "hermes", "New soul.", "what is tao?") is None
+
+    # 2. LRU eviction
+    cache.put("fast", "hermes", SOUL, "b", "B")
+    cache.get("fast", "hermes", SOUL, "What is TAO?")
+    cache.put("fast", "hermes", SOUL, "c", "C")
+    assert cache.get("fast", "hermes", SOUL, "b") is None, "Least recently used entry should be evicted"
+
+    # 3. TTL expiry
+    expiring = ResponseCache(ttl=0)
+    expiring.put("fast", "hermes", SOUL, "x", "X")
+    expiring._entries[next(iter(expiring._entries))]["created_at"] -= 1
+    assert expiring.get("fast", "hermes", SOUL, "x") is None
+
+    # 4. TEE prompts are never stored
+    cache.put("secure", "kimi", SOUL, "my seed phrase", "secret")
+    assert cache.get("secure", "kimi", SOUL, "my seed phrase") is None
+
+    # 5. Near-duplicate lookup
+    similar = ResponseCache(similarity_threshold=0.85)
+    similar.put("fast", "hermes", SOUL, "Summarize the latest Bittensor news", "Summary.")
+    assert similar.get("fast", "hermes", SOUL, "Summarize the latest Bittensor news!!") == "Summary."
+    assert similar.get("fast", "hermes", SOUL, "Write a haiku about rain") is None
+
+    # 6. Disk layer survives restarts and invalidation clears it
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        ResponseCache(disk_path=path).put("deep", "r1", SOUL, "plan", "Plan.", latency=4.0)
+        reopened = ResponseCache(disk_path=path)
+        assert reopened.get("deep", "r1", SOUL, "plan") == "Plan."
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.invalidate()
+        assert ResponseCache(disk_path=path).get("deep", "r1", SOUL, "plan") is None
+
+    stats = cache.stats()
+    assert stats["latency_saved_s"] >= 3.0, "Hits should account for the provider latency they saved"
+    cache.print_stats()
+    console.print("\n[bold green]✅ Response cache verified![/bold green]")
+
+def test_soul_refresh_invalidates():
+    from brain import BrainRouter
+
+    class FakeTrainer:
+        def fetch_opp(self):
+            return {"version": "9.9", "personality": "Refreshed.", "directives": [], "heuristics": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        brain = BrainRouter()
+        brain.soul_manager.soul_path = os.path.join(tmp, "SOUL.md")
+        brain.soul_manager.trainer = FakeTrainer()
+        brain.system_prompt = SOUL
+        brain.cache_store("fast", "hermes", "hello", "Hi!", 0.5)
+        assert brain.cache_lookup("fast", "hermes", "hello") == "Hi!"
+
+        assert brain.soul_manager.refresh_soul()
+        assert "Refreshed." in brain.system_prompt, "System prompt should reload after refresh"
+        assert brain.response_cache.stats()["entries"] == 0, "Cache must be invalidated on refresh"
+
+if __name__ == "__main__":
+    test_response_cache()
+    test_soul_refresh_invalidates()
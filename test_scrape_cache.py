@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from requests.structures import CaseInsensitiveDict
+from rich.console import Console
+import stealth_browser
+from scrape_cache import ScrapeCache, normalize_url, parse_domain_ttls
+from stealth_browser import StealthBrowser
+
+console = Console()
+
+def test_normalize_url():
+    console.print("[bold white]🧪 Testing Scrape Cache...[/bold white]")
+    assert normalize_url("HTTPS://Example.COM:443/a/?b=2&a=1&utm_source=x#top") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+
+def test_content_addressed_store():
+    root = tempfile.mkdtemp()
+    cache = ScrapeCache(root=root, domain_ttls={"fast.io": 0.05})
+    page = [{"url": "https://example.com", "content": "hello " * 1000}]
+    cache.put_json("gopher", "https://example.com/#x", page, {"max_pages": 3, "max_depth": 1})
+    cache.put_json("gopher", "https://example.com/", page, {"max_pages": 1, "max_depth": 1})
+
+    start = time.perf_counter()
+    assert cache.get_json("gopher", "https://EXAMPLE.com", {"max_depth": 1, "max_pages": 3}) == page
+    assert time.perf_counter() - start < 0.05, "Cache hits return in milliseconds"
+    assert cache.get_json("gopher", "https://example.com", {"max_pages": 2, "max_depth": 1}) is None
+
+    objects = [f for _, _, files in os.walk(os.path.join(root, "objects")) for f in files]
+    assert len(objects) == 1, "Identical bodies are stored once"
+    assert cache.stats()["bytes"] < 2 * len("hello " * 1000) / 10, "Bodies are compressed"
+
+    # Per-domain TTL
+    cache.put("browse", "https://cdn.fast.io/x", b"short-lived")
+    time.sleep(0.1)
+    assert cache.get("browse", "https://cdn.fast.io/x") is None
+    assert cache.get("browse", "https://cdn.fast.io/x", allow_stale=True)["fresh"] is False
+
+def test_lru_eviction():
+    cache = ScrapeCache(root=tempfile.mkdtemp(), max_bytes=3000)
+    for i in range(4):
+        cache.put("browse", f"https://example.com/{i}", os.urandom(1000))
+        time.sleep(0.01)
+        cache.get("browse", "https://example.com/0")  # keep page 0 hot
+    assert cache.get("browse", "https://example.com/0") is not None
+    assert cache.get("browse", "https://example.com/1") is None, "Least recently used page is evicted"
+    assert cache.stats()["bytes"] <= 3000 and cache.metrics["evictions"] >= 1
+
+def test_changing_page():
+    root = tempfile.mkdtemp()
+    cache = ScrapeCache(root=root)
+    shared = os.urandom(1000)
+    cache.put("browse", "https://example.com/mirror", shared)
+    for i in range(50):
+        cache.put("browse", "https://example.com/live", os.urandom(1000))
+    cache.put("browse", "https://example.com/live", shared)
+    cache.put("browse", "https://example.com/live", os.urandom(1000))
+    objects = [name for _, _, files in os.walk(os.path.join(root, "objects")) for name in files]
+    assert len(objects) == 2, f"{len(objects)} bodies on disk for 2 entries"
+    assert cache.get("browse", "https://example.com/mirror")["body"] == shared, "Shared bodies are kept"
+
+def test_domain_ttls_from_env():
+    names = ("SCRAPE_CACHE_DIR", "SCRAPE_CACHE_TTL", "SCRAPE_CACHE_DOMAIN_TTLS")
+    previous = {name: os.environ.get(name) for name in names}
+    os.environ.update(SCRAPE_CACHE_DIR=tempfile.mkdtemp(), SCRAPE_CACHE_TTL="600",
+                      SCRAPE_CACHE_DOMAIN_TTLS="x.com=30, Docs.Python.org=86400,")
+    try:
+        cache = ScrapeCache.from_env()
+        assert cache.ttl("https://x.com/elonmusk") == 30 and cache.ttl("https://mobile.x.com/a") == 30
+        assert cache.ttl("https://docs.python.org/3/") == 86400 and cache.ttl("https://example.com") == 600
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    try:
+        parse_domain_ttls("x.com:30")
+        assert False, "Malformed entries are rejected"
+    except ValueError:
+        pass
+
+def test_browse_revalidation():
+    calls = []
+
+    def fake_get(url, headers=None, **kwargs):
+        calls.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return SimpleNamespace(status_code=304, headers=CaseInsensitiveDict(), content=b"")
+        return SimpleNamespace(status_code=200, content=b"<html>v1</html>",
+                               headers=CaseInsensitiveDict({"ETag": '"v1"', "Content-Type": "text/html"}))
+
+    original = stealth_browser.http_transport.get
+    stealth_browser.http_transport.get = fake_get
+    try:
+        cache = ScrapeCache(root=tempfile.mkdtemp(), default_ttl=60)
+        browser = StealthBrowser(cache=cache)
+        browser.api_key = None
+        assert browser.browse("https://example.com/page").content == b"<html>v1</html>"
+        assert browser.browse("https://example.com/page").text == "<html>v1</html>"
+        assert len(calls) == 1, "Fresh hit skips the network"
+
+        cache.default_ttl = 0
+        resp = browser.browse("https://example.com/page")
+        assert len(calls) == 2 and calls[1]["If-None-Match"] == '"v1"'
+        assert resp.status_code == 200 and resp.content == b"<html>v1</html>", "304 reuses the cached body"
+        assert cache.metrics["revalidated"] == 1
+    finally:
+        stealth_browser.http_transport.get = original
+    console.print("\n[bold green]✅ Scrape cache verified![/bold green]")
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_content_addressed_store()
+    test_lru_eviction()
+    test_changing_page()
+    test_domain_ttls_from_env()
+    test_browse_revalidation()
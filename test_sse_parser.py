@@ -0,0 +1,48 @@
+import json
+from rich.console import Console
+from sse_parser import SSEParser, iter_events
+
+console = Console()
+
+STREAM = (
+    b": keep-alive\r\n"
+    b"id: e1\r\n"
+    b"event: message\r\n"
+    b'data: {"jsonrpc": "2.0",\r\n'
+    b'data:  "id": 1}\r\n'
+    b"\r\n"
+    b"retry: 3000\n"
+    b'data: {"id": 2}\n'
+    b"\n"
+    b"id: e3\n"
+    b"\n"
+    b'data: {"id": 3}'
+)
+
+def test_incremental_parsing():
+    console.print("[bold white]🧪 Testing SSE Parser...[/bold white]")
+    whole = list(iter_events([STREAM]))
+    # Byte-by-byte delivery must produce exactly the same events
+    split = list(iter_events(STREAM[i:i + 1] for i in range(len(STREAM))))
+    assert [(e.id, e.data) for e in whole] == [(e.id, e.data) for e in split]
+
+    first, second, third = whole
+    assert first.json() == {"jsonrpc": "2.0", "id": 1}, "Multi-line data is joined with newlines"
+    assert first.id == "e1" and first.event == "message"
+    assert second.id == "e1" and second.retry == 3000, "Last event id carries over"
+    assert third.id == "e3" and third.json() == {"id": 3}, "Trailing event is flushed at end of stream"
+
+def test_large_event():
+    payload = {"jsonrpc": "2.0", "id": 7, "result": {"data": [{"netuid": n, "price": "1.0"} for n in range(5000)]}}
+    body = b"data: " + json.dumps(payload).encode() + b"\n\n"
+    parser = SSEParser()
+    events = []
+    for i in range(0, len(body), 1024):
+        events += parser.feed(body[i:i + 1024])
+    assert len(events) == 1 and events[0].json()["result"]["data"][-1]["netuid"] == 4999
+    assert events[0].json() is events[0].json(), "JSON is decoded once"
+    console.print("\n[bold green]✅ SSE parser verified![/bold green]")
+
+if __name__ == "__main__":
+    test_incremental_parsing()
+    test_large_event()
@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+from rich.console import Console
+from brain import BrainRouter
+
+console = Console()
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class FakeStreamingCompletions:
+    """Yields `tokens`, then raises if `die` is set (a stream dying mid-way)."""
+    def __init__(self, tokens, die=False):
+        self.tokens, self.die = tokens, die
+        self.calls = []
+
+    def _events(self):
+        for token in self.tokens:
+            yield _chunk(token)
+        if self.die:
+            raise ConnectionError("stream reset")
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._events()
+
+class FakeAsyncStreamingCompletions(FakeStreamingCompletions):
+    async def _aevents(self):
+        for event in self._events():
+            await asyncio.sleep(0)
+            yield event
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._aevents()
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+def test_stream_fallback_continues():
+    console.print("[bold white]🧪 Testing Streaming Think...[/bold white]")
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+
+    # Targon dies after two tokens; Chutes continues from the partial output
+    targon = FakeStreamingCompletions(["Step 1. ", "Step 2. "], die=True)
+    chutes = FakeStreamingCompletions(["Step 3."])
+    brain.targon_client = _client(targon)
+    brain.chutes_client = _client(chutes)
+
+    tokens = list(brain.think_stream("Plan a marketing strategy for a coffee brand."))
+    assert tokens == ["Step 1. ", "Step 2. ", "Step 3."], tokens
+
+    continuation = chutes.calls[0]["messages"]
+    assert continuation[-2] == {"role": "assistant", "content": "Step 1. Step 2. "}
+    assert all(call["stream"] for call in targon.calls + chutes.calls)
+
+    # A completed stream is cached for the next identical prompt
+    brain.chutes_client = _client(FakeStreamingCompletions(["Hello", " there"]))
+    assert "".join(brain.think_stream("Hi!")) == "Hello there"
+    assert list(brain.think_stream("Hi!")) == ["Hello there"]
+
+def test_cortex_fallback_streams():
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+
+    def down(prompt):
+        raise ConnectionError("affine unreachable")
+
+    brain.affine_client = SimpleNamespace(compute=down)
+    targon = FakeStreamingCompletions(["Deep ", "answer."])
+    brain.targon_client = _client(targon)
+    brain.context_loader = SimpleNamespace(get_deep_context=lambda topic: "No historical data found.")
+    assert list(brain._stream_tier("cortex", "Prove the protocol is safe.")) == ["Deep ", "answer."], \
+        "The sync cortex fallback streams System 2 tokens"
+    assert targon.calls[0]["stream"]
+
+def test_async_stream_fallback_continues():
+    brain = BrainRouter()
+    brain.system_prompt = "You are a test agent."
+    engine = brain.llm_engine
+
+    async def collect():
+        engine._bind_loop()
+        engine._clients = {
+            "targon": _client(FakeAsyncStreamingCompletions(["A", "B"], die=True)),
+            "chutes": _client(FakeAsyncStreamingCompletions(["C"]))
+        }
+        return [token async for token in brain.athink_stream("Analyze the TAO market structure.")]
+
+    assert asyncio.run(collect()) == ["A", "B", "C"]
+    console.print("\n[bold green]✅ Streaming and mid-stream fallback verified![/bold green]")
+
+if __name__ == "__main__":
+    test_stream_fallback_continues()
+    test_cortex_fallback_streams()
+    test_async_stream_fallback_continues()
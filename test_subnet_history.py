@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from rich.console import Console
+from subnet_history import SubnetHistory
+
+console = Console()
+
+def _pool(netuid, block, price, liquidity="1000"):
+    return {"netuid": netuid, "block_number": block, "price": str(price), "liquidity": liquidity,
+            "tao_volume_24_hr": "50.5", "buys_24_hr": 7, "sells_24_hr": "3"}
+
+def test_append_and_query():
+    console.print("[bold white]🧪 Testing Subnet History Store...[/bold white]")
+    path = tempfile.mkdtemp()
+    history = SubnetHistory(path)
+    t0 = 1_699_999_800.0  # aligned to 10-minute buckets
+    for i in range(100):
+        assert history.append([_pool(33, 1000 + i, 1.0 + i / 100), _pool(64, 1000 + i, 5.0)], timestamp=t0 + i * 60) == 2
+
+    # Keyed by (netuid, block): replays and older blocks are ignored
+    assert history.append([_pool(33, 1050, 9.9), _pool(33, 1099, 9.9)]) == 0
+    assert history.rows == 200
+
+    snaps = history.query(33, start_block=1010, end_block=1019, fields=["block_number", "price"])
+    assert [s["block_number"] for s in snaps] == list(range(1010, 1020))
+    assert abs(snaps[0]["price"] - 1.10) < 1e-9
+    assert len(history.query(64, start_time=t0 + 60 * 90)) == 10
+    assert history.latest(33)["buys_24_hr"] == 7
+
+    # 10-minute buckets: 10 snapshots each
+    hourly = history.downsample(33, "price", bucket=600, agg="max", start=t0, end=t0 + 1199)
+    assert len(hourly) == 2 and abs(hourly[0][1] - 1.09) < 1e-9
+    assert len(history.downsample(64, "liquidity", bucket=50, by="block_number")) == 2
+
+    # Reopening maps the same data; a torn append (crash mid-write) is dropped
+    with open(os.path.join(path, "price.col"), "ab") as f:
+        f.write(b"\x00" * 8)
+    reopened = SubnetHistory(path)
+    assert reopened.rows == 200 and reopened.netuids() == [33, 64]
+    start = time.perf_counter()
+    assert len(reopened.query(33)) == 100
+    assert time.perf_counter() - start < 0.05
+    console.print("\n[bold green]✅ Subnet history store verified![/bold green]")
+
+def _writer(path, netuid, count):
+    history = SubnetHistory(path)
+    for i in range(count):
+        history.append([_pool(netuid, 1000 + i, 1.0)])
+
+def test_concurrent_writers():
+    path = tempfile.mkdtemp()
+    stale = SubnetHistory(path)  # opened before the other writers run
+    reader = SubnetHistory(path)  # long-lived reader (dashboard) that never writes
+    workers = [multiprocessing.Process(target=_writer, args=(path, netuid, 100)) for netuid in (1, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert reader.netuids() == [1, 2] and reader.latest(2)["block_number"] == 1099, "Reads see other writers' rows"
+    assert len(reader.query(1)) == 100
+    mapped = reader._maps["price"][0]
+    reader.close()
+    assert mapped.closed, "close() unmaps the column files"
+
+    assert stale.append([_pool(1, 1050, 2.0), _pool(1, 1100, 2.0)]) == 1, "Rows written elsewhere are seen under the lock"
+    assert stale.rows == 201 and len(stale.query(2)) == 100
+
+    reopened = SubnetHistory(path)
+    assert reopened.rows == 201
+    assert [s["block_number"] for s in reopened.query(1)] == list(range(1000, 1100)) + [1100], "Columns stay aligned"
+
+    # Snapshots without a block are skipped instead of being stored as block 0
+    assert reopened.append([{"netuid": 3, "price": "1.0"}, _pool(3, "", 1.0)]) == 0
+    assert reopened.append([_pool(3, 5, 1.0)]) == 1 and reopened.latest(3)["block_number"] == 5
+
+if __name__ == "__main__":
+    test_append_and_query()
+    test_concurrent_writers()
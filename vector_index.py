@@ -0,0 +1,364 @@
+import hashlib
+import heapq
+import math
+import mmap
+import operator
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from rich.console import Console
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+console = Console()
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def chunk_text(text: str, max_words: int = 120, overlap: int = 20) -> List[str]:
+    """Splits text into overlapping word windows."""
+    words = text.split()
+    if len(words) <= max_words:
+        return [" ".join(words)] if words else []
+    step = max(1, max_words - overlap)
+    return [" ".join(words[i:i + max_words]) for i in range(0, len(words) - overlap, step)]
+
+
+def _dot(a, b) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+class HashingEmbedder:
+    """
+    CPU-only fallback embedder: signed feature hashing of words and word bigrams
+    into `dim` buckets, sublinear term weighting, L2-normalized.
+    """
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str):
+        words = _WORD.findall(text.lower())
+        yield from words
+        yield from (f"{a} {b}" for a, b in zip(words, words[1:]))
+
+    def embed(self, texts: Iterable[str]) -> List[array]:
+        vectors = []
+        for text in texts:
+            counts: Dict[int, float] = {}
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                slot = h % self.dim
+                counts[slot] = counts.get(slot, 0.0) + (1.0 if (h >> 63) else -1.0)
+            vector = array("f", bytes(4 * self.dim))
+            for slot, value in counts.items():
+                vector[slot] = math.copysign(math.log1p(abs(value)), value)
+            norm = math.sqrt(_dot(vector, vector)) or 1.0
+            vectors.append(array("f", (v / norm for v in vector)))
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency), normalized embeddings."""
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Iterable[str]) -> List[array]:
+        vectors = self.model.encode(list(texts), normalize_embeddings=True)
+        return [array("f", map(float, v)) for v in vectors]
+
+
+def get_embedder():
+    """VECTOR_EMBEDDER=sentence-transformers:<model> uses a local model when installed; hashing otherwise."""
+    spec = os.getenv("VECTOR_EMBEDDER", "hashing")
+    if spec.startswith("sentence-transformers:"):
+        try:
+            return SentenceTransformerEmbedder(spec.split(":", 1)[1])
+        except Exception as e:
+            console.print(f"[yellow]Embedder '{spec}' unavailable ({e}), using hashing embedder.[/yellow]")
+    return HashingEmbedder()
+
+
+class VectorIndex:
+    """
+    Persistent local ANN index (IVF) for grounding chunks.
+    - vectors are appended to a flat float32 file and read through mmap,
+    - once `n_lists * 8` vectors exist, k-means centroids are trained on a sample and every
+      vector is assigned to an inverted list; later inserts go straight to their nearest list,
+    - searches probe the `nprobe` closest lists (exact scan before training),
+    - chunk text, topic and freshness live in sqlite next to the vector files.
+    """
+    def __init__(self, path: Optional[str] = None, embedder=None, n_lists: int = 32, nprobe: int = 4):
+        self.path = path or os.getenv("VECTOR_INDEX_DIR", "vector_index")
+        os.makedirs(self.path, exist_ok=True)
+        self.embedder = embedder or get_embedder()
+        self.dim = self.embedder.dim
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._map = None
+
+        self._db = sqlite3.connect(os.path.join(self.path, "index.sqlite"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS chunks (row INTEGER PRIMARY KEY, topic TEXT, source TEXT, text TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS topics (topic TEXT PRIMARY KEY, refreshed_at REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+        stored_dim = self._db.execute("SELECT value FROM settings WHERE key = 'dim'").fetchone()
+        if stored_dim and int(stored_dim[0]) != self.dim:
+            raise ValueError(f"Index at {self.path} was built with dim={stored_dim[0]}, embedder has dim={self.dim}")
+        self._db.execute("INSERT OR REPLACE INTO settings VALUES ('dim', ?)", (str(self.dim),))
+        self._db.commit()
+
+        self.rows = self._repair()
+        # Rows removed by remove_topic() keep their vector slot but are skipped by searches
+        self._live = bytearray(self.rows)
+        for (row,) in self._db.execute("SELECT row FROM chunks"):
+            self._live[row] = 1
+        self.centroids = self._load_centroids()
+        self.lists: Dict[int, array] = {}
+        for row, list_id in enumerate(self._read(self._file("lists"), "i")):
+            self.lists.setdefault(list_id, array("q")).append(row)
+        self._refresh()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _read(self, path: str, code: str) -> array:
+        values = array(code)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                values.frombytes(f.read())
+        return values
+
+    def _repair(self) -> int:
+        """sqlite is committed last: vector/list rows past its row count are a torn insert and are dropped."""
+        rows = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        for name, width in (("vectors", 4 * self.dim), ("lists", 4)):
+            with open(self._file(name), "ab") as f:
+                if f.tell() > rows * width:
+                    f.truncate(rows * width)
+                elif f.tell() < rows * width:
+                    # Vector files lost data the metadata still references: start over
+                    self._db.execute("DELETE FROM chunks")
+                    self._db.execute("DELETE FROM topics")
+                    self._db.commit()
+                    for stale in ("vectors", "lists", "centroids"):
+                        open(self._file(stale), "wb").close()
+                    return 0
+        return rows
+
+    def _load_centroids(self) -> List[array]:
+        flat = self._read(self._file("centroids"), "f")
+        return [flat[i:i + self.dim] for i in range(0, len(flat), self.dim)]
+
+    def _refresh(self):
+        """(Re)maps the vector file after it grew; the previous map is released by GC once unused."""
+        if self.rows == 0:
+            self._map = None
+            return
+        with open(self._file("vectors"), "rb") as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map = (m, memoryview(m).cast("f"))
+
+    def _vector(self, row: int):
+        return self._map[1][row * self.dim:(row + 1) * self.dim]
+
+    # --- Writes ---
+
+    def add(self, topic: str, chunks: Iterable[Tuple[str, str]]) -> int:
+        """Embeds and inserts (text, source) chunks for a topic and marks it refreshed. Returns rows added."""
+        chunks = [(text, source) for text, source in chunks if text.strip()]
+        topic = normalize_topic(topic)
+        with self._lock:
+            vectors = self.embedder.embed(text for text, _ in chunks)
+            list_ids = array("i", (self._nearest_list(v) for v in vectors))
+            flat = array("f")
+            for vector in vectors:
+                flat.extend(vector)
+            with open(self._file("vectors"), "ab") as f:
+                flat.tofile(f)
+            with open(self._file("lists"), "ab") as f:
+                list_ids.tofile(f)
+            self._db.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                                 [(self.rows + i, topic, source, text) for i, (text, source) in enumerate(chunks)])
+            self._db.execute("INSERT OR REPLACE INTO topics VALUES (?, ?)", (topic, time.time()))
+            self._db.commit()
+            for i, list_id in enumerate(list_ids):
+                self.lists.setdefault(list_id, array("q")).append(self.rows + i)
+            self._live.extend(b"\x01" * len(chunks))
+            self.rows += len(chunks)
+            self._refresh()
+            if not self.centroids and sum(self._live) >= self.n_lists * 8:
+                self._train()
+        return len(chunks)
+
+    def remove_topic(self, topic: str) -> int:
+        """Drops a topic's chunks (before re-indexing it with fresh data)."""
+        topic = normalize_topic(topic)
+        with self._lock:
+            rows = [row for (row,) in self._db.execute("SELECT row FROM chunks WHERE topic = ?", (topic,))]
+            self._db.execute("DELETE FROM chunks WHERE topic = ?", (topic,))
+            self._db.execute("DELETE FROM topics WHERE topic = ?", (topic,))
+            self._db.commit()
+            for row in rows:
+                self._live[row] = 0
+            if self.rows - sum(self._live) > self.rows // 2:
+                self.compact()
+        return len(rows)
+
+    def compact(self) -> int:
+        """
+        Rewrites the vector and list files with live rows only, renumbering them in order.
+        Runs automatically once more than half of the rows are dead. Returns rows dropped.
+        The sqlite renumbering commits after the files are swapped; a crash in between
+        leaves files shorter than the metadata, which _repair() treats as a reset.
+        """
+        with self._lock:
+            live = [row for row in range(self.rows) if self._live[row]]
+            dropped = self.rows - len(live)
+            if not dropped:
+                return 0
+            old_lists = self._read(self._file("lists"), "i")
+            vectors, list_ids = array("f"), array("i")
+            for row in live:
+                vectors.extend(self._vector(row))
+                list_ids.append(old_lists[row])
+            # Live rows keep their order, so each new id is free by the time it is assigned
+            for new, old in enumerate(live):
+                if new != old:
+                    self._db.execute("UPDATE chunks SET row = ? WHERE row = ?", (new, old))
+            self._map = None
+            for name, values in (("vectors", vectors), ("lists", list_ids)):
+                tmp_path = f"{self._file(name)}.tmp"
+                with open(tmp_path, "wb") as f:
+                    values.tofile(f)
+                os.replace(tmp_path, self._file(name))
+            self._db.commit()
+            self.rows = len(live)
+            self._live = bytearray(b"\x01" * self.rows)
+            self.lists = {}
+            for row, list_id in enumerate(list_ids):
+                self.lists.setdefault(list_id, array("q")).append(row)
+            self._refresh()
+        console.print(f"[dim]🧭 Vector index compacted: {dropped} dead chunks dropped, {self.rows} kept[/dim]")
+        return dropped
+
+    def add_documents(self, topic: str, documents: Iterable[Tuple[str, str]], max_words: int = 120) -> int:
+        """Chunks (text, source) documents and inserts the chunks."""
+        return self.add(topic, ((chunk, source) for text, source in documents for chunk in chunk_text(text, max_words)))
+
+    def _nearest_list(self, vector) -> int:
+        if not self.centroids:
+            return -1
+        return max(range(len(self.centroids)), key=lambda i: _dot(vector, self.centroids[i]))
+
+    def _train(self, iterations: int = 3, sample_size: int = 512):
+        """Spherical k-means on a sample, then every stored vector is (re)assigned to its list."""
+        rng = random.Random(13)
+        live = [row for row in range(self.rows) if self._live[row]]
+        if len(live) < self.n_lists:
+            return
+        sample = [self._vector(row) for row in rng.sample(live, min(sample_size, len(live)))]
+        centroids = [array("f", v) for v in rng.sample(sample, self.n_lists)]
+        for _ in range(iterations):
+            sums = [array("d", bytes(8 * self.dim)) for _ in centroids]
+            for vector in sample:
+                best = max(range(len(centroids)), key=lambda i: _dot(vector, centroids[i]))
+                acc = sums[best]
+                for j, value in enumerate(vector):
+                    acc[j] += value
+            for i, acc in enumerate(sums):
+                norm = math.sqrt(_dot(acc, acc))
+                if norm:
+                    centroids[i] = array("f", (v / norm for v in acc))
+        self.centroids = centroids
+
+        # Dead rows are never searched again, so they are left out of every list
+        list_ids = array("i", (self._nearest_list(self._vector(row)) if self._live[row] else -1
+                               for row in range(self.rows)))
+        flat = array("f")
+        for centroid in centroids:
+            flat.extend(centroid)
+        for name, values in (("centroids", flat), ("lists", list_ids)):
+            tmp_path = f"{self._file(name)}.tmp"
+            with open(tmp_path, "wb") as f:
+                values.tofile(f)
+            os.replace(tmp_path, self._file(name))
+        self.lists = {}
+        for row, list_id in enumerate(list_ids):
+            self.lists.setdefault(list_id, array("q")).append(row)
+        console.print(f"[dim]🧭 Vector index trained: {len(centroids)} lists over {self.rows} chunks[/dim]")
+
+    # --- Reads ---
+
+    def search(self, query: str, k: int = 5, topic: Optional[str] = None, max_age: Optional[float] = None,
+               min_score: float = 0.0) -> List[dict]:
+        """
+        Top-k chunks by cosine similarity: [{"text", "source", "topic", "score"}].
+        Optionally limited to one topic, to topics refreshed within `max_age` seconds
+        and to chunks scoring at least `min_score`.
+        """
+        with self._lock:
+            if self.rows == 0:
+                return []
+            q = self.embedder.embed([query])[0]
+            if self.centroids:
+                probes = heapq.nlargest(self.nprobe, range(len(self.centroids)),
+                                        key=lambda i: _dot(q, self.centroids[i]))
+                candidates = [row for list_id in probes for row in self.lists.get(list_id, ())]
+            else:
+                candidates = range(self.rows)
+            candidates = [row for row in candidates if self._live[row]]
+            if topic is not None:
+                allowed = {row for (row,) in self._db.execute(
+                    "SELECT row FROM chunks WHERE topic = ?", (normalize_topic(topic),))}
+                candidates = [row for row in candidates if row in allowed]
+            if max_age is not None:
+                allowed = {row for (row,) in self._db.execute(
+                    "SELECT row FROM chunks JOIN topics USING (topic) WHERE refreshed_at >= ?",
+                    (time.time() - max_age,))}
+                candidates = [row for row in candidates if row in allowed]
+            scored = [(score, row) for score, row in self._score(q, candidates, k) if score >= min_score]
+            hits = []
+            for score, row in scored:
+                topic_name, source, text = self._db.execute(
+                    "SELECT topic, source, text FROM chunks WHERE row = ?", (row,)).fetchone()
+                hits.append({"text": text, "source": source, "topic": topic_name, "score": round(score, 4)})
+            return hits
+
+    def _score(self, q, rows: List[int], k: int) -> List[Tuple[float, int]]:
+        if not rows:
+            return []
+        if np is not None:
+            matrix = np.frombuffer(self._map[0], dtype=np.float32, count=self.rows * self.dim).reshape(self.rows, self.dim)
+            scores = matrix[rows] @ np.asarray(q, dtype=np.float32)
+            top = np.argsort(-scores)[:k]
+            return [(float(scores[i]), rows[i]) for i in top]
+        return heapq.nlargest(k, ((_dot(q, self._vector(row)), row) for row in rows))
+
+    def refreshed_at(self, topic: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute("SELECT refreshed_at FROM topics WHERE topic = ?",
+                                   (normalize_topic(topic),)).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, topic: str, max_age: float) -> bool:
+        refreshed = self.refreshed_at(topic)
+        return refreshed is not None and time.time() - refreshed <= max_age
+
+    def fresh_topics(self, max_age: float) -> set:
+        with self._lock:
+            return {topic for (topic,) in self._db.execute(
+                "SELECT topic FROM topics WHERE refreshed_at >= ?", (time.time() - max_age,))}